@@ -0,0 +1,263 @@
+import os
+import shutil
+
+from buildcache import BuildCache, hash_file
+from htmlnode import LeafNode, ParentNode
+from outputdir import ADDED, MODIFIED, PARTIAL_SUFFIX
+
+ASSET_MANIFEST_NAME = "assets.json"
+
+# Assets given a content-hashed name when fingerprinting. Only images are
+# fingerprinted because their references are the only ones rewritten.
+FINGERPRINT_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif", ".ico"}
+FINGERPRINT_LENGTH = 10
+
+_COPY_CHUNK = 1 << 24
+
+
+class AssetResult:
+    def __init__(self):
+        self.copied = []
+        self.skipped = []
+        # Assets whose content matched one already in the output
+        self.deduplicated = []
+        self.removed = []
+        # Asset path -> output path, both relative and "/"-separated
+        self.outputs = {}
+        self.changes = {"added": [], "modified": [], "removed": []}
+        # The updated asset manifest, a BuildCache
+        self.manifest = None
+    
+    def __repr__(self):
+        return (f"AssetResult(copied={len(self.copied)}, skipped={len(self.skipped)}, "
+                f"deduplicated={len(self.deduplicated)}, removed={len(self.removed)})")
+
+
+def find_assets(static_dir):
+    """Returns the files under `static_dir` as sorted relative paths."""
+    
+    assets = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in files:
+            assets.append(os.path.relpath(os.path.join(root, name), static_dir))
+    assets.sort()
+    return assets
+
+
+def fingerprinted_name(asset, content_hash):
+    """Maps "img/logo.png" to "img/logo.<hash>.png" for fingerprinted types."""
+    
+    stem, extension = os.path.splitext(asset)
+    if extension.lower() not in FINGERPRINT_EXTENSIONS:
+        return asset
+    return f"{stem}.{content_hash[:FINGERPRINT_LENGTH]}{extension}"
+
+
+def _copy_range(source, destination, size):
+    copied = 0
+    while copied < size:
+        n = os.copy_file_range(source, destination, min(_COPY_CHUNK, size - copied))
+        if n == 0:
+            break
+        copied += n
+    return copied
+
+
+def _send(source, destination, size):
+    copied = 0
+    while copied < size:
+        n = os.sendfile(destination, source, copied, min(_COPY_CHUNK, size - copied))
+        if n == 0:
+            break
+        copied += n
+    return copied
+
+
+def copy_file(source_path, destination_path):
+    """Copies a file inside the kernel where possible, keeping its times.
+    
+    `os.copy_file_range` is tried first (which lets filesystems like btrfs
+    and XFS share extents instead of copying), then `os.sendfile`, then a
+    plain buffered copy. The destination gets the source's atime and mtime.
+    """
+    
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        stat = os.fstat(source.fileno())
+        copied = 0
+        for copy in (getattr(os, "copy_file_range", None) and _copy_range,
+                     getattr(os, "sendfile", None) and _send):
+            if copy is None:
+                continue
+            try:
+                copied = copy(source.fileno(), destination.fileno(), stat.st_size)
+                break
+            except OSError:
+                # Unsupported for this pair of files; start over
+                destination.seek(0)
+                destination.truncate()
+        if copied < stat.st_size:
+            source.seek(copied)
+            destination.seek(copied)
+            shutil.copyfileobj(source, destination)
+    os.utime(destination_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _place(path, link_from=None, copy_from=None):
+    """Puts a new file at `path` via a partial file and a rename.
+    
+    Files in a staged output directory may be hard links to the live site,
+    so they are always replaced rather than written into.
+    """
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial = path + PARTIAL_SUFFIX
+    if os.path.lexists(partial):
+        os.remove(partial)
+    if link_from is not None:
+        try:
+            os.link(link_from, partial)
+            os.replace(partial, path)
+            return
+        except OSError:
+            # Different filesystems: fall back to copying
+            copy_from = copy_from or link_from
+    copy_file(copy_from, partial)
+    os.replace(partial, path)
+
+
+def copy_assets(static_dir, output_dir, cache_dir=None, link=False, fingerprint=False, save=True):
+    """Copies the static files under `static_dir` into `output_dir`.
+    
+    An asset whose size and mtime match the previous build's manifest (and
+    whose output still exists) is skipped without being read. Changed
+    assets are hashed, and one whose content is already in the output is
+    hard-linked to that file instead of being copied again. Each asset
+    keeps its own output name, so with `fingerprint` identical images
+    "a.png" and "b.png" become "a.<hash>.png" and "b.<hash>.png", linked
+    to the same file.
+    Outputs of assets that have been deleted are removed.
+    
+    Args:
+        static_dir (string): Directory of assets to copy.
+        output_dir (string): Directory to copy them into.
+        cache_dir (string): Directory for the asset manifest, or None to
+            copy everything.
+        link (bool): Hard-link outputs to the assets instead of copying.
+        fingerprint (bool): Give images content-hashed names, see
+            `fingerprinted_name`.
+        save (bool): Save the manifest before returning. Otherwise the
+            caller saves `AssetResult.manifest` once the output is kept.
+    
+    Returns:
+        AssetResult: What was done, and where each asset ended up.
+    """
+    
+    result = AssetResult()
+    manifest = BuildCache(os.path.join(cache_dir, ASSET_MANIFEST_NAME) if cache_dir else None)
+    if cache_dir is not None:
+        manifest.load()
+    
+    assets = find_assets(static_dir) if os.path.isdir(static_dir) else []
+    previous_outputs = set(entry["output"] for entry in manifest.pages.values())
+    current_outputs = set()
+    # Content hash -> an output file already holding that content
+    by_hash = {}
+    for asset in assets:
+        source_path = os.path.join(static_dir, asset)
+        stat = os.stat(source_path)
+        entry = manifest.pages.get(asset)
+        if (entry is not None and entry.get("size") == stat.st_size and
+                entry.get("mtime_ns") == stat.st_mtime_ns and
+                entry.get("fingerprint", False) == fingerprint and
+                os.path.exists(os.path.join(output_dir, entry["output"]))):
+            result.skipped.append(asset)
+            output, content_hash = entry["output"], entry["hash"]
+        else:
+            content_hash = hash_file(source_path)
+            output = fingerprinted_name(asset, content_hash) if fingerprint else asset
+            output_path = os.path.join(output_dir, output)
+            existed = os.path.exists(output_path)
+            duplicate = by_hash.get(content_hash)
+            
+            if (existed and entry is not None and entry["output"] == output and
+                    entry["hash"] == content_hash):
+                # Touched but not changed
+                result.skipped.append(asset)
+            elif duplicate is not None:
+                if duplicate != output_path:
+                    _place(output_path, link_from=duplicate)
+                    result.changes[MODIFIED if existed else ADDED].append(output)
+                result.deduplicated.append(asset)
+            else:
+                if link:
+                    _place(output_path, link_from=source_path)
+                else:
+                    _place(output_path, copy_from=source_path)
+                result.changes[MODIFIED if existed else ADDED].append(output)
+                result.copied.append(asset)
+            
+            manifest.record(asset, content_hash, output)
+            manifest.pages[asset].update(size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                                         fingerprint=fingerprint)
+        by_hash.setdefault(content_hash, os.path.join(output_dir, output))
+        current_outputs.add(output)
+        result.outputs[asset.replace(os.sep, "/")] = output.replace(os.sep, "/")
+    
+    # Drop deleted assets, and outputs no current asset maps to any more
+    for asset in sorted(set(manifest.pages) - set(assets)):
+        manifest.forget(asset)
+        result.removed.append(asset)
+    for output in previous_outputs - current_outputs:
+        output_path = os.path.join(output_dir, output)
+        if os.path.exists(output_path):
+            os.remove(output_path)
+            result.changes["removed"].append(output)
+    
+    for paths in result.changes.values():
+        paths.sort()
+    result.manifest = manifest
+    if save and cache_dir is not None:
+        manifest.save()
+    return result
+
+
+def image_url_map(outputs, base="/"):
+    """Turns `AssetResult.outputs` into a map of image URLs to rewrite.
+    
+    Both the site-absolute form ("/img/a.png") and the bare relative form
+    ("img/a.png") of each fingerprinted asset are mapped.
+    """
+    
+    urls = {}
+    for asset, output in outputs.items():
+        if asset != output:
+            urls[base + asset] = base + output
+            urls[asset] = base + output
+    return urls
+
+
+def rewrite_image_sources(node, urls):
+    """Points the `src` of every img in a tree at its fingerprinted URL.
+    
+    Args:
+        node (HTMLNode): The root of the tree, rewritten in place.
+        urls (Dict[string, string]): From `image_url_map`.
+    
+    Returns:
+        HTMLNode: `node`.
+    """
+    
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, ParentNode):
+            stack.extend(current.children)
+        elif isinstance(current, LeafNode) and current.tag == "img" and current.props:
+            new_src = urls.get(current.props.get("src"))
+            if new_src is not None:
+                # Assign a new dict so the cached props string is reset
+                current.props = {**current.props, "src": new_src}
+    return node
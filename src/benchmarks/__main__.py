@@ -0,0 +1,62 @@
+"""Run the pipeline benchmarks.
+
+Usage, from the repository root:
+
+    ./bench.sh                              # print results as JSON
+    ./bench.sh --save-baseline base.json    # record a baseline
+    ./bench.sh --baseline base.json         # fail on regressions
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.corpus import CorpusConfig
+from benchmarks.suite import compare, load_results, run, save_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Benchmark each stage of the rendering pipeline.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--paragraphs", type=int, default=200, help="document size in blocks")
+    parser.add_argument("--words", type=int, default=60, help="words per paragraph")
+    parser.add_argument("--link-density", type=float, default=0.03)
+    parser.add_argument("--image-density", type=float, default=0.01)
+    parser.add_argument("--emphasis-density", type=float, default=0.05)
+    parser.add_argument("--code-density", type=float, default=0.02)
+    parser.add_argument("--nesting", type=float, default=0.0, help="chance an emphasis wraps another")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=3)
+    parser.add_argument("--only", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--output", help="write results JSON to this file instead of stdout")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also save the results as a baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown vs. the baseline")
+    args = parser.parse_args(argv)
+    
+    config = CorpusConfig(paragraphs=args.paragraphs, words_per_paragraph=args.words,
+                          link_density=args.link_density, image_density=args.image_density,
+                          emphasis_density=args.emphasis_density, code_density=args.code_density,
+                          nesting=args.nesting, seed=args.seed)
+    results = run(config, repeat=args.repeat, number=args.number, only=args.only)
+    
+    if args.output:
+        save_results(results, args.output)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    if args.save_baseline:
+        save_results(results, args.save_baseline)
+    
+    if args.baseline:
+        rows, regressions = compare(load_results(args.baseline), results, args.tolerance)
+        for name, base, current, ratio in rows:
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<32}{base * 1000:>10.3f} ms{current * 1000:>10.3f} ms{ratio:>8.2f}x{flag}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Seeded generator of synthetic markdown documents for benchmarks.
+
+The same seed and parameters always produce the same document, so timings
+from different runs (and different commits) are comparable.
+"""
+
+import random
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog static site generator markdown "
+    "node tree render parse block inline link image emphasis build page cache "
+    "index reference section example value function return list string"
+).split()
+
+
+class CorpusConfig:
+    def __init__(self, paragraphs=200, words_per_paragraph=60, link_density=0.03,
+                 image_density=0.01, emphasis_density=0.05, code_density=0.02,
+                 nesting=0.0, seed=0):
+        self.paragraphs = paragraphs
+        self.words_per_paragraph = words_per_paragraph
+        # Densities are the chance that any given word becomes that markup
+        self.link_density = link_density
+        self.image_density = image_density
+        self.emphasis_density = emphasis_density
+        self.code_density = code_density
+        # Chance that an emphasized span wraps a second, nested emphasis
+        self.nesting = nesting
+        self.seed = seed
+        
+    def as_dict(self):
+        return {name: getattr(self, name) for name in (
+            "paragraphs", "words_per_paragraph", "link_density", "image_density",
+            "emphasis_density", "code_density", "nesting", "seed")}
+
+
+def _emphasis(rng, word, nesting):
+    outer, inner = ("**", "_") if rng.random() < 0.5 else ("_", "**")
+    if rng.random() < nesting:
+        word = f"{inner}{word} {rng.choice(WORDS)}{inner}"
+    return f"{outer}{word}{outer}"
+
+
+def generate_paragraph(rng, config, word_count=None):
+    """Returns one line of inline markdown built from random words."""
+    
+    words = []
+    for i in range(word_count or config.words_per_paragraph):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < config.link_density:
+            word = f"[{word}](https://example.com/{word}/{i})"
+        elif roll < config.link_density + config.image_density:
+            word = f"![{word}](/images/{word}-{i}.png)"
+        elif roll < config.link_density + config.image_density + config.emphasis_density:
+            word = _emphasis(rng, word, config.nesting)
+        elif roll < (config.link_density + config.image_density +
+                     config.emphasis_density + config.code_density):
+            word = f"`{word}()`"
+        words.append(word)
+    return " ".join(words)
+
+
+def generate_markdown(config=None):
+    """Generates a full markdown document with a mix of block types.
+
+    Most blocks are paragraphs; headings, lists, quotes and fenced code
+    blocks are interspersed so the block parser is exercised too.
+    """
+    
+    config = config or CorpusConfig()
+    rng = random.Random(config.seed)
+    blocks = []
+    
+    for i in range(config.paragraphs):
+        roll = rng.random()
+        if i % 20 == 0:
+            blocks.append(f"{'#' * rng.randint(1, 3)} {' '.join(rng.choices(WORDS, k=4))}")
+        elif roll < 0.08:
+            blocks.append("\n".join(f"- {generate_paragraph(rng, config, 12)}" for _ in range(4)))
+        elif roll < 0.12:
+            blocks.append("> " + generate_paragraph(rng, config))
+        elif roll < 0.15:
+            blocks.append("```\n" + "\n".join(f"x = {rng.choice(WORDS)}({j})" for j in range(5)) + "\n```")
+        else:
+            blocks.append(generate_paragraph(rng, config))
+    
+    return "\n\n".join(blocks) + "\n"
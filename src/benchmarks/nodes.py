@@ -0,0 +1,95 @@
+"""Memory and construction-time benchmark for the node classes.
+
+Compares the slotted TextNode/LeafNode/ParentNode classes against
+equivalent subclasses that carry a per-instance __dict__, which is how the
+classes were laid out before they gained __slots__.
+
+Run from the repository root with:
+
+    PYTHONPATH=src python3 -m benchmarks.nodes
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+
+class DictTextNode(TextNode):
+    pass
+
+
+class DictLeafNode(LeafNode):
+    pass
+
+
+class DictParentNode(ParentNode):
+    pass
+
+
+def make_text_nodes(cls, count):
+    return [cls(f"text {i}", TextType.PLAIN) for i in range(count)]
+
+
+def make_leaf_nodes(cls, count):
+    return [cls("span", f"text {i}") for i in range(count)]
+
+
+def make_parent_nodes(cls, count):
+    return [cls("div", []) for _ in range(count)]
+
+
+SCENARIOS = [
+    ("TextNode", make_text_nodes, TextNode, DictTextNode),
+    ("LeafNode", make_leaf_nodes, LeafNode, DictLeafNode),
+    ("ParentNode", make_parent_nodes, ParentNode, DictParentNode),
+]
+
+
+def measure_bytes_per_node(factory, cls, count):
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        nodes = factory(cls, count)
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del nodes
+    return used / count
+
+
+def measure_seconds(factory, cls, count, repeat):
+    return min(timeit.repeat(lambda: factory(cls, count), number=1, repeat=repeat))
+
+
+def run(count, repeat):
+    results = []
+    for name, factory, slotted_cls, dict_cls in SCENARIOS:
+        results.append({
+            "node": name,
+            "slotted_bytes": measure_bytes_per_node(factory, slotted_cls, count),
+            "dict_bytes": measure_bytes_per_node(factory, dict_cls, count),
+            "slotted_seconds": measure_seconds(factory, slotted_cls, count, repeat),
+            "dict_seconds": measure_seconds(factory, dict_cls, count, repeat),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000, help="nodes built per scenario")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is kept)")
+    args = parser.parse_args(argv)
+    
+    print(f"{'node':<12}{'bytes/node':>22}{'build time (s)':>26}")
+    print(f"{'':<12}{'slots':>11}{'dict':>11}{'slots':>13}{'dict':>13}")
+    for row in run(args.count, args.repeat):
+        print(f"{row['node']:<12}"
+              f"{row['slotted_bytes']:>11.1f}{row['dict_bytes']:>11.1f}"
+              f"{row['slotted_seconds']:>13.4f}{row['dict_seconds']:>13.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Timed benchmark scenarios for each stage of the rendering pipeline."""
+
+import json
+import platform
+import timeit
+
+from blockparser import BlockType, iter_markdown_blocks
+from convertnode import (convert_textnodes_to_htmlnodes,
+                         extract_markdown_images,
+                         extract_markdown_links)
+from nodecodec import dump_html_node, dump_text_nodes, load_html_node, load_text_nodes
+from page import markdown_to_html_node, render_page
+from splitnode import (split_nodes_delimiter,
+                       split_nodes_image,
+                       split_nodes_link,
+                       text_to_textnodes)
+from textnode import TextNode, TextType
+
+from benchmarks.corpus import generate_markdown
+
+RESULTS_VERSION = 1
+
+
+def _inline_texts(markdown):
+    return [" ".join(lines) for block_type, lines in iter_markdown_blocks(markdown.splitlines())
+            if block_type == BlockType.PARAGRAPH]
+
+
+def build_scenarios(markdown):
+    """Returns {name: zero-argument callable} for every benchmarked stage.
+
+    Each callable processes the whole corpus once. Inputs for a stage are
+    prepared up front, so only that stage is timed.
+    """
+    
+    texts = _inline_texts(markdown)
+    plain_nodes = [TextNode(text, TextType.PLAIN) for text in texts]
+    bold_nodes = [node for node in plain_nodes if "**" in node.text]
+    textnode_lists = [text_to_textnodes(text) for text in texts]
+    page = markdown_to_html_node(markdown)
+    page_data = dump_html_node(page)
+    textnode_data = [dump_text_nodes(nodes) for nodes in textnode_lists]
+    
+    return {
+        "extract_markdown_images": lambda: [extract_markdown_images(text) for text in texts],
+        "extract_markdown_links": lambda: [extract_markdown_links(text) for text in texts],
+        "split_nodes_delimiter": lambda: split_nodes_delimiter(bold_nodes, "**", TextType.BOLD),
+        "split_nodes_image": lambda: split_nodes_image(plain_nodes),
+        "split_nodes_link": lambda: split_nodes_link(plain_nodes),
+        "text_to_textnodes": lambda: [text_to_textnodes(text) for text in texts],
+        "convert_textnodes_to_htmlnodes": lambda: [convert_textnodes_to_htmlnodes(nodes) for nodes in textnode_lists],
+        "to_html": page.to_html,
+        "render_page": lambda: render_page(markdown),
+        "markdown_to_html_node": lambda: markdown_to_html_node(markdown),
+        "dump_html_node": lambda: dump_html_node(page),
+        "load_html_node": lambda: load_html_node(page_data),
+        "dump_text_nodes": lambda: [dump_text_nodes(nodes) for nodes in textnode_lists],
+        "load_text_nodes": lambda: [load_text_nodes(data) for data in textnode_data],
+    }
+
+
+def run(config, repeat=5, number=3, only=None):
+    """Times every scenario and returns the machine-readable results.
+
+    The reported time is the best of `repeat` runs of `number` calls each,
+    divided by `number`.
+    """
+    
+    markdown = generate_markdown(config)
+    scenarios = build_scenarios(markdown)
+    results = {}
+    for name, func in scenarios.items():
+        if only and name not in only:
+            continue
+        best = min(timeit.repeat(func, number=number, repeat=repeat))
+        results[name] = {"seconds": best / number}
+    
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "corpus": dict(config.as_dict(), bytes=len(markdown.encode("utf-8"))),
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance=0.10):
+    """Compares two result sets scenario by scenario.
+
+    Args:
+        baseline (dict): Results previously returned by `run`.
+        current (dict): Results of the run being checked.
+        tolerance (float): Allowed slowdown as a fraction of the baseline.
+
+    Returns:
+        Tuple[List[Tuple], List[str]]: (scenario, baseline seconds, current
+        seconds, ratio) rows for every scenario present in both, and the
+        names of the scenarios slower than the tolerance allows.
+    """
+    
+    rows = []
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        rows.append((name, base["seconds"], result["seconds"], ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
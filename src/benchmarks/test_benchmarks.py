@@ -0,0 +1,43 @@
+import unittest
+
+from page import render_page
+from benchmarks.corpus import CorpusConfig, generate_markdown
+from benchmarks.suite import build_scenarios, compare, run
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_corpus_is_deterministic(self):
+        config = CorpusConfig(paragraphs=30, seed=7)
+        self.assertEqual(generate_markdown(config), generate_markdown(config))
+        self.assertNotEqual(generate_markdown(config), generate_markdown(CorpusConfig(paragraphs=30, seed=8)))
+        
+    def test_corpus_density(self):
+        sparse = generate_markdown(CorpusConfig(paragraphs=30, link_density=0.0, image_density=0.0))
+        dense = generate_markdown(CorpusConfig(paragraphs=30, link_density=0.2))
+        self.assertNotIn("](", sparse)
+        self.assertGreater(dense.count("](https://"), 100)
+        
+    def test_corpus_renders(self):
+        markdown = generate_markdown(CorpusConfig(paragraphs=60, nesting=0.5))
+        self.assertTrue(render_page(markdown).startswith("<div>"))
+        
+    def test_scenarios_run(self):
+        scenarios = build_scenarios(generate_markdown(CorpusConfig(paragraphs=10)))
+        for func in scenarios.values():
+            func()
+            
+    def test_run_results_format(self):
+        results = run(CorpusConfig(paragraphs=5), repeat=1, number=1, only=["to_html"])
+        self.assertEqual(list(results["results"]), ["to_html"])
+        self.assertGreater(results["corpus"]["bytes"], 0)
+        
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}}}
+        current = {"results": {"a": {"seconds": 1.05}, "b": {"seconds": 1.5}, "c": {"seconds": 1.0}}}
+        rows, regressions = compare(baseline, current, tolerance=0.1)
+        self.assertEqual([row[0] for row in rows], ["a", "b"])
+        self.assertEqual(regressions, ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
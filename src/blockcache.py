@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+
+from htmlnode import HTMLNode
+
+BLOCK_CACHE_MAGIC = b"SSBC"
+BLOCK_CACHE_VERSION = 2
+KEY_SIZE = 16
+
+
+def block_key(block_type, lines):
+    """Returns the digest identifying a block by its type and text."""
+    
+    data = block_type.value + "\0" + "\n".join(lines)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+class CachedBlock(HTMLNode):
+    # A block's already rendered HTML, spliced into the page as is
+    __slots__ = ()
+    
+    def __init__(self, html):
+        super().__init__(value=html)
+    
+    def to_html(self):
+        return self.value
+
+
+class BlockCache:
+    """The rendered HTML of each block of one page, keyed by `block_key`.
+
+    Holds the fragments saved by the page's previous build and collects the
+    fragments of the current one, so only blocks whose text changed have to
+    be parsed and rendered again. Saving keeps only the current fragments.
+    Each fragment may carry the block's summary (see `page.BlockSummaries`).
+    """
+    
+    def __init__(self, previous=None):
+        # Key -> (UTF-8 HTML, UTF-8 JSON summary or None) from the last
+        # build, decoded when used
+        self.previous = previous or {}
+        # Key -> (HTML, JSON summary or None)
+        self.current = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def _entry(self, key):
+        entry = self.current.get(key)
+        if entry is None:
+            data = self.previous.get(key)
+            if data is None:
+                return None
+            html, summary = data
+            entry = self.current[key] = (html.decode("utf-8"),
+                                         summary.decode("utf-8") if summary is not None else None)
+        return entry
+    
+    def get(self, key):
+        entry = self._entry(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+    
+    def get_summary(self, key):
+        """Returns the summary kept with a block, or None if it has none."""
+        
+        entry = self._entry(key)
+        if entry is None or entry[1] is None:
+            return None
+        return json.loads(entry[1])
+    
+    def put(self, key, html, summary=None):
+        self.current[key] = (html, json.dumps(summary) if summary is not None else None)
+    
+    @property
+    def changed(self):
+        return self.misses > 0 or self.current.keys() != self.previous.keys()
+    
+    @classmethod
+    def load(cls, path, generator_hash):
+        """Reads the fragments saved at `path` by the same generator version.
+
+        A missing, corrupt or outdated file gives an empty cache.
+        """
+        
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return cls()
+        
+        generator = generator_hash.encode("ascii")
+        header = BLOCK_CACHE_MAGIC + BLOCK_CACHE_VERSION.to_bytes(4, "little") + generator
+        if not data.startswith(header):
+            return cls()
+        
+        previous = {}
+        view = memoryview(data)
+        position = len(header)
+        try:
+            count = int.from_bytes(view[position:position + 4], "little")
+            position += 4
+            for _ in range(count):
+                key = bytes(view[position:position + KEY_SIZE])
+                position += KEY_SIZE
+                if len(key) != KEY_SIZE:
+                    return cls()
+                fields = []
+                for _ in range(2):
+                    size = int.from_bytes(view[position:position + 4], "little")
+                    position += 4
+                    if position + size > len(data):
+                        return cls()
+                    fields.append(bytes(view[position:position + size]))
+                    position += size
+                html, summary = fields
+                # The summary is stored with one extra byte, so 0 means none
+                previous[key] = (html, summary[1:] if summary else None)
+        except ValueError:
+            return cls()
+        return cls(previous)
+    
+    def save(self, path, generator_hash):
+        """Writes the current fragments to `path`.
+
+        The file holds a header with the generator hash, the number of
+        fragments, then each key followed by its HTML's length and UTF-8
+        bytes, and its summary's length and bytes: a space then the UTF-8
+        JSON, or nothing if it has none. It is written to a temporary file
+        and renamed.
+        """
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(BLOCK_CACHE_MAGIC)
+            f.write(BLOCK_CACHE_VERSION.to_bytes(4, "little"))
+            f.write(generator_hash.encode("ascii"))
+            f.write(len(self.current).to_bytes(4, "little"))
+            for key, (html, summary) in self.current.items():
+                f.write(key)
+                for data in (html.encode("utf-8"),
+                             b" " + summary.encode("utf-8") if summary is not None else b""):
+                    f.write(len(data).to_bytes(4, "little"))
+                    f.write(data)
+        os.replace(tmp_path, path)
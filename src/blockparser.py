@@ -0,0 +1,186 @@
+import re
+from enum import Enum
+
+from htmlnode import LeafNode, ParentNode
+from inlineparser import parse_inline
+from instrument import stage
+
+class BlockType(Enum):
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+_HEADING_RE = re.compile(r"(#{1,6}) (.*)")
+_UNORDERED_ITEM_RE = re.compile(r"[-*] (.*)")
+_ORDERED_ITEM_RE = re.compile(r"\d+\. (.*)")
+_CODE_FENCE = "```"
+
+
+def _line_block_type(line):
+    """Classifies a single non-blank line by the block it starts or continues."""
+    
+    if line.startswith(_CODE_FENCE):
+        return BlockType.CODE
+    if _HEADING_RE.match(line):
+        return BlockType.HEADING
+    if line.startswith(">"):
+        return BlockType.QUOTE
+    if _UNORDERED_ITEM_RE.match(line):
+        return BlockType.UNORDERED_LIST
+    if _ORDERED_ITEM_RE.match(line):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def iter_markdown_blocks(lines):
+    """
+    Group markdown lines into blocks, yielding each block as soon as it ends.
+
+    Lines are consumed one at a time from any iterable (a list, a file
+    object, a generator), so only the block currently being collected is held
+    in memory. Blocks are delimited as follows:
+
+        - a blank line ends the current block
+        - "```" opens a fenced code block that runs to the next "```" line,
+          keeping blank lines and markup inside it verbatim
+        - "# " to "###### " lines are single-line headings
+        - consecutive ">" lines form a quote
+        - consecutive "- "/"* " lines form an unordered list
+        - consecutive "1. " lines form an ordered list
+        - any other consecutive lines form a paragraph
+
+    A line that starts a different kind of block ends the current one, except
+    that plain lines continue an open paragraph.
+
+    Args:
+        lines (Iterable[str]):
+            The document's lines, with or without trailing newlines.
+
+    Returns:
+        Iterator[Tuple[BlockType, List[str]]]:
+            The type of each block and its lines, with code fences removed.
+    """
+    
+    block_type = None
+    block_lines = []
+    in_code = False
+    
+    for line in lines:
+        line = line.rstrip("\r\n")
+        
+        if in_code:
+            if line.strip() == _CODE_FENCE:
+                yield BlockType.CODE, block_lines
+                block_type, block_lines, in_code = None, [], False
+            else:
+                block_lines.append(line)
+            continue
+        
+        if line.strip() == "":
+            if block_type is not None:
+                yield block_type, block_lines
+                block_type, block_lines = None, []
+            continue
+        
+        line_type = _line_block_type(line)
+        
+        # Plain lines continue whatever paragraph is open
+        continues = (line_type == block_type and line_type != BlockType.HEADING) or (
+            block_type == BlockType.PARAGRAPH and line_type == BlockType.PARAGRAPH)
+        
+        if block_type is not None and not continues:
+            yield block_type, block_lines
+            block_type, block_lines = None, []
+        
+        if line_type == BlockType.CODE:
+            in_code = True
+            block_type = BlockType.CODE
+            continue
+            
+        block_type = line_type
+        block_lines.append(line)
+    
+    # An unterminated fence still yields what was collected
+    if block_type is not None:
+        yield block_type, block_lines
+
+
+def _join_lines(lines):
+    return " ".join(line.strip() for line in lines)
+
+
+def block_inline_texts(block_type, lines):
+    """Returns the inline markdown of a block with its block markup removed.
+
+    A paragraph, heading or quote gives one text, a list one text per item,
+    and a code block none, as its contents are not inline markdown.
+
+    Raises:
+        ValueError: If the block type is unknown.
+    """
+    
+    if block_type == BlockType.PARAGRAPH:
+        return [_join_lines(lines)]
+    elif block_type == BlockType.HEADING:
+        return [_HEADING_RE.match(lines[0]).group(2).strip()]
+    elif block_type == BlockType.CODE:
+        return []
+    elif block_type == BlockType.QUOTE:
+        return [_join_lines(line[1:].lstrip() for line in lines)]
+    elif block_type == BlockType.UNORDERED_LIST:
+        return [_UNORDERED_ITEM_RE.match(line).group(1).strip() for line in lines]
+    elif block_type == BlockType.ORDERED_LIST:
+        return [_ORDERED_ITEM_RE.match(line).group(1).strip() for line in lines]
+    raise ValueError(f"Unsupported BlockType: {block_type}")
+
+
+@stage("block")
+def block_to_html_node(block_type, lines):
+    """Converts one block from `iter_markdown_blocks` into a ParentNode.
+
+    Args:
+        block_type (BlockType): The type of the block.
+        lines (List[str]): The block's lines.
+
+    Raises:
+        ValueError: If the block type is unknown.
+
+    Returns:
+        ParentNode: The HTMLNode tree of the block.
+    """
+    
+    if block_type == BlockType.CODE:
+        # Code is never parsed for inline markdown
+        text = "\n".join(lines) + "\n" if lines else ""
+        return ParentNode("pre", [LeafNode("code", text)])
+    
+    # Not strict: a delimiter left open stays literal, so prose like
+    # "snake_case" or "2 * 3" renders as written instead of failing the page
+    texts = block_inline_texts(block_type, lines)
+    if block_type == BlockType.PARAGRAPH:
+        return ParentNode("p", parse_inline(texts[0]))
+    elif block_type == BlockType.HEADING:
+        level = len(_HEADING_RE.match(lines[0]).group(1))
+        return ParentNode(f"h{level}", parse_inline(texts[0]))
+    elif block_type == BlockType.QUOTE:
+        return ParentNode("blockquote", parse_inline(texts[0]))
+    
+    tag = "ul" if block_type == BlockType.UNORDERED_LIST else "ol"
+    return ParentNode(tag, [ParentNode("li", parse_inline(text)) for text in texts])
+
+
+def iter_block_nodes(lines):
+    """Parses markdown lines into block ParentNodes, one block at a time.
+
+    Args:
+        lines (Iterable[str]): The document's lines.
+
+    Returns:
+        Iterator[ParentNode]: The HTMLNode tree of each block, in order.
+    """
+    
+    for block_type, block_lines in iter_markdown_blocks(lines):
+        yield block_to_html_node(block_type, block_lines)
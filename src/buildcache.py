@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+DEFAULT_CACHE_DIR = ".ssgen-cache"
+
+
+def hash_bytes(data):
+    """Returns the hex content hash used to identify sources and outputs."""
+    
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def hash_file(path, chunk_size=1 << 16):
+    """Returns `hash_bytes` of a file's contents, reading it in chunks."""
+    
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_generator_hash = None
+
+def generator_version_hash():
+    """Returns a hash of the generator's own source code.
+
+    Every non-test module next to this one is hashed, so changing any part
+    of the pipeline invalidates all cached pages. Computed once per process.
+    """
+    
+    global _generator_hash
+    if _generator_hash is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.blake2b(digest_size=16)
+        for name in sorted(os.listdir(src_dir)):
+            if not name.endswith(".py") or name.startswith("test_"):
+                continue
+            digest.update(name.encode())
+            with open(os.path.join(src_dir, name), "rb") as f:
+                digest.update(hash_bytes(f.read()).encode())
+        _generator_hash = digest.hexdigest()
+    return _generator_hash
+
+
+class BuildCache:
+    """On-disk manifest of the pages rendered by previous builds.
+
+    Each source file (by path relative to the content directory) maps to the
+    hash of the content it was rendered from and the output file it produced.
+    A page is up to date when its content hash is unchanged, its output file
+    still exists, and the manifest was written by the same generator version.
+    """
+    
+    def __init__(self, path, generator_hash=None):
+        self.path = path
+        self.generator_hash = generator_hash or generator_version_hash()
+        self.pages = {}
+        self.dirty = False
+        
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return self
+        
+        # A manifest from another format or generator version is useless
+        if (data.get("version") == MANIFEST_VERSION and
+                data.get("generator") == self.generator_hash):
+            self.pages = data.get("pages", {})
+        else:
+            self.dirty = True
+        return self
+    
+    def is_fresh(self, source, content_hash, output_path):
+        entry = self.pages.get(source)
+        return (entry is not None and
+                entry["hash"] == content_hash and
+                os.path.exists(output_path))
+    
+    def record(self, source, content_hash, output, output_hash=None):
+        entry = {"hash": content_hash, "output": output}
+        if output_hash is not None:
+            entry["output_hash"] = output_hash
+        self.pages[source] = entry
+        self.dirty = True
+        
+    def output_hash(self, source):
+        entry = self.pages.get(source)
+        return entry.get("output_hash") if entry is not None else None
+        
+    def forget(self, source):
+        entry = self.pages.pop(source, None)
+        if entry is not None:
+            self.dirty = True
+        return entry
+    
+    def save(self):
+        if not self.dirty:
+            return
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Write to a temporary file and rename so an interrupted build never
+        # leaves a truncated manifest behind
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "generator": self.generator_hash,
+                "pages": self.pages,
+            }, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
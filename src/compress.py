@@ -0,0 +1,194 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from buildcache import BuildCache, hash_bytes
+from outputdir import write_if_changed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MANIFEST_NAME = "compressed.json"
+
+# Outputs that get precompressed sidecar files
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".json"}
+
+GZIP = "gz"
+BROTLI = "br"
+
+
+def _gzip(data):
+    # A fixed mtime keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _brotli(data):
+    return brotli.compress(data, mode=brotli.MODE_TEXT)
+
+ENCODERS = {GZIP: _gzip, BROTLI: _brotli}
+
+
+def available_encodings():
+    """Returns the sidecar encodings that can be produced here.
+
+    Brotli needs the optional `brotli` package.
+    """
+    
+    return [GZIP, BROTLI] if brotli is not None else [GZIP]
+
+
+class CompressResult:
+    def __init__(self):
+        self.compressed = []
+        self.skipped = []
+        # Sidecar files (relative to the output directory) that changed
+        self.changes = {"added": [], "modified": [], "removed": []}
+        # The updated compression manifest, a BuildCache
+        self.manifest = None
+    
+    def __repr__(self):
+        return f"CompressResult(compressed={len(self.compressed)}, skipped={len(self.skipped)})"
+
+
+def _scan(output_dir):
+    # Returns the compressible files and the existing sidecars, relative
+    files = []
+    sidecars = []
+    suffixes = tuple("." + encoding for encoding in ENCODERS)
+    for root, dirs, names in os.walk(output_dir):
+        for name in names:
+            relative = os.path.relpath(os.path.join(root, name), output_dir)
+            if name.endswith(suffixes):
+                base = os.path.splitext(relative)[0]
+                if os.path.splitext(base)[1] in COMPRESSIBLE_EXTENSIONS:
+                    sidecars.append(relative)
+                    continue
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                files.append(relative)
+    files.sort()
+    return files, sidecars
+
+
+def compress_file(path, encodings, previous=None):
+    """Writes the precompressed sidecars of one file.
+
+    A variant that would not be smaller than the file itself is not written
+    (and any old one is removed), since serving it would not help.
+
+    Args:
+        path (string): The file to compress.
+        encodings (List[string]): Encodings to produce, e.g. [GZIP].
+        previous (dict): The file's entry from the last run, if any. When
+            its hash and encodings match and its sidecars still exist,
+            nothing is compressed.
+
+    Returns:
+        Tuple[string, List[string], List[Tuple[string, string]]]: The
+        file's content hash, the encodings whose sidecars exist, and a
+        (status, sidecar path) pair for every sidecar added, modified or
+        removed, or None in place of that list if the file was skipped.
+    """
+    
+    with open(path, "rb") as f:
+        data = f.read()
+    content_hash = hash_bytes(data)
+    if (previous is not None and previous["hash"] == content_hash and
+            previous.get("requested") == encodings and
+            all(os.path.exists(f"{path}.{encoding}") for encoding in previous.get("written", ()))):
+        return content_hash, previous["written"], None
+    
+    written = []
+    changes = []
+    for encoding in ENCODERS:
+        # Drop sidecars of encodings no longer asked for
+        sidecar = f"{path}.{encoding}"
+        if encoding not in encodings and os.path.exists(sidecar):
+            os.remove(sidecar)
+            changes.append(("removed", sidecar))
+    for encoding in encodings:
+        sidecar = f"{path}.{encoding}"
+        compressed = ENCODERS[encoding](data)
+        if len(compressed) >= len(data):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+                changes.append(("removed", sidecar))
+            continue
+        status, _ = write_if_changed(sidecar, compressed)
+        if status is not None:
+            changes.append((status, sidecar))
+        written.append(encoding)
+    return content_hash, written, changes
+
+
+def precompress(output_dir, cache_dir=None, jobs=1, encodings=None, save=True):
+    """Writes ".gz" (and with brotli, ".br") sidecars for the site's text files.
+
+    Every HTML, CSS, JS and JSON file under `output_dir` is compressed on a pool
+    of `jobs` threads; zlib and brotli release the GIL while compressing,
+    so threads run in parallel without copying file contents to other
+    processes. Files whose content hash matches the previous run's manifest
+    are skipped. Sidecars of files that no longer exist are removed.
+
+    Args:
+        output_dir (string): The built site.
+        cache_dir (string): Directory for the manifest, or None to
+            compress everything.
+        jobs (int): Number of compressing threads.
+        encodings (List[string]): Encodings to produce; defaults to
+            `available_encodings()`.
+        save (bool): Save the manifest before returning. Otherwise the
+            caller saves `CompressResult.manifest` once the output is kept.
+
+    Returns:
+        CompressResult: The files compressed and skipped, and the sidecars
+        that changed.
+    """
+    
+    encodings = list(encodings) if encodings is not None else available_encodings()
+    for encoding in encodings:
+        if encoding not in ENCODERS or (encoding == BROTLI and brotli is None):
+            raise ValueError(f"Unsupported encoding: {encoding}")
+    
+    result = CompressResult()
+    manifest = BuildCache(os.path.join(cache_dir, COMPRESS_MANIFEST_NAME) if cache_dir else None)
+    if cache_dir is not None:
+        manifest.load()
+    
+    files, sidecars = _scan(output_dir)
+    
+    def task(relative):
+        return compress_file(os.path.join(output_dir, relative), encodings,
+                             manifest.pages.get(relative))
+    
+    if jobs > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            outcomes = list(pool.map(task, files))
+    else:
+        outcomes = [task(relative) for relative in files]
+    
+    for relative, (content_hash, written, changes) in zip(files, outcomes):
+        if changes is None:
+            result.skipped.append(relative)
+            continue
+        result.compressed.append(relative)
+        manifest.record(relative, content_hash, relative)
+        manifest.pages[relative].update(requested=encodings, written=written)
+        for status, sidecar in changes:
+            result.changes[status].append(os.path.relpath(sidecar, output_dir))
+    
+    # Sidecars left behind by files that were removed
+    existing = set(files)
+    for sidecar in sidecars:
+        if os.path.splitext(sidecar)[0] not in existing:
+            os.remove(os.path.join(output_dir, sidecar))
+            result.changes["removed"].append(sidecar)
+    for relative in set(manifest.pages) - existing:
+        manifest.forget(relative)
+    
+    for paths in result.changes.values():
+        paths.sort()
+    result.manifest = manifest
+    if save and cache_dir is not None:
+        manifest.save()
+    return result
@@ -1,35 +1,107 @@
 import re
 
 from htmlnode import HTMLNode, LeafNode
+from instrument import stage
 from textnode import TextNode, TextType
 
+def _convert_plain(text_node):
+    return LeafNode(tag=None, value=text_node.text)
+
+def _convert_bold(text_node):
+    return LeafNode(tag="strong", value=text_node.text)
+
+def _convert_italic(text_node):
+    return LeafNode(tag="em", value=text_node.text)
+
+def _convert_code(text_node):
+    return LeafNode(tag="code", value=text_node.text)
+
+def _convert_link(text_node):
+    if text_node.url is None:
+        raise ValueError("Link TextNode must have a URL")
+    return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
+
+def _convert_image(text_node):
+    if text_node.url is None:
+        raise ValueError("Image TextNode must have a URL")
+    return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
+
+# Dispatch table from TextType to the function building its HTMLNode.
+TEXT_TYPE_CONVERTERS = {
+    TextType.PLAIN: _convert_plain,
+    TextType.BOLD: _convert_bold,
+    TextType.ITALIC: _convert_italic,
+    TextType.CODE: _convert_code,
+    TextType.LINK: _convert_link,
+    TextType.IMAGE: _convert_image,
+}
+
+
+def register_text_type_converter(text_type, converter):
+    """Registers (or replaces) the converter used for a TextType.
+
+    Args:
+        text_type (TextType): The text type the converter handles.
+        converter (Callable[[TextNode], HTMLNode]): Builds the HTMLNode for
+            a TextNode of `text_type`.
+    """
+    
+    TEXT_TYPE_CONVERTERS[text_type] = converter
+
+
+@stage("convert")
 def convert_textnode_to_htmlnode(text_node):
     if not isinstance(text_node, TextNode):
         raise ValueError("Input must be an instance of TextNode")
     
-    if text_node.text_type == TextType.PLAIN:
-        return LeafNode(tag=None, value=text_node.text)
-    
-    elif text_node.text_type == TextType.BOLD:
-        return LeafNode(tag="strong", value=text_node.text)
-    
-    elif text_node.text_type == TextType.ITALIC:
-        return LeafNode(tag="em", value=text_node.text)
-    
-    elif text_node.text_type == TextType.LINK:
-        if text_node.url is None:
-            raise ValueError("Link TextNode must have a URL")
-        return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
+    converter = TEXT_TYPE_CONVERTERS.get(text_node.text_type)
+    if converter is None:
+        raise ValueError(f"Unsupported TextType: {text_node.text_type}")
     
-    elif text_node.text_type == TextType.IMAGE:
-        if text_node.url is None:
-            raise ValueError("Image TextNode must have a URL")
-        return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
+    return converter(text_node)
+
+
+@stage("convert")
+def convert_textnodes_to_htmlnodes(text_nodes):
+    """Converts a list of TextNodes into a list of HTMLNodes in one loop.
+
+    Each node is validated and then dispatched straight through the
+    converter table in the same pass, so any iterable of nodes (a generator
+    included) is read only once.
+
+    Args:
+        text_nodes (Iterable[TextNode]): The nodes to convert, e.g. a whole
+            page's inline nodes.
+
+    Raises:
+        ValueError: If any item is not a TextNode or has an unsupported
+            TextType, or a link/image node has no URL.
+
+    Returns:
+        List[HTMLNode]: The converted nodes, in the same order.
+    """
     
-    else:
-        raise ValueError(f"Unsupported TextType: {text_node.text_type}")
+    converters = TEXT_TYPE_CONVERTERS
+    html_nodes = []
+    for node in text_nodes:
+        if not isinstance(node, TextNode):
+            raise ValueError("Input must be a list of TextNode instances")
+        converter = converters.get(node.text_type)
+        if converter is None:
+            raise ValueError(f"Unsupported TextType: {node.text_type}")
+        html_nodes.append(converter(node))
+    return html_nodes
     
     
+# Compiled once at import so the extractors and splitters never depend on
+# the re module's internal pattern cache.
+INLINE_PATTERNS = {
+    "image": re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"),
+    "link": re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"),
+}
+
+
+@stage("extract")
 def extract_markdown_images(text):
     """Takes raw markdown text and returns a list of tuples. 
     Each tuple should contain the alt text and the URL of any markdown images. 
@@ -41,10 +113,11 @@ def extract_markdown_images(text):
         List[Tuple]: Returns a list of tuples with (alt_text, url) for each image found.
     """
     
-    results = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    results = INLINE_PATTERNS["image"].findall(text)
     return results
 
 
+@stage("extract")
 def extract_markdown_links(text):
     """Takes raw markdown text and returns a list of tuples. 
     Each tuple should contain the link text and the URL of any markdown links. 
@@ -56,5 +129,61 @@ def extract_markdown_links(text):
         link found.
     """
     
-    results = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    return results
\ No newline at end of file
+    results = INLINE_PATTERNS["link"].findall(text)
+    return results
+
+
+def iter_markdown_image_matches(text):
+    """Lazily yields the match object of each markdown image in the text.
+    
+    Args:
+        text (string): Raw markdown text containing image(s).
+
+    Returns:
+        Iterator[re.Match]: Group 1 is the alt text and group 2 the URL.
+    """
+    
+    return INLINE_PATTERNS["image"].finditer(text)
+
+
+def iter_markdown_link_matches(text):
+    """Lazily yields the match object of each markdown link in the text.
+    
+    Args:
+        text (string): Raw markdown text containing link(s).
+
+    Returns:
+        Iterator[re.Match]: Group 1 is the link text and group 2 the URL.
+    """
+    
+    return INLINE_PATTERNS["link"].finditer(text)
+
+
+def iter_markdown_image_spans(text):
+    """Lazily yields the position and contents of each markdown image.
+    
+    Args:
+        text (string): Raw markdown text containing image(s).
+
+    Returns:
+        Iterator[Tuple]: (start, end, alt_text, url) for each image, where
+        text[start:end] is the full image syntax.
+    """
+    
+    for match in INLINE_PATTERNS["image"].finditer(text):
+        yield (match.start(), match.end(), match.group(1), match.group(2))
+
+
+def iter_markdown_link_spans(text):
+    """Lazily yields the position and contents of each markdown link.
+    
+    Args:
+        text (string): Raw markdown text containing link(s).
+
+    Returns:
+        Iterator[Tuple]: (start, end, link_text, url) for each link, where
+        text[start:end] is the full link syntax.
+    """
+    
+    for match in INLINE_PATTERNS["link"].finditer(text):
+        yield (match.start(), match.end(), match.group(1), match.group(2))
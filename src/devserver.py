@@ -0,0 +1,348 @@
+import functools
+import os
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from buildcache import DEFAULT_CACHE_DIR, BuildCache, hash_file
+from assets import image_url_map
+from htmlnode import enable_fragment_cache, get_fragment_cache, use_fragment_cache, use_minify
+from linkgraph import extract_page_links
+from page import get_image_urls, use_image_urls
+from searchindex import extract_page_terms
+from sitebuild import (LINK_GRAPH_NAME, MANIFEST_NAME, SEARCH_INDEX_NAME, build_generator_hash,
+                       build_site, make_render_pool, output_name, render_task)
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + LIVE_RELOAD_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+# Below this many changed pages, rendering in-process beats the IPC cost of
+# handing them to the worker pool.
+PARALLEL_THRESHOLD = 8
+
+# Seconds between keep-alive comments on idle live-reload connections, so
+# closed browser tabs are noticed and their threads released.
+KEEPALIVE_INTERVAL = 15
+
+
+def snapshot_sources(content_dir):
+    """Returns {relative path: (mtime_ns, size)} for every markdown source."""
+    
+    snapshot = {}
+    stack = [content_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.name.endswith(".md"):
+                    st = entry.stat()
+                    snapshot[os.path.relpath(entry.path, content_dir)] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    """Returns the sorted (changed_or_added, removed) sources between snapshots."""
+    
+    changed = sorted(source for source, stat in new.items() if old.get(source) != stat)
+    removed = sorted(source for source in old if source not in new)
+    return changed, removed
+
+
+class ReloadNotifier:
+    """Lets live-reload connections block until the next rebuild."""
+    
+    def __init__(self):
+        self.generation = 0
+        self._condition = threading.Condition()
+        
+    def notify(self):
+        with self._condition:
+            self.generation += 1
+            self._condition.notify_all()
+            
+    def wait(self, generation, timeout):
+        with self._condition:
+            self._condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the output directory, adding live reload to HTML pages."""
+    
+    notifier = None
+    
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self.serve_events()
+            return
+        
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        
+        with open(path, "rb") as f:
+            body = f.read() + LIVE_RELOAD_SCRIPT.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def serve_events(self):
+        # Taken before replying so a rebuild right after connecting isn't missed
+        generation = self.notifier.generation
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        
+        try:
+            while True:
+                current = self.notifier.wait(generation, KEEPALIVE_INTERVAL)
+                if current != generation:
+                    self.wfile.write(b"data: reload\n\n")
+                    generation = current
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        
+    def log_message(self, format, *args):
+        pass
+
+
+class SiteWatcher:
+    """Keeps a built site up to date as its sources change.
+
+    The build manifest, imported pipeline modules, fragment cache and (when
+    `jobs` > 1) a process pool all stay in memory between polls, so a single
+    saved file is re-rendered in-process without any start-up cost.
+
+    The site's LinkGraph, and with `search` its SearchIndex, are kept up to
+    date with the pages as they are rendered and removed, and saved with
+    the manifest on `close`, so a later build that skips those pages still
+    checks their current links and finds their current text. Without
+    `search`, a search index kept by an earlier build is dropped once a page
+    changes, so the next build with search rebuilds it.
+
+    `static_dir`, `link_assets`, `fingerprint` and `minify` are passed to
+    `build_site`, and pages rebuilt later are rendered with the same image
+    URLs and minification. Static assets are only copied by `start`.
+    """
+    
+    def __init__(self, content_dir, output_dir, cache_dir=DEFAULT_CACHE_DIR, jobs=1,
+                 fragment_cache_size=None, template_path=None, search=False, static_dir=None,
+                 link_assets=False, fingerprint=False, minify=False):
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.cache_dir = cache_dir
+        self.jobs = jobs
+        self.fragment_cache_size = fragment_cache_size
+        self.template_path = template_path
+        self.search = search
+        self.static_dir = static_dir
+        self.link_assets = link_assets
+        self.fingerprint = fingerprint
+        self.minify = minify
+        # Fingerprinted image URLs of the initial build, if any
+        self.image_urls = None
+        self.cache = None
+        self.links = None
+        self.search_index = None
+        self.snapshot = {}
+        # Whether any page was rendered or removed since `start`
+        self.changed = False
+        self._pool = None
+        # Render settings of this process to put back on `close`
+        self._previous = None
+    
+    def start(self):
+        result = build_site(self.content_dir, self.output_dir, cache_dir=self.cache_dir,
+                            jobs=self.jobs, fragment_cache_size=self.fragment_cache_size,
+                            static_dir=self.static_dir, link_assets=self.link_assets,
+                            fingerprint=self.fingerprint, template_path=self.template_path,
+                            minify=self.minify, search=self.search)
+        if self.fingerprint and result.assets is not None:
+            self.image_urls = image_url_map(result.assets.outputs)
+        if self.cache_dir is not None:
+            generator_hash = build_generator_hash(self.image_urls, self.template_path, self.minify)
+            self.cache = BuildCache(os.path.join(self.cache_dir, MANIFEST_NAME), generator_hash).load()
+        else:
+            # Still track the pages just built in memory, so files touched
+            # but unchanged are skipped and removed sources lose their output
+            self.cache = BuildCache(None)
+            for source in result.rendered:
+                self.cache.record(source, hash_file(os.path.join(self.content_dir, source)),
+                                  output_name(source))
+        self.links = result.links
+        self.search_index = result.search
+        self._previous = (get_fragment_cache(), get_image_urls(), use_minify(self.minify))
+        if self.fragment_cache_size:
+            enable_fragment_cache(self.fragment_cache_size)
+        use_image_urls(self.image_urls)
+        self.snapshot = snapshot_sources(self.content_dir)
+        return result
+    
+    def poll(self):
+        """Rebuilds whatever changed since the last poll.
+
+        Returns:
+            Tuple[List[str], List[str], Dict[str, Exception]]: The sources
+            rendered, the sources removed, and the sources that failed to
+            render with their errors.
+        """
+        
+        snapshot = snapshot_sources(self.content_dir)
+        changed, removed = diff_snapshots(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        
+        tasks = []
+        records = []
+        for source in changed:
+            source_path = os.path.join(self.content_dir, source)
+            try:
+                content_hash = hash_file(source_path)
+            except FileNotFoundError:
+                continue
+            output = output_name(source)
+            output_path = os.path.join(self.output_dir, output)
+            # Saving without editing only touches the mtime
+            if self.cache.is_fresh(source, content_hash, output_path):
+                continue
+            tasks.append((source_path, output_path, self.template_path))
+            records.append((source, content_hash, output))
+        
+        errors = {}
+        rendered = []
+        for (source, content_hash, output), error in zip(records, self._render(tasks)):
+            if error is None:
+                self.cache.record(source, content_hash, output)
+                self._scan(source, output)
+                rendered.append(source)
+            else:
+                errors[source] = error
+        
+        for source in removed:
+            self.links.remove_page(source)
+            if self.search_index is not None:
+                self.search_index.remove_page(source)
+            entry = self.cache.forget(source)
+            if entry is not None:
+                stale_path = os.path.join(self.output_dir, entry["output"])
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+        
+        if rendered or removed:
+            self.changed = True
+            if self.search_index is not None and self.search_index.dirty:
+                self.search_index.write(self.output_dir)
+        return rendered, removed, errors
+    
+    def _scan(self, source, output):
+        # Updates the link graph and search index with a rendered page
+        source_path = os.path.join(self.content_dir, source)
+        with open(source_path, "r", encoding="utf-8") as f:
+            self.links.set_page(source, *extract_page_links(f))
+        if self.search_index is not None:
+            with open(source_path, "r", encoding="utf-8") as f:
+                title, terms = extract_page_terms(f)
+            self.search_index.set_page(source, output.replace(os.sep, "/"), title, terms)
+    
+    def _render(self, tasks):
+        # Yields None or the exception raised, for each task in order. Each
+        # page fails on its own so one half-typed file can't block the rest.
+        if self.jobs > 1 and len(tasks) >= PARALLEL_THRESHOLD:
+            if self._pool is None:
+                self._pool = make_render_pool(self.jobs, self.fragment_cache_size, self.image_urls,
+                                              self.minify)
+            futures = [self._pool.submit(render_task, task) for task in tasks]
+            for future in futures:
+                yield future.exception()
+            return
+        
+        for task in tasks:
+            try:
+                render_task(task)
+            except Exception as e:
+                yield e
+            else:
+                yield None
+                
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._previous is not None:
+            fragment_cache, image_urls, minify = self._previous
+            use_fragment_cache(fragment_cache)
+            use_image_urls(image_urls)
+            use_minify(minify)
+            self._previous = None
+        if self.cache is not None and self.cache_dir is not None:
+            self.cache.save()
+            if self.links.dirty:
+                self.links.save(os.path.join(self.cache_dir, LINK_GRAPH_NAME))
+            search_path = os.path.join(self.cache_dir, SEARCH_INDEX_NAME)
+            if self.search_index is not None:
+                if self.changed:
+                    self.search_index.save(search_path)
+            elif self.changed and os.path.exists(search_path):
+                os.remove(search_path)
+
+
+def serve(content_dir, output_dir, host="127.0.0.1", port=8000, interval=0.1,
+          cache_dir=DEFAULT_CACHE_DIR, jobs=1, fragment_cache_size=None, template_path=None,
+          search=False, static_dir=None, link_assets=False, fingerprint=False, minify=False):
+    """Builds the site, serves it, and rebuilds changed pages until interrupted.
+
+    Sources are polled every `interval` seconds. After each rebuild every
+    open page is told to reload over server-sent events. The build options
+    are those of `SiteWatcher`.
+    """
+    
+    watcher = SiteWatcher(content_dir, output_dir, cache_dir=cache_dir, jobs=jobs,
+                          fragment_cache_size=fragment_cache_size, template_path=template_path,
+                          search=search, static_dir=static_dir, link_assets=link_assets,
+                          fingerprint=fingerprint, minify=minify)
+    result = watcher.start()
+    print(f"Built {len(result.rendered)} page(s), {len(result.skipped)} unchanged")
+    
+    notifier = ReloadNotifier()
+    handler = type("Handler", (DevRequestHandler,), {"notifier": notifier})
+    server = ThreadingHTTPServer((host, port), functools.partial(handler, directory=output_dir))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {output_dir} at http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    
+    try:
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            rendered, removed, errors = watcher.poll()
+            for source, error in errors.items():
+                print(f"Error in {source}: {error}", file=sys.stderr)
+            if rendered or removed:
+                notifier.notify()
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"Rebuilt {len(rendered)}, removed {len(removed)} page(s) in {elapsed:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        watcher.close()
@@ -1,54 +1,387 @@
+import hashlib
+import re
+from collections import OrderedDict
+
+from instrument import stage
+
+
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_ATTR_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+def escape_html_text(text):
+    # Most text has nothing to escape; the substring checks run in C and
+    # let it through without building a new string
+    if "&" in text or "<" in text or ">" in text:
+        return text.translate(_TEXT_ESCAPES)
+    return text
+
+def escape_html_attr(value):
+    value = str(value)
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        return value.translate(_ATTR_ESCAPES)
+    return value
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Elements whose whitespace is significant and never minified
+PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "textarea", "script", "style"))
+
+def collapse_whitespace(text):
+    if "  " in text or "\n" in text or "\t" in text or "\r" in text or "\f" in text:
+        return _WHITESPACE_RE.sub(" ", text)
+    return text
 
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "_props", "_props_html", "_digest")
+    
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
         
+    @property
+    def props(self):
+        return self._props
+    
+    @props.setter
+    def props(self, props):
+        # The serialized attributes (and the node's structural_hash) are
+        # cached until props is reassigned; mutating the dict in place does
+        # not invalidate them
+        self._props = props
+        self._props_html = None
+        self._digest = None
+        
     def to_html(self):
         raise NotImplementedError("Subclasses should implement this method")
     
+    def iter_html(self):
+        # Default: a node renders as a single fragment
+        yield self.to_html()
+        
+    @stage("render")
+    def render_to(self, fileobj):
+        # Returns the number of characters written
+        write = fileobj.write
+        written = 0
+        for fragment in self.iter_html():
+            write(fragment)
+            written += len(fragment)
+        return written
+    
     def props_to_html(self):
-        if self.props is not None:
-            props_str = " ".join(f"{key}=\"{value}\"" for key, value in self.props.items())
-            return " " + props_str
-        else:
-            return ""
+        props_html = self._props_html
+        if props_html is None:
+            if self._props is not None:
+                props_str = " ".join(f"{key}=\"{escape_html_attr(value)}\"" for key, value in self._props.items())
+                props_html = " " + props_str
+            else:
+                props_html = ""
+            self._props_html = props_html
+        return props_html
     
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value='{self.value}', children={self.children}, props=<{self.props_to_html().strip()}>)"
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, props=props)
         
     def to_html(self):
+        return self._html(self.value)
+    
+    def _html(self, value):
         
         # Image special case
         if self.tag == "img":
             props_str = self.props_to_html()
             return f"<{self.tag}{props_str}>"
         
-        if self.value is None:
+        if value is None:
             raise ValueError("LeafNode must have a value to convert to HTML")
         if self.tag is None:
-            return self.value
+            return escape_html_text(value)
         
         props_str = self.props_to_html()
-        return f"<{self.tag}{props_str}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{props_str}>{escape_html_text(value)}</{self.tag}>"
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, children=children, props=props)
         
-    def to_html(self):
+    @stage("render")
+    def to_html(self, cache_root=True):
+        return "".join(self.iter_html(cache_root))
+    
+    def _open_tag(self):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag to convert to HTML")
         
         if self.children is None:
             raise ValueError("ParentNode must have children to convert to HTML")
         
-        props_str = self.props_to_html()
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{props_str}>{children_html}</{self.tag}>"
\ No newline at end of file
+        return f"<{self.tag}{self.props_to_html()}>"
+    
+    def iter_html(self, cache_root=True):
+        # `cache_root` False keeps this node itself out of the fragment
+        # cache, e.g. for a page's own "div", which no other page shares
+        if _minify:
+            yield from self._iter_html_minified()
+            return
+        if _fragment_cache is not None:
+            yield from self._iter_html_cached(_fragment_cache, cache_root)
+            return
+        
+        # Walk the tree with an explicit stack instead of recursing, so deep
+        # nesting can't hit the recursion limit and each fragment is produced
+        # exactly once. The stack holds nodes still to render and the closing
+        # tags of parents that are currently open.
+        yield self._open_tag()
+        stack = [f"</{self.tag}>"]
+        stack.extend(reversed(self.children))
+        
+        while stack:
+            item = stack.pop()
+            
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, ParentNode):
+                yield item._open_tag()
+                stack.append(f"</{item.tag}>")
+                stack.extend(reversed(item.children))
+            else:
+                yield from item.iter_html()
+                
+    def _iter_html_minified(self):
+        # Same walk as iter_html, collapsing each run of whitespace in leaf
+        # text to one space, except inside PRESERVE_WHITESPACE_TAGS. The
+        # stack also holds a None marker after each preserving element's
+        # closing tag so the walk knows when it has left it. The fragment
+        # cache is not used, since its entries are not minified.
+        yield self._open_tag()
+        preserving = 1 if self.tag in PRESERVE_WHITESPACE_TAGS else 0
+        stack = [f"</{self.tag}>"]
+        stack.extend(reversed(self.children))
+        
+        while stack:
+            item = stack.pop()
+            
+            if item is None:
+                preserving -= 1
+            elif isinstance(item, str):
+                yield item
+            elif isinstance(item, ParentNode):
+                yield item._open_tag()
+                if item.tag in PRESERVE_WHITESPACE_TAGS:
+                    preserving += 1
+                    stack.append(None)
+                stack.append(f"</{item.tag}>")
+                stack.extend(reversed(item.children))
+            elif preserving or not isinstance(item, LeafNode) or item.tag in PRESERVE_WHITESPACE_TAGS:
+                yield from item.iter_html()
+            else:
+                value = item.value
+                yield item._html(collapse_whitespace(value) if value is not None else None)
+                
+    def _iter_html_cached(self, cache, cache_root):
+        # Same walk as iter_html, but each ParentNode outside a captured
+        # subtree is looked up in the fragment cache by its structural hash
+        # first. A miss the cache admits (see `FragmentCache.admit`) has its
+        # fragments captured as they are produced and stored once its
+        # closing tag has been emitted. Subtrees inside a capture are only
+        # walked, so each fragment is captured once.
+        structural_hash(self)
+        
+        if cache_root:
+            stack = [self]
+        else:
+            yield self._open_tag()
+            stack = [f"</{self.tag}>"]
+            stack.extend(reversed(self.children))
+        # The fragments of the subtree being captured, if any
+        captured = None
+        
+        while stack:
+            item = stack.pop()
+            
+            if isinstance(item, tuple):
+                # End of the captured subtree: (key,)
+                cache.put(item[0], "".join(captured))
+                captured = None
+                continue
+            
+            if isinstance(item, str):
+                fragments = (item,)
+            elif isinstance(item, ParentNode):
+                html = None
+                if captured is None:
+                    key = item._digest or structural_hash(item)
+                    html = cache.get(key)
+                    if html is None and cache.admit(key):
+                        captured = []
+                        stack.append((key,))
+                if html is not None:
+                    fragments = (html,)
+                else:
+                    stack.append(f"</{item.tag}>")
+                    stack.extend(reversed(item.children))
+                    fragments = (item._open_tag(),)
+            else:
+                fragments = item.iter_html()
+            
+            for fragment in fragments:
+                if captured is not None:
+                    captured.append(fragment)
+                yield fragment
+
+
+def _node_key(node):
+    # Everything that sets a node's HTML apart; a ParentNode's children are
+    # described inline, by their digest if they are ParentNodes themselves
+    props = tuple(node.props.items()) if node.props else None
+    if not isinstance(node, ParentNode):
+        return (type(node).__name__, node.tag, node.value, props)
+    children = node.children
+    if children is not None:
+        children = tuple(child._digest if isinstance(child, ParentNode) else _node_key(child)
+                         for child in children)
+    return (type(node).__name__, node.tag, props, children)
+
+
+def structural_hash(node):
+    """Returns a digest identifying a subtree by its tags, values and props.
+
+    Structurally identical subtrees hash the same no matter which objects
+    they are built from. Only ParentNodes are hashed on their own; leaves
+    are folded into their parent's digest. Each ParentNode keeps its digest,
+    so rendering a tree again (or a subtree of one already hashed) does not
+    hash it again. Like the serialized props, a kept digest is only reset
+    when the node's props are reassigned, so a tree must not be changed in
+    place once hashed.
+    """
+    
+    if not isinstance(node, ParentNode):
+        return hashlib.blake2b(repr(_node_key(node)).encode(), digest_size=16).digest()
+    if node._digest is not None:
+        return node._digest
+    
+    # ParentNodes without a digest yet, each before its descendants; hashed
+    # in reverse so every child's digest is ready before its parent's
+    pending = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if item._digest is None:
+            pending.append(item)
+            if item.children:
+                stack.extend(child for child in item.children if isinstance(child, ParentNode))
+    
+    blake2b = hashlib.blake2b
+    for item in reversed(pending):
+        item._digest = blake2b(repr(_node_key(item)).encode(), digest_size=16).digest()
+    return node._digest
+
+
+# Digests of subtrees seen once that a FragmentCache remembers, per entry
+SEEN_PER_ENTRY = 16
+
+
+class FragmentCache:
+    """LRU cache of rendered HTML keyed on `structural_hash` digests.
+
+    Only subtrees that missed once before are admitted, so the unique
+    paragraphs of each page don't evict the subtrees pages share.
+    """
+    
+    def __init__(self, maxsize=1024):
+        if maxsize <= 0:
+            raise ValueError("FragmentCache maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Digests that missed once, oldest first
+        self._seen = OrderedDict()
+        
+    def __len__(self):
+        return len(self._entries)
+        
+    def get(self, key):
+        html = self._entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return html
+    
+    def admit(self, key):
+        """Tells whether a subtree that missed is worth storing.
+
+        It is once it has missed before; the first miss is only remembered.
+        """
+        
+        if self._seen.pop(key, False) is None:
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.maxsize * SEEN_PER_ENTRY:
+            self._seen.popitem(last=False)
+        return False
+    
+    def put(self, key, html):
+        self._entries[key] = html
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            
+    def clear(self):
+        self._entries.clear()
+        self._seen.clear()
+        self.hits = 0
+        self.misses = 0
+        
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+
+_fragment_cache = None
+
+def use_fragment_cache(cache):
+    """Sets the FragmentCache used by ParentNode rendering (None disables)."""
+    
+    global _fragment_cache
+    _fragment_cache = cache
+    return cache
+
+def enable_fragment_cache(maxsize=1024):
+    """Turns on memoization of ParentNode subtrees and returns the cache."""
+    
+    return use_fragment_cache(FragmentCache(maxsize))
+
+def disable_fragment_cache():
+    use_fragment_cache(None)
+
+def get_fragment_cache():
+    return _fragment_cache
+
+
+_minify = False
+
+def use_minify(enabled):
+    """Turns whitespace minifying of ParentNode rendering on or off.
+
+    When on, runs of whitespace in text are collapsed to a single space,
+    as a browser would display them, outside elements such as "pre" where
+    whitespace matters. Returns the previous setting.
+    """
+    
+    global _minify
+    previous = _minify
+    _minify = bool(enabled)
+    return previous
@@ -0,0 +1,227 @@
+import re
+
+from convertnode import INLINE_PATTERNS
+from htmlnode import LeafNode, ParentNode
+from instrument import stage
+
+_TOKEN_RE = re.compile(r"!\[|\]\(|\[|`|\*\*\*(?!\*)|\*\*|\*|_")
+
+# Emphasis delimiters and the elements they produce
+_DELIMITER_TAGS = {
+    "**": "strong",
+    "*": "em",
+    "_": "em",
+}
+
+# Marker of a "[" that can no longer start a link, since links can't nest
+_INACTIVE_LINK = ""
+
+
+def _finish(children):
+    # Merges runs of plain text (kept as strings while parsing) into leaves.
+    # Children of unwound openers arrive as nested lists and are flattened
+    # here, once, without recursing.
+    nodes = []
+    text = []
+    pending = [iter(children)]
+    while pending:
+        for child in pending[-1]:
+            if isinstance(child, list):
+                pending.append(iter(child))
+                break
+            if isinstance(child, str):
+                text.append(child)
+                continue
+            if text:
+                nodes.append(LeafNode(None, "".join(text)))
+                text.clear()
+            nodes.append(child)
+        else:
+            pending.pop()
+    if text:
+        nodes.append(LeafNode(None, "".join(text)))
+    return nodes
+
+
+def _element(tag, children, props=None):
+    nodes = _finish(children)
+    # Plain content needs no ParentNode, e.g. **bold** -> <strong>bold</strong>
+    if not nodes:
+        return LeafNode(tag, "", props)
+    if len(nodes) == 1 and nodes[0].tag is None and isinstance(nodes[0], LeafNode):
+        return LeafNode(tag, nodes[0].value, props)
+    return ParentNode(tag, nodes, props)
+
+
+def _pop(stack, openers):
+    # Pops the top frame, which is the last open frame of its marker
+    marker, children, literal = stack.pop()
+    indices = openers.get(marker)
+    if indices:
+        indices.pop()
+    return children, literal
+
+
+def _unwind(stack, openers):
+    # An opener that was never closed is literal text after all. Its
+    # children are handed up as one list rather than copied, so unwinding
+    # deeply nested openers stays linear.
+    children, literal = _pop(stack, openers)
+    parent = stack[-1][1]
+    parent.append(literal)
+    parent.append(children)
+
+
+def _close(stack, openers, index, tag, props=None):
+    # Closes the frame at `index`; anything opened inside it and still open
+    # is mis-nested and becomes literal text. Returns the parent's children.
+    while len(stack) - 1 > index:
+        _unwind(stack, openers)
+    children, literal = _pop(stack, openers)
+    parent = stack[-1][1]
+    parent.append(_element(tag, children, props))
+    return parent
+
+
+def _split_run(token, openers):
+    # A "***" run is a "**" and a "*" delimiter. It closes whichever of the
+    # two was opened last first, and otherwise opens "*" outside "**", so
+    # "***both***" is <em><strong>both</strong></em>.
+    if token != "***":
+        return (token,)
+    em = openers.get("*")
+    strong = openers.get("**")
+    if strong and (not em or strong[-1] > em[-1]):
+        return ("**", "*")
+    return ("*", "**")
+
+
+def _find_from(text, char, start, found):
+    # text.find for scans whose start only moves forward: the last hit is
+    # remembered, so repeated searches for a far (or missing) character
+    # don't rescan the rest of the text each time
+    index = found.get(char)
+    if index is None or -1 < index < start:
+        index = text.find(char, start)
+        found[char] = index
+    return index
+
+
+@stage("inline")
+def parse_inline(text, strict=False):
+    """
+    Parse inline markdown straight into HTMLNodes, with nesting, in one pass.
+
+    Supports the same syntax as `text_to_textnodes`:
+
+        - `code`             -> <code>, contents taken literally
+        - **bold**           -> <strong>
+        - _italic_, *italic* -> <em>
+        - ***both***         -> <em><strong>
+        - ![alt](url)        -> <img>, alt text taken literally
+        - [text](url)        -> <a>
+
+    but emphasis and links may contain each other, e.g.
+    "**bold [link _em_](/a)**". The text is scanned once from left to
+    right. Openers are pushed on a stack of frames, each collecting the
+    nodes parsed inside it; a closing delimiter pops back to its opener and
+    the frame becomes a node in its parent. A delimiter closes the nearest
+    open one of the same kind, and anything still open inside it is
+    mis-nested and turned back into literal text. Links can't contain
+    links, so "[" openers before a completed link become literal too.
+    Open frames are indexed by marker and unclosed ones are handed up
+    without copying, so the pass stays linear even for input like
+    thousands of unclosed "[".
+
+    Elements whose content is plain text are LeafNodes and others are
+    ParentNodes, so un-nested markup gives the same tree as converting
+    `text_to_textnodes`. Empty plain text is dropped.
+
+    Args:
+        text (str):
+            Raw markdown text containing inline formatting.
+        strict (bool):
+            Raise on an emphasis or code delimiter that is never closed,
+            like `text_to_textnodes`, instead of keeping it as text. A
+            "[" or "![" that does not form a link or image is always text.
+
+    Raises:
+        ValueError: In strict mode, if a delimiter has no closing delimiter.
+
+    Returns:
+        List[HTMLNode]:
+            The nodes for the text, in source order.
+    """
+    
+    root = []
+    # Frames of [marker, children, literal text of the opener]
+    stack = [[None, root, ""]]
+    # Marker -> stack indices of its open frames, innermost last
+    openers = {}
+    found = {}
+    children = root
+    plain_start = 0
+    pos = 0
+    
+    while True:
+        token_match = _TOKEN_RE.search(text, pos)
+        if token_match is None:
+            break
+        
+        start = token_match.start()
+        token = token_match.group()
+        end = token_match.end()
+        if start > plain_start:
+            children.append(text[plain_start:start])
+        
+        if token == "`":
+            close = _find_from(text, "`", end, found)
+            if close == -1:
+                if strict:
+                    raise ValueError(f"Unmatched delimiter '`' in text: {text}")
+                children.append(token)
+            else:
+                children.append(LeafNode("code", text[end:close]))
+                end = close + 1
+        
+        elif token == "![":
+            match = INLINE_PATTERNS["image"].match(text, start)
+            if match is None:
+                children.append(token)
+            else:
+                children.append(LeafNode("img", "", {"src": match.group(2), "alt": match.group(1)}))
+                end = match.end()
+        
+        elif token == "](":
+            indices = openers.get("[")
+            close = _find_from(text, ")", end, found) if indices else -1
+            if close == -1 or -1 < _find_from(text, "(", end, found) < close:
+                # Not a link after all; the "[" may still close later
+                children.append(token)
+            else:
+                children = _close(stack, openers, indices[-1], "a", {"href": text[end:close]})
+                end = close + 1
+                for index in openers.pop("["):
+                    stack[index][0] = _INACTIVE_LINK
+        
+        else:
+            for marker in _split_run(token, openers):
+                indices = openers.get(marker)
+                if marker == "[" or not indices:
+                    stack.append([marker, [], marker])
+                    openers.setdefault(marker, []).append(len(stack) - 1)
+                    children = stack[-1][1]
+                else:
+                    children = _close(stack, openers, indices[-1], _DELIMITER_TAGS[marker])
+        
+        plain_start = pos = end
+    
+    if plain_start < len(text):
+        children.append(text[plain_start:])
+    
+    while len(stack) > 1:
+        if strict and stack[-1][0] in _DELIMITER_TAGS:
+            raise ValueError(f"Unmatched delimiter '{stack[-1][0]}' in text: {text}")
+        _unwind(stack, openers)
+    
+    return _finish(root)
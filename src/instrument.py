@@ -0,0 +1,205 @@
+"""Per-stage build instrumentation.
+
+Pipeline functions are decorated with `stage(name)`. Unless instrumentation
+has been installed (by calling `install()` before the pipeline modules are
+imported, or by setting SSGEN_INSTRUMENT=1) the decorator returns the
+function unchanged, so normal builds pay nothing for it at all.
+Once enabled, each stage records its own wall time (excluding time spent in
+other stages it calls), call count, the number of
+nodes it produced and the characters of HTML it emitted, optionally per
+page.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+ENV_VAR = "SSGEN_INSTRUMENT"
+
+_installed = os.environ.get(ENV_VAR) == "1"
+_recorder = None
+
+
+class StageStats:
+    __slots__ = ("calls", "seconds", "nodes", "chars")
+    
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.nodes = 0
+        self.chars = 0
+        
+    def add(self, calls, seconds, nodes, chars):
+        self.calls += calls
+        self.seconds += seconds
+        self.nodes += nodes
+        self.chars += chars
+        
+    def as_list(self):
+        return [self.calls, self.seconds, self.nodes, self.chars]
+
+
+class Recorder:
+    def __init__(self, per_page=False):
+        self.per_page = per_page
+        self.stages = {}
+        self.pages = {}
+        self.current_page = None
+        # Stages currently on the call stack; nested calls into the same
+        # stage are not timed twice
+        self.active = set()
+        # Time spent in nested stages for each open stage, so every stage
+        # records only its own (exclusive) time
+        self.child_seconds = []
+        
+    def record(self, stage, seconds, nodes=0, chars=0, calls=1):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.add(calls, seconds, nodes, chars)
+        
+        if self.per_page and self.current_page is not None:
+            page_stages = self.pages.setdefault(self.current_page, {})
+            stats = page_stages.get(stage)
+            if stats is None:
+                stats = page_stages[stage] = StageStats()
+            stats.add(calls, seconds, nodes, chars)
+            
+    def as_dict(self):
+        return {
+            "stages": {name: stats.as_list() for name, stats in self.stages.items()},
+            "pages": {page: {name: stats.as_list() for name, stats in stages.items()}
+                      for page, stages in self.pages.items()},
+        }
+    
+    def merge(self, data):
+        """Adds the stats from another Recorder's `as_dict`, e.g. a worker's."""
+        
+        for name, (calls, seconds, nodes, chars) in data["stages"].items():
+            self.stages.setdefault(name, StageStats()).add(calls, seconds, nodes, chars)
+        for page, stages in data["pages"].items():
+            page_stages = self.pages.setdefault(page, {})
+            for name, (calls, seconds, nodes, chars) in stages.items():
+                page_stages.setdefault(name, StageStats()).add(calls, seconds, nodes, chars)
+                
+    def summary_table(self, top_pages=10):
+        lines = [f"{'stage':<12}{'calls':>10}{'seconds':>12}{'nodes':>12}{'html chars':>14}"]
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds):
+            if name != "page":
+                lines.append(f"{name:<12}{stats.calls:>10}{stats.seconds:>12.4f}{stats.nodes:>12}{stats.chars:>14}")
+        
+        # Pages are timed whole, so their time includes the stages above
+        # and is not added to them
+        page_stats = self.stages.get("page")
+        if page_stats is not None:
+            lines.append("")
+            lines.append(f"{'page':<12}{page_stats.calls:>10}{page_stats.seconds:>12.4f}"
+                         "  (wall time, including the stages above)")
+        
+        if self.pages:
+            totals = sorted(((stages["page"].seconds if "page" in stages else 0.0, page)
+                             for page, stages in self.pages.items()), reverse=True)
+            lines.append("")
+            lines.append(f"slowest pages (top {min(top_pages, len(totals))} of {len(totals)}):")
+            for seconds, page in totals[:top_pages]:
+                lines.append(f"  {seconds:>10.4f}s  {page}")
+        return "\n".join(lines)
+
+
+def _measure(result):
+    # Lists count as produced nodes, as does a single node (anything with
+    # `iter_html`, e.g. the ParentNode of a block), strings as emitted
+    # HTML, and integers as a count of characters written elsewhere (see
+    # HTMLNode.render_to)
+    if isinstance(result, list):
+        return len(result), 0
+    if isinstance(result, str):
+        return 0, len(result)
+    if isinstance(result, int):
+        return 0, result
+    if hasattr(result, "iter_html"):
+        return 1, 0
+    return 0, 0
+
+
+def install():
+    """Makes `stage` wrap the functions it decorates from now on.
+
+    Only modules imported after this call are instrumented. The environment
+    variable is set as well so that worker processes started afterwards
+    instrument their imports too.
+    """
+    
+    global _installed
+    _installed = True
+    os.environ[ENV_VAR] = "1"
+
+def is_installed():
+    return _installed
+
+
+def stage(name):
+    """Decorator attributing a function's calls to the named stage."""
+    
+    def decorator(func):
+        if not _installed:
+            return func
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None or name in recorder.active:
+                return func(*args, **kwargs)
+            
+            recorder.active.add(name)
+            recorder.child_seconds.append(0.0)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                recorder.active.discard(name)
+                nested = recorder.child_seconds.pop()
+                if recorder.child_seconds:
+                    recorder.child_seconds[-1] += elapsed
+            nodes, chars = _measure(result)
+            recorder.record(name, elapsed - nested, nodes, chars)
+            return result
+        return wrapper
+    return decorator
+
+
+def enable(per_page=False):
+    global _recorder
+    _recorder = Recorder(per_page=per_page)
+    return _recorder
+
+def disable():
+    global _recorder
+    _recorder = None
+
+def get_recorder():
+    return _recorder
+
+
+@contextmanager
+def page(name):
+    """Attributes the stages run inside the block to page `name`.
+
+    The page's total wall time is recorded under the "page" stage.
+    """
+    
+    recorder = _recorder
+    if recorder is None:
+        yield
+        return
+    
+    previous = recorder.current_page
+    recorder.current_page = name
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.record("page", time.perf_counter() - start)
+        recorder.current_page = previous
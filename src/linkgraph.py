@@ -0,0 +1,332 @@
+import os
+import posixpath
+import sys
+from array import array
+
+from blockparser import iter_block_nodes
+from htmlnode import ParentNode
+from page import split_front_matter
+
+LINK_GRAPH_MAGIC = b"SSLG"
+LINK_GRAPH_VERSION = 1
+
+LINK = "link"
+IMAGE = "image"
+
+# URL prefixes that point outside the site and are not checked
+EXTERNAL_PREFIXES = ("http://", "https://", "//", "mailto:", "tel:", "data:", "#")
+
+
+def extract_node_links(nodes):
+    """Collects the link and image URLs of a page from its block nodes.
+
+    Only the "a" and "img" elements the renderer produced count, so
+    brackets in code spans and code blocks are not links, and a link
+    wrapped across lines is.
+
+    Args:
+        nodes (Iterable[HTMLNode]): The page's blocks, before image URLs
+            are rewritten.
+
+    Returns:
+        Tuple[List[string], List[string]]: The link URLs and image URLs, in
+        order of appearance.
+    """
+    
+    links = []
+    images = []
+    for node in nodes:
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if item.tag == "a" and item.props and "href" in item.props:
+                links.append(item.props["href"])
+            elif item.tag == "img" and item.props and "src" in item.props:
+                images.append(item.props["src"])
+            if isinstance(item, ParentNode):
+                stack.extend(reversed(item.children))
+    return links, images
+
+
+def extract_page_links(lines):
+    """Collects the link and image URLs of a markdown page.
+
+    The page is parsed into blocks by the renderer's own parser (see
+    `extract_node_links`). Front matter is skipped, and lines are read one
+    block at a time.
+
+    Args:
+        lines (Iterable[string]): The page's lines.
+
+    Returns:
+        Tuple[List[string], List[string]]: The link URLs and image URLs, in
+        order of appearance.
+    """
+    
+    _, body = split_front_matter(lines)
+    return extract_node_links(iter_block_nodes(body))
+
+
+class LinkGraph:
+    """Site-wide index of the links and images on every page.
+
+    Each source page maps to the URLs it links to and the image URLs it
+    embeds, exactly as written. The reverse index (which pages point at a
+    URL) is built on first use and dropped whenever a page changes.
+    `dirty` tells whether the graph changed since it was loaded or saved.
+    """
+    
+    def __init__(self):
+        # Source -> (link URLs, image URLs)
+        self.pages = {}
+        self._reverse = None
+        self.dirty = False
+    
+    def __contains__(self, source):
+        return source in self.pages
+    
+    def __len__(self):
+        return len(self.pages)
+    
+    def set_page(self, source, links, images):
+        targets = (tuple(links), tuple(images))
+        if self.pages.get(source) != targets:
+            self.pages[source] = targets
+            self._reverse = None
+            self.dirty = True
+    
+    def remove_page(self, source):
+        if self.pages.pop(source, None) is not None:
+            self._reverse = None
+            self.dirty = True
+    
+    def targets(self, source):
+        """Returns the (link URLs, image URLs) of a page, or None if unknown."""
+        
+        return self.pages.get(source)
+    
+    def sources_linking_to(self, url):
+        """Returns the sorted pages that link to or embed `url`."""
+        
+        if self._reverse is None:
+            reverse = {}
+            for source, (links, images) in self.pages.items():
+                for target in links + images:
+                    reverse.setdefault(target, set()).add(source)
+            self._reverse = reverse
+        return sorted(self._reverse.get(url, ()))
+    
+    def save(self, path):
+        """Writes the graph to `path` in a compact binary format.
+
+        The file holds a header, a string table of every distinct source
+        and URL (newline-separated UTF-8), then one flat array of unsigned
+        32-bit little-endian integers: per page, its source's string index,
+        link count and image count, followed by the string indexes of its
+        links and images. It is written to a temporary file and renamed.
+        """
+        
+        strings = {}
+        
+        def intern(value):
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            return index
+        
+        table = array("I", [len(self.pages)])
+        for source in sorted(self.pages):
+            links, images = self.pages[source]
+            table.extend((intern(source), len(links), len(images)))
+            table.extend(intern(url) for url in links)
+            table.extend(intern(url) for url in images)
+        if sys.byteorder == "big":
+            table.byteswap()
+        blob = "\n".join(strings).encode("utf-8")
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(LINK_GRAPH_MAGIC)
+            f.write(LINK_GRAPH_VERSION.to_bytes(4, "little"))
+            f.write(len(strings).to_bytes(4, "little"))
+            f.write(len(blob).to_bytes(4, "little"))
+            f.write(blob)
+            f.write(table.tobytes())
+        os.replace(tmp_path, path)
+        self.dirty = False
+    
+    @classmethod
+    def load(cls, path):
+        """Reads a graph written by `save`.
+
+        A missing, truncated or outdated file gives an empty graph, as the
+        next build fills it in again.
+        """
+        
+        graph = cls()
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return graph
+        
+        try:
+            if (data[:4] != LINK_GRAPH_MAGIC or
+                    int.from_bytes(data[4:8], "little") != LINK_GRAPH_VERSION):
+                return graph
+            string_count = int.from_bytes(data[8:12], "little")
+            blob_end = 16 + int.from_bytes(data[12:16], "little")
+            strings = data[16:blob_end].decode("utf-8").split("\n") if string_count else []
+            table = array("I")
+            table.frombytes(data[blob_end:])
+            if sys.byteorder == "big":
+                table.byteswap()
+            
+            pages = {}
+            position = 1
+            for _ in range(table[0]):
+                source, link_count, image_count = table[position:position + 3]
+                position += 3
+                links_end = position + link_count
+                images_end = links_end + image_count
+                pages[strings[source]] = (tuple(strings[i] for i in table[position:links_end]),
+                                          tuple(strings[i] for i in table[links_end:images_end]))
+                position = images_end
+        except (IndexError, ValueError, UnicodeDecodeError):
+            return graph
+        graph.pages = pages
+        return graph
+
+
+class BrokenLink:
+    __slots__ = ("source", "url", "kind")
+    
+    def __init__(self, source, url, kind):
+        self.source = source
+        self.url = url
+        self.kind = kind
+    
+    def __eq__(self, other):
+        return (isinstance(other, BrokenLink) and
+                (self.source, self.url, self.kind) == (other.source, other.url, other.kind))
+    
+    def __repr__(self):
+        return f"BrokenLink({self.source}, {self.url}, {self.kind})"
+
+
+def is_external(url):
+    return not url or url.startswith(EXTERNAL_PREFIXES) or ":" in url.split("/", 1)[0]
+
+
+def resolve_url(source, url):
+    """Resolves an internal URL on page `source` to an output-relative path.
+
+    The query and fragment are dropped. Site-absolute URLs ("/a/b.html")
+    are taken from the output root, others relative to the page's
+    directory. Returns None for a URL that leaves the site root.
+    """
+    
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    if path.startswith("/"):
+        path = path.lstrip("/")
+    else:
+        base = posixpath.dirname(source.replace(os.sep, "/"))
+        path = posixpath.join(base, path)
+    trailing_slash = path.endswith("/")
+    path = posixpath.normpath(path) if path else ""
+    if path == ".":
+        path = ""
+    if path.startswith("../") or path == "..":
+        return None
+    if trailing_slash and path:
+        path += "/"
+    return path
+
+
+def _walk_files(output_dir, directory):
+    found = []
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=True):
+                    stack.append(entry.path)
+                else:
+                    found.append(os.path.relpath(entry.path, output_dir).replace(os.sep, "/"))
+    return found
+
+
+def list_output_files(output_dir, jobs=1):
+    """Returns every file under `output_dir` as a "/"-separated relative path.
+
+    Top-level directories are walked in parallel on `jobs` threads, since
+    the walk is almost all system calls that release the GIL.
+    """
+    
+    files = set()
+    directories = []
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=True):
+                directories.append(entry.path)
+            else:
+                files.add(entry.name)
+    
+    if jobs > 1 and len(directories) > 1:
+        # Imported here so that builds which never check links skip it
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for found in pool.map(lambda directory: _walk_files(output_dir, directory), directories):
+                files.update(found)
+    else:
+        for directory in directories:
+            files.update(_walk_files(output_dir, directory))
+    return files
+
+
+def _exists(path, files):
+    # Pretty URLs: "/blog/post" may be served from "blog/post.html", and a
+    # directory from its "index.html"
+    if path.endswith("/") or not path:
+        return path + "index.html" in files
+    return (path in files or path + ".html" in files or path + "/index.html" in files)
+
+
+def check_links(graph, output_dir, jobs=1, extra_paths=()):
+    """Finds internal links and images that point at nothing in `output_dir`.
+
+    The output tree is listed once (see `list_output_files`) and every
+    distinct resolved URL is then looked up in memory, so no page is read
+    and no URL is checked twice.
+
+    Args:
+        graph (LinkGraph): The site's link graph.
+        output_dir (string): The built site.
+        jobs (int): Threads used to list the output tree.
+        extra_paths (Iterable[string]): Other output-relative paths to
+            accept, e.g. the original names of fingerprinted images.
+
+    Returns:
+        List[BrokenLink]: The broken links, ordered by page.
+    """
+    
+    files = list_output_files(output_dir, jobs)
+    files.update(extra_paths)
+    checked = {}
+    broken = []
+    for source in sorted(graph.pages):
+        links, images = graph.pages[source]
+        for kind, urls in ((LINK, links), (IMAGE, images)):
+            for url in urls:
+                if is_external(url):
+                    continue
+                path = resolve_url(source, url)
+                ok = checked.get(path)
+                if ok is None:
+                    ok = checked[path] = path is not None and _exists(path, files)
+                if not ok:
+                    broken.append(BrokenLink(source, url, kind))
+    return broken
@@ -1,5 +1,226 @@
-from textnode import TextNode, TextType
+"""Command-line entry point of the site generator.
+
+    main.py build [options]    render the site (the default without a command)
+    main.py check [options]    build, then report broken internal links
+    main.py watch [options]    serve the site and rebuild pages as they change
+    main.py bench [options]    run the pipeline benchmarks
+
+Only argparse is imported up front. The build, the dev server and the
+instrumentation are imported by the command that needs them, so `--help`
+and no-op incremental builds don't pay for the subsystems they never use.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+COMMANDS = ("build", "check", "watch", "bench")
+
+# Mirrors buildcache.DEFAULT_CACHE_DIR without importing it
+DEFAULT_CACHE_DIR = ".ssgen-cache"
+
+
+def _add_common_options(parser):
+    parser.add_argument("--content", default="content", help="directory of markdown sources")
+    parser.add_argument("--output", default="public", help="directory to write HTML to")
+    parser.add_argument("--template", metavar="PATH",
+                        help="HTML template with {{ Title }}, {{ Content }} and front matter placeholders")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory for the incremental build manifest")
+    parser.add_argument("--no-cache", action="store_true", help="disable incremental builds")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes (0 = one per CPU)")
+    parser.add_argument("--fragment-cache", type=int, default=0, metavar="SIZE",
+                        help="memoize up to SIZE rendered subtrees shared between pages")
+
+
+def _add_output_options(parser):
+    # What the site's output contains, so shared by build and watch
+    parser.add_argument("--static", default="static", help="directory of static assets copied into the output")
+    parser.add_argument("--link-assets", action="store_true", help="hard-link static assets instead of copying them")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="give images content-hashed names and rewrite their URLs")
+    parser.add_argument("--minify", action="store_true", help="collapse whitespace in rendered pages")
+    parser.add_argument("--search", action="store_true",
+                        help="write a sharded search index of the pages to the output's search/ directory")
+
+
+def _add_build_options(parser):
+    _add_common_options(parser)
+    _add_output_options(parser)
+    parser.add_argument("--force", action="store_true", help="re-render every page")
+    parser.add_argument("--in-place", action="store_true",
+                        help="write into the output directory directly instead of swapping in a staged copy")
+    parser.add_argument("--readers", type=int, default=4, help="threads reading and hashing sources")
+    parser.add_argument("--writers", type=int, default=2, help="threads writing output pages")
+    parser.add_argument("--prefetch", type=int, default=64, help="pages buffered between pipeline stages")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz (and .br with brotli installed) copies of HTML, CSS, JS and JSON outputs")
+    parser.add_argument("--stats", action="store_true", help="print per-stage timings of the build")
+    parser.add_argument("--profile", nargs="?", const="ssgen.pstats", metavar="PATH",
+                        help="like --stats, and also write a cProfile stats file (default: ssgen.pstats)")
+    parser.add_argument("--profile-pages", action="store_true",
+                        help="with --stats or --profile, also time each page")
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="ssgen", description="Build the static site.",
+                                     epilog="Without a command, runs build.")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    _add_build_options(commands.add_parser("build", help="render the site"))
+    _add_build_options(commands.add_parser("check", help="build, then report internal links and "
+                                                         "images that point at nothing"))
+    
+    watch = commands.add_parser("watch", help="serve the site and rebuild changed pages with live reload")
+    _add_common_options(watch)
+    _add_output_options(watch)
+    watch.add_argument("--host", default="127.0.0.1", help="address to serve on")
+    watch.add_argument("--port", type=int, default=8000, help="port to serve on")
+    watch.add_argument("--interval", type=float, default=0.1, help="seconds between source polls")
+    
+    # Parsed by the benchmarks themselves, see `main`
+    commands.add_parser("bench", help="benchmark each stage of the rendering pipeline "
+                                      "(see 'bench --help')", add_help=False)
+    return parser
+
+
+def _command_index(argv):
+    # The first command name that isn't an option's value, e.g. "check" in
+    # "--content docs check" but not in "--content check"
+    probe = argparse.ArgumentParser(add_help=False, exit_on_error=False)
+    _add_build_options(probe)
+    for index, arg in enumerate(argv):
+        if arg not in COMMANDS:
+            continue
+        try:
+            probe.parse_known_args(argv[:index])
+        except argparse.ArgumentError:
+            continue
+        return index
+    return None
+
+
+def _normalize_argv(argv):
+    # No command means build. A command after options is moved first, so
+    # they apply to it.
+    if argv and (argv[0] in COMMANDS or argv[0] in ("-h", "--help")):
+        return argv
+    index = _command_index(argv)
+    if index is not None:
+        return [argv[index]] + argv[:index] + argv[index + 1:]
+    return ["build"] + argv
+
+
+def run_build(args, jobs):
+    """Builds the site as `args` say and prints a summary of what changed.
+
+    Returns:
+        BuildResult: The result of `sitebuild.build_site`.
+    """
+    
+    stats = args.stats or args.profile
+    if stats:
+        import instrument
+        # Must happen before the pipeline modules are imported
+        instrument.install()
+    from sitebuild import build_site
+    
+    def build():
+        return build_site(args.content, args.output,
+                          cache_dir=None if args.no_cache else args.cache_dir,
+                          force=args.force,
+                          jobs=jobs,
+                          fragment_cache_size=args.fragment_cache or None,
+                          readers=args.readers,
+                          writers=args.writers,
+                          prefetch=args.prefetch,
+                          atomic=not args.in_place,
+                          static_dir=args.static,
+                          link_assets=args.link_assets,
+                          fingerprint=args.fingerprint,
+                          template_path=args.template,
+                          minify=args.minify,
+                          compress=args.precompress,
+                          search=args.search)
+    
+    start = time.perf_counter()
+    if stats:
+        recorder = instrument.enable(per_page=args.profile_pages)
+        try:
+            if args.profile:
+                import cProfile
+                profiler = cProfile.Profile()
+                # cProfile only sees this process; the stage table includes workers
+                result = profiler.runcall(build)
+                profiler.dump_stats(args.profile)
+            else:
+                result = build()
+        finally:
+            instrument.disable()
+        print(recorder.summary_table())
+        if args.profile:
+            print(f"cProfile stats written to {args.profile}")
+    else:
+        result = build()
+    elapsed = time.perf_counter() - start
+    
+    print(f"Rendered {len(result.rendered)}, skipped {len(result.skipped)}, removed {len(result.removed)} page(s)")
+    if result.assets is not None and (result.assets.copied or result.assets.skipped):
+        assets = result.assets
+        print(f"Copied {len(assets.copied)}, deduplicated {len(assets.deduplicated)}, "
+              f"skipped {len(assets.skipped)} asset(s)")
+    changes = result.changes
+    print(f"Output: {len(changes['added'])} added, {len(changes['modified'])} modified, "
+          f"{len(changes['removed'])} removed")
+    if result.search is not None:
+        print(f"Search index: {len(result.search)} page(s)")
+    if stats:
+        print(f"Built in {elapsed:.3f}s")
+    return result
+
+
+def run_check(args, jobs):
+    """Builds the site, then prints its broken internal links.
+
+    Returns:
+        int: The exit status, 1 if any link is broken.
+    """
+    
+    result = run_build(args, jobs)
+    from linkgraph import check_links
+    extra_paths = result.assets.outputs.keys() if result.assets is not None else ()
+    broken = check_links(result.links, args.output, jobs=jobs, extra_paths=extra_paths)
+    for link in broken:
+        print(f"{link.source}: broken {link.kind} {link.url}")
+    print(f"Checked {len(result.links)} page(s), {len(broken)} broken link(s)")
+    return 1 if broken else 0
+
+
+def run_watch(args, jobs):
+    from devserver import serve
+    serve(args.content, args.output, host=args.host, port=args.port, interval=args.interval,
+          cache_dir=None if args.no_cache else args.cache_dir, jobs=jobs,
+          fragment_cache_size=args.fragment_cache or None, template_path=args.template,
+          search=args.search, static_dir=args.static, link_assets=args.link_assets,
+          fingerprint=args.fingerprint, minify=args.minify)
+    return 0
+
+
+def main(argv=None):
+    argv = _normalize_argv(list(sys.argv[1:] if argv is None else argv))
+    if argv[0] == "bench":
+        # The benchmarks have their own options, passed through untouched
+        from benchmarks.__main__ import main as bench_main
+        return bench_main(argv[1:])
+    
+    args = make_parser().parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    if args.command == "watch":
+        return run_watch(args, jobs)
+    if args.command == "check":
+        return run_check(args, jobs)
+    run_build(args, jobs)
+    return 0
+
 
 if __name__ == "__main__":
-    dummy_node = TextNode("Test Text Node", TextType.LINK, url="http://example.com")
-    print(dummy_node)
\ No newline at end of file
+    sys.exit(main())
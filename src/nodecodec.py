@@ -0,0 +1,242 @@
+import sys
+from array import array
+
+from blockcache import CachedBlock
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+CODEC_MAGIC = b"SSND"
+CODEC_VERSION = 2
+
+# What a buffer holds
+KIND_TEXT_NODES = 1
+KIND_HTML_TREE = 2
+
+# Codes of the TextTypes. Never reorder: new types get new codes, and
+# changing an existing code needs a new CODEC_VERSION.
+TEXT_TYPE_CODES = {
+    TextType.PLAIN: 0,
+    TextType.BOLD: 1,
+    TextType.ITALIC: 2,
+    TextType.CODE: 3,
+    TextType.LINK: 4,
+    TextType.IMAGE: 5,
+}
+_TEXT_TYPES = {code: text_type for text_type, code in TEXT_TYPE_CODES.items()}
+
+# Codes of the HTMLNode classes, under the same rules
+NODE_CLASS_CODES = {
+    HTMLNode: 0,
+    LeafNode: 1,
+    ParentNode: 2,
+    CachedBlock: 3,
+}
+_NODE_CLASSES = {code: cls for cls, code in NODE_CLASS_CODES.items()}
+
+
+class _StringTable:
+    # Interns strings to indexes; index 0 stands for None
+    
+    def __init__(self):
+        self.indexes = {}
+        self.strings = []
+    
+    def add(self, value):
+        if value is None:
+            return 0
+        index = self.indexes.get(value)
+        if index is None:
+            if not isinstance(value, str):
+                raise TypeError(f"Only strings can be serialized, got {type(value).__name__}")
+            self.strings.append(value)
+            index = self.indexes[value] = len(self.strings)
+        return index
+    
+    def to_bytes(self, kind, codes):
+        # Header, string count, the length of each string in characters, the
+        # strings as one UTF-8 blob, then the codes
+        blob = "".join(self.strings).encode("utf-8")
+        lengths = array("I", [len(self.strings)])
+        lengths.extend(len(string) for string in self.strings)
+        lengths.append(len(blob))
+        if sys.byteorder == "big":
+            lengths.byteswap()
+            codes.byteswap()
+        return b"".join((CODEC_MAGIC, CODEC_VERSION.to_bytes(4, "little"), kind.to_bytes(4, "little"),
+                         lengths.tobytes(), blob, codes.tobytes()))
+
+
+def _read(data, kind):
+    # Returns the string table (with None at index 0) and the codes
+    if data[:4] != CODEC_MAGIC:
+        raise ValueError("Not a serialized node buffer")
+    version = int.from_bytes(data[4:8], "little")
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported node buffer version: {version}")
+    if int.from_bytes(data[8:12], "little") != kind:
+        raise ValueError("Node buffer holds a different kind of data")
+    
+    count = int.from_bytes(data[12:16], "little")
+    lengths_end = 16 + 4 * (count + 1)
+    lengths = array("I")
+    lengths.frombytes(data[16:lengths_end])
+    if len(lengths) != count + 1:
+        raise ValueError("Truncated node buffer")
+    if sys.byteorder == "big":
+        lengths.byteswap()
+    blob_end = lengths_end + lengths[-1]
+    if blob_end > len(data):
+        raise ValueError("Truncated node buffer")
+    blob = data[lengths_end:blob_end].decode("utf-8")
+    
+    strings = [None]
+    position = 0
+    for index in range(count):
+        end = position + lengths[index]
+        strings.append(blob[position:end])
+        position = end
+    
+    codes = array("I")
+    codes.frombytes(data[blob_end:])  # ValueError unless whole codes
+    if sys.byteorder == "big":
+        codes.byteswap()
+    return strings, codes
+
+
+def dump_text_nodes(nodes):
+    """Serializes a list of TextNodes to bytes.
+
+    Each node is three codes (text type, text, url) referring to a shared
+    string table, so repeated texts and URLs are stored once.
+
+    Args:
+        nodes (List[TextNode]): The nodes to serialize.
+
+    Returns:
+        bytes: The serialized nodes, for `load_text_nodes`.
+    """
+    
+    table = _StringTable()
+    codes = array("I")
+    for node in nodes:
+        codes.extend((TEXT_TYPE_CODES[node.text_type], table.add(node.text), table.add(node.url)))
+    return table.to_bytes(KIND_TEXT_NODES, codes)
+
+
+def load_text_nodes(data):
+    """Restores the list of TextNodes serialized by `dump_text_nodes`.
+
+    Raises:
+        ValueError: If `data` is not a serialized TextNode list of this
+            format version.
+    """
+    
+    strings, codes = _read(data, KIND_TEXT_NODES)
+    if len(codes) % 3:
+        raise ValueError("Truncated node buffer")
+    try:
+        return [TextNode(strings[text], _TEXT_TYPES[text_type], strings[url])
+                for text_type, text, url in zip(codes[0::3], codes[1::3], codes[2::3])]
+    except (IndexError, KeyError):
+        raise ValueError("Corrupt node buffer") from None
+
+
+def dump_html_node(node):
+    """Serializes an HTMLNode tree to bytes.
+
+    The tree is flattened pre-order into codes referring to a shared string
+    table: per node its class, tag, value, number of props followed by each
+    prop's name and value, and number of children. Both counts are stored
+    one higher, with 0 for None, so empty props and children survive the
+    round trip. Walked with an explicit stack, so deep trees are fine.
+
+    Args:
+        node (HTMLNode): The root of the tree.
+
+    Raises:
+        TypeError: If a node is of an unknown class, or a value or prop is
+            not a string.
+
+    Returns:
+        bytes: The serialized tree, for `load_html_node`.
+    """
+    
+    table = _StringTable()
+    add = table.add
+    codes = array("I")
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        code = NODE_CLASS_CODES.get(type(item))
+        if code is None:
+            raise TypeError(f"Cannot serialize node of type {type(item).__name__}")
+        codes.extend((code, add(item.tag), add(item.value)))
+        
+        props = item.props
+        if props is None:
+            codes.append(0)
+        else:
+            codes.append(len(props) + 1)
+            for key, value in props.items():
+                codes.extend((add(key), add(value)))
+        
+        children = item.children
+        if children is None:
+            codes.append(0)
+        else:
+            codes.append(len(children) + 1)
+            stack.extend(reversed(children))
+    return table.to_bytes(KIND_HTML_TREE, codes)
+
+
+def load_html_node(data):
+    """Restores the HTMLNode tree serialized by `dump_html_node`.
+
+    Nodes are rebuilt without calling their constructors, which is most of
+    the cost of building a tree.
+
+    Raises:
+        ValueError: If `data` is not a serialized tree of this format
+            version.
+    """
+    
+    strings, codes = _read(data, KIND_HTML_TREE)
+    new = object.__new__
+    next_code = iter(codes).__next__
+    root = None
+    # Children lists still being filled, with the number of nodes they lack
+    open_lists = []
+    try:
+        while True:
+            node = new(_NODE_CLASSES[next_code()])
+            node.tag = strings[next_code()]
+            node.value = strings[next_code()]
+            prop_count = next_code() - 1
+            if prop_count >= 0:
+                node._props = {strings[next_code()]: strings[next_code()] for _ in range(prop_count)}
+            else:
+                node._props = None
+            node._props_html = None
+            node._digest = None
+            child_count = next_code() - 1
+            node.children = [] if child_count >= 0 else None
+            
+            if open_lists:
+                siblings = open_lists[-1]
+                siblings[0].append(node)
+                siblings[1] -= 1
+                if not siblings[1]:
+                    open_lists.pop()
+            else:
+                root = node
+            if child_count > 0:
+                open_lists.append([node.children, child_count])
+            if not open_lists:
+                break
+    except (StopIteration, KeyError, IndexError):
+        raise ValueError("Corrupt node buffer") from None
+    try:
+        next_code()
+    except StopIteration:
+        return root
+    raise ValueError("Trailing data in node buffer")
@@ -0,0 +1,145 @@
+import os
+import shutil
+
+from buildcache import hash_bytes, hash_file
+
+STAGING_SUFFIX = ".staging"
+OLD_SUFFIX = ".old"
+PARTIAL_SUFFIX = ".partial"
+
+ADDED = "added"
+MODIFIED = "modified"
+
+
+def _link_or_copy(source, destination):
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def prepare_staging(output_dir):
+    """Creates a staging copy of `output_dir` to build into.
+
+    Files are hard-linked rather than copied, so carrying over an unchanged
+    page costs one directory entry and keeps its original mtime. Anything
+    left over from an interrupted build is discarded first.
+
+    Returns:
+        string: The path of the staging directory.
+    """
+    
+    staging = output_dir.rstrip(os.sep) + STAGING_SUFFIX
+    if os.path.lexists(staging):
+        discard(staging)
+    
+    source_root = os.path.realpath(output_dir) if os.path.exists(output_dir) else None
+    os.makedirs(staging)
+    if source_root is None:
+        return staging
+    
+    for root, dirs, files in os.walk(source_root):
+        relative = os.path.relpath(root, source_root)
+        target_root = staging if relative == os.curdir else os.path.join(staging, relative)
+        for name in dirs:
+            os.makedirs(os.path.join(target_root, name), exist_ok=True)
+        for name in files:
+            _link_or_copy(os.path.join(root, name), os.path.join(target_root, name))
+    return staging
+
+
+def discard(path):
+    if os.path.islink(path) or os.path.isfile(path):
+        os.remove(path)
+    elif os.path.exists(path):
+        shutil.rmtree(path)
+
+
+def swap_in(staging, output_dir):
+    """Replaces `output_dir` with the finished `staging` directory.
+
+    If `output_dir` is a symlink it is repointed with a single atomic
+    rename, so readers see either the old tree or the new one. Otherwise the
+    old directory is renamed aside, the new one renamed into place, and only
+    then is the old tree deleted; at no point is a partially built tree
+    visible.
+    """
+    
+    output_dir = output_dir.rstrip(os.sep)
+    
+    if os.path.islink(output_dir):
+        old_target = os.path.realpath(output_dir)
+        # Give the build a unique name and point the link at it
+        build_dir = f"{output_dir}.{os.getpid()}-{os.urandom(4).hex()}"
+        os.rename(staging, build_dir)
+        tmp_link = output_dir + ".link"
+        discard(tmp_link)
+        os.symlink(os.path.basename(build_dir), tmp_link)
+        os.replace(tmp_link, output_dir)
+        # Only delete the previous tree if it is one of our own builds
+        if (os.path.dirname(old_target) == os.path.dirname(os.path.realpath(build_dir)) and
+                os.path.basename(old_target).startswith(os.path.basename(output_dir) + ".")):
+            discard(old_target)
+        return
+    
+    old = output_dir + OLD_SUFFIX
+    discard(old)
+    if os.path.exists(output_dir):
+        os.rename(output_dir, old)
+    os.rename(staging, output_dir)
+    discard(old)
+
+
+def _replace_if_changed(path, new_path, new_hash, previous_hash):
+    existed = os.path.exists(path)
+    if existed:
+        if previous_hash is None:
+            previous_hash = hash_file(path)
+        if previous_hash == new_hash:
+            os.remove(new_path)
+            return None
+    # Renaming over the old entry (instead of writing into it) leaves any
+    # other hard link to the old file, e.g. the live site, untouched
+    os.replace(new_path, path)
+    return MODIFIED if existed else ADDED
+
+
+def write_if_changed(path, data, previous_hash=None):
+    """Writes `data` to `path` unless the file already holds exactly that.
+
+    Args:
+        path (string): The file to write.
+        data (bytes): Its new contents.
+        previous_hash (string): `hash_bytes` of the current file if already
+            known, to avoid reading it back.
+
+    Returns:
+        Tuple[string, string]: ADDED, MODIFIED or None if nothing was
+        written, and the hash of `data`.
+    """
+    
+    new_hash = hash_bytes(data)
+    if previous_hash == new_hash and os.path.exists(path):
+        return None, new_hash
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial = path + PARTIAL_SUFFIX
+    with open(partial, "wb") as f:
+        f.write(data)
+    return _replace_if_changed(path, partial, new_hash, previous_hash), new_hash
+
+
+def finalize_partial(path, previous_hash=None):
+    """Moves `path` + PARTIAL_SUFFIX into place unless it is unchanged.
+
+    Used for pages that were streamed to disk rather than held in memory.
+
+    Returns:
+        Tuple[string, string]: As for `write_if_changed`.
+    """
+    
+    partial = path + PARTIAL_SUFFIX
+    new_hash = hash_file(partial)
+    return _replace_if_changed(path, partial, new_hash, previous_hash), new_hash
@@ -0,0 +1,252 @@
+import itertools
+import os
+
+from assets import rewrite_image_sources
+from blockcache import CachedBlock, block_key
+from htmlnode import ParentNode
+from blockparser import block_to_html_node, iter_block_nodes, iter_markdown_blocks
+
+# Image URL -> fingerprinted URL, see `use_image_urls`
+_image_urls = None
+
+
+def use_image_urls(urls):
+    """Sets the image URLs rewritten in rendered pages (None for none)."""
+    
+    global _image_urls
+    _image_urls = urls or None
+
+
+def get_image_urls():
+    return _image_urls
+
+
+class BlockSummaries:
+    """Collects a summary of each block of a page as it is rendered.
+
+    `summarize` is called with each block's node before its image URLs are
+    rewritten, and returns a JSON-serializable value, e.g. the block's
+    links. A BlockCache keeps the summaries of its blocks, so blocks
+    spliced in from it are not parsed again just to be summarized.
+    """
+    
+    def __init__(self, summarize):
+        self.summarize = summarize
+        # One summary per block, in order
+        self.items = []
+
+
+def _iter_nodes(lines, blocks=None, summaries=None):
+    if blocks is not None:
+        return _iter_cached_nodes(lines, blocks, summaries)
+    nodes = iter_block_nodes(lines)
+    if summaries is not None:
+        nodes = _summarized(nodes, summaries)
+    if _image_urls is None:
+        return nodes
+    return (rewrite_image_sources(node, _image_urls) for node in nodes)
+
+
+def _summarized(nodes, summaries):
+    for node in nodes:
+        summaries.items.append(summaries.summarize(node))
+        yield node
+
+
+def _iter_cached_nodes(lines, blocks, summaries=None):
+    # Only blocks missing from the BlockCache are parsed and rendered; the
+    # rest are spliced in from their cached HTML
+    for block_type, block_lines in iter_markdown_blocks(lines):
+        key = block_key(block_type, block_lines)
+        html = blocks.get(key)
+        summary = None
+        if html is not None and summaries is not None:
+            summary = blocks.get_summary(key)
+        if html is None or (summaries is not None and summary is None):
+            node = block_to_html_node(block_type, block_lines)
+            if summaries is not None:
+                summary = summaries.summarize(node)
+            if _image_urls is not None:
+                rewrite_image_sources(node, _image_urls)
+            html = node.to_html()
+            blocks.put(key, html, summary)
+        if summaries is not None:
+            summaries.items.append(summary)
+        yield CachedBlock(html)
+
+
+def markdown_to_html_node(markdown):
+    """Converts a markdown document into a single HTMLNode tree.
+
+    Args:
+        markdown (string): The full markdown document.
+
+    Returns:
+        ParentNode: A "div" node containing one child per block.
+    """
+    
+    return ParentNode("div", list(_iter_nodes(markdown.splitlines())))
+
+
+FRONT_MATTER_FENCE = "---"
+
+
+def split_front_matter(lines):
+    """Separates a document's front matter from its markdown.
+
+    Front matter is a block of "key: value" lines between two "---" lines
+    at the very start of the document. Keys are lowercased. Only as many
+    lines as the front matter spans are read ahead.
+
+    Args:
+        lines (Iterable[string]): The document's lines.
+
+    Returns:
+        Tuple[Dict[string, string], Iterator[string]]: The front matter
+        (empty if there is none) and the remaining lines.
+    """
+    
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.rstrip("\r\n") != FRONT_MATTER_FENCE:
+        return {}, itertools.chain((first,), lines)
+    
+    metadata = {}
+    consumed = [first]
+    for line in lines:
+        consumed.append(line)
+        line = line.rstrip("\r\n")
+        if line == FRONT_MATTER_FENCE:
+            return metadata, lines
+        key, sep, value = line.partition(":")
+        if sep:
+            metadata[key.strip().lower()] = value.strip()
+    # Never closed, so it was not front matter after all
+    return {}, iter(consumed)
+
+
+def extract_title(lines):
+    """Returns the text of the first "# " heading, or None if there is none."""
+    
+    for line in lines:
+        if line.startswith("# "):
+            return line[2:].strip()
+    return None
+
+
+class _PageBlocks:
+    # The page's "div" of blocks, parsed while it is rendered; stands in
+    # for the page's HTMLNode tree in a template
+    __slots__ = ("lines", "blocks", "summaries")
+    
+    def __init__(self, lines, blocks=None, summaries=None):
+        self.lines = lines
+        self.blocks = blocks
+        self.summaries = summaries
+    
+    def iter_html(self):
+        yield "<div>"
+        for block in _iter_nodes(self.lines, self.blocks, self.summaries):
+            yield from block.iter_html()
+        yield "</div>"
+        
+    def render_to(self, fileobj):
+        return render_lines_to(self.lines, fileobj, self.blocks, self.summaries)
+
+
+def _template_values(metadata, title, content):
+    values = dict(metadata)
+    if not values.get("title"):
+        values["title"] = title or ""
+    values["content"] = content
+    return values
+
+
+def render_page(markdown, template=None, blocks=None, summaries=None):
+    """Renders a markdown document to an HTML string.
+
+    Args:
+        markdown (string): The full markdown document.
+        template (Template): If given, the page is rendered into this
+            layout. Its "content" slot receives the page, "title" the
+            front matter's title or else the first "# " heading, and other
+            slots the front matter value of the same name.
+        blocks (BlockCache): If given, blocks whose text is unchanged
+            since the cache was saved reuse their HTML instead of being
+            parsed again, and the cache collects this render's blocks.
+        summaries (BlockSummaries): If given, collects a summary of each
+            of the page's blocks.
+
+    Returns:
+        string: The rendered HTML.
+    """
+    
+    # The page's own "div" is never shared, so it is kept out of the
+    # fragment cache; its blocks are looked up as usual
+    if template is None:
+        node = ParentNode("div", list(_iter_nodes(markdown.splitlines(), blocks, summaries)))
+        return node.to_html(cache_root=False)
+    metadata, lines = split_front_matter(markdown.splitlines())
+    lines = list(lines)
+    title = None if metadata.get("title") else extract_title(lines)
+    return template.render(_template_values(metadata, title, _PageBlocks(lines, blocks, summaries)))
+
+
+def render_lines_to(lines, fileobj, blocks=None, summaries=None):
+    """Streams the HTML of a markdown document to a file object.
+
+    Each block is parsed and written as soon as its last line is read, so
+    only one block is held in memory at a time. The output is identical to
+    `render_page`.
+
+    Args:
+        lines (Iterable[string]): The document's lines, e.g. a file object.
+        fileobj: A writable text file object.
+        blocks (BlockCache): Cached block HTML, as for `render_page`.
+        summaries (BlockSummaries): Collects block summaries, as for
+            `render_page`.
+
+    Returns:
+        int: The number of characters written.
+    """
+    
+    fileobj.write("<div>")
+    written = len("<div></div>")
+    for block in _iter_nodes(lines, blocks, summaries):
+        written += block.render_to(fileobj)
+    fileobj.write("</div>")
+    return written
+
+
+def render_markdown_file(source_path, output_path, template=None, blocks=None, summaries=None):
+    """Renders a markdown file to an HTML file without loading it whole.
+
+    Args:
+        source_path (string): Path of the markdown source.
+        output_path (string): Path of the HTML file to write; parent
+            directories are created as needed.
+        template (Template): Layout to render the page into, as for
+            `render_page`. Finding the title may take a separate pass over
+            the file, stopping at the first heading.
+        blocks (BlockCache): Cached block HTML, as for `render_page`.
+        summaries (BlockSummaries): Collects block summaries, as for
+            `render_page`.
+    """
+    
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(source_path, "r", encoding="utf-8") as source, \
+            open(output_path, "w", encoding="utf-8") as output:
+        if template is None:
+            render_lines_to(source, output, blocks, summaries)
+            return
+        
+        metadata, lines = split_front_matter(source)
+        title = None
+        if not metadata.get("title") and "title" in template.slots:
+            with open(source_path, "r", encoding="utf-8") as scan:
+                title = extract_title(split_front_matter(scan)[1])
+        template.render_to(output, _template_values(metadata, title, _PageBlocks(lines, blocks, summaries)))
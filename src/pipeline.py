@@ -0,0 +1,191 @@
+import queue
+import threading
+from collections import deque
+
+# How long blocked stages wait before re-checking whether the pipeline was
+# stopped by an error elsewhere.
+_POLL_SECONDS = 0.05
+
+_DONE = object()
+
+
+def _render_chunk(render, values):
+    # Runs in the pool: one submission renders several values
+    return [render(value) for value in values]
+
+
+class _Pipeline:
+    def __init__(self):
+        self.stop = threading.Event()
+        self.errors = []
+        self.lock = threading.Lock()
+        
+    def fail(self, error):
+        with self.lock:
+            self.errors.append(error)
+        self.stop.set()
+        
+    def put(self, q, item):
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def get(self, q):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+
+def run_pipeline(items, read, render, write, readers=4, writers=2, prefetch=64,
+                 batch_size=16, pool=None, max_in_flight=None, chunk_size=1):
+    """Runs items through overlapping read, render and write stages.
+
+    - `readers` threads call `read(item)` and hand the results to the render
+      stage through a queue holding at most `prefetch` values. Returning
+      None from `read` drops the item.
+    - The render stage runs in the calling thread. It calls `render(value)`
+      directly, or submits values to `pool` (a concurrent.futures
+      executor) in chunks of up to `chunk_size`, keeping at most
+      `max_in_flight` values outstanding. A chunk only takes values that
+      are already waiting, so pages trickling in are not held back to fill
+      one.
+    - `writers` threads collect up to `batch_size` rendered results at a
+      time and pass each batch to `write(batch)` as (value, rendered) pairs.
+
+    Every queue is bounded, so a slow stage applies backpressure to the ones
+    before it instead of buffering the whole site in memory. The first
+    exception raised by any stage stops the pipeline and is re-raised here.
+
+    Args:
+        items (Iterable): The work items, e.g. source paths.
+        read (Callable): item -> value or None. Runs on reader threads.
+        render (Callable): value -> rendered. Must be picklable with `pool`.
+        write (Callable): List[(value, rendered)] -> None. Runs on writer
+            threads.
+        readers (int): Number of reader threads.
+        writers (int): Number of writer threads.
+        prefetch (int): Capacity of the queues between stages.
+        batch_size (int): Largest batch handed to `write`.
+        pool (Executor): Optional executor for the render stage.
+        max_in_flight (int): Values outstanding in the pool (default: 2 * prefetch).
+        chunk_size (int): Most values rendered by one pool submission.
+    """
+    
+    pipeline = _Pipeline()
+    items = iter(items)
+    items_lock = threading.Lock()
+    read_queue = queue.Queue(maxsize=prefetch)
+    write_queue = queue.Queue(maxsize=prefetch)
+    readers = max(1, readers)
+    writers = max(1, writers)
+    
+    def reader():
+        try:
+            while not pipeline.stop.is_set():
+                with items_lock:
+                    item = next(items, _DONE)
+                if item is _DONE:
+                    break
+                value = read(item)
+                if value is not None and not pipeline.put(read_queue, value):
+                    break
+        except BaseException as e:
+            pipeline.fail(e)
+        finally:
+            pipeline.put(read_queue, _DONE)
+    
+    def writer():
+        try:
+            while True:
+                result = pipeline.get(write_queue)
+                if result is _DONE:
+                    break
+                batch = [result]
+                done = False
+                while len(batch) < batch_size:
+                    try:
+                        result = write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if result is _DONE:
+                        done = True
+                        break
+                    batch.append(result)
+                write(batch)
+                if done:
+                    break
+        except BaseException as e:
+            pipeline.fail(e)
+    
+    threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, daemon=True) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    
+    # (values, future) of each pool submission, oldest first
+    in_flight = deque()
+    
+    def drain(limit):
+        # Hands finished chunks to the writers until at most `limit` values
+        # are outstanding
+        nonlocal in_flight_values
+        while in_flight and in_flight_values > limit and not pipeline.stop.is_set():
+            values, future = in_flight.popleft()
+            in_flight_values -= len(values)
+            for value, rendered in zip(values, future.result()):
+                if not pipeline.put(write_queue, (value, rendered)):
+                    return
+    
+    try:
+        limit = max_in_flight or 2 * prefetch
+        in_flight_values = 0
+        finished_readers = 0
+        
+        while finished_readers < readers:
+            value = pipeline.get(read_queue)
+            if value is _DONE:
+                if pipeline.stop.is_set():
+                    break
+                finished_readers += 1
+                continue
+            
+            if pool is None:
+                if not pipeline.put(write_queue, (value, render(value))):
+                    break
+                continue
+            
+            chunk = [value]
+            while len(chunk) < chunk_size and finished_readers < readers:
+                try:
+                    value = read_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if value is _DONE:
+                    finished_readers += 1
+                else:
+                    chunk.append(value)
+            in_flight.append((chunk, pool.submit(_render_chunk, render, chunk)))
+            in_flight_values += len(chunk)
+            drain(limit - 1)
+        
+        drain(0)
+    except BaseException as e:
+        pipeline.fail(e)
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+        # One end marker per writer so each of them drains and exits
+        for _ in range(writers):
+            pipeline.put(write_queue, _DONE)
+        for thread in threads:
+            thread.join()
+    
+    if pipeline.errors:
+        raise pipeline.errors[0]
@@ -0,0 +1,371 @@
+"""Inverted search index of the site, built during the build.
+
+The index is written to SEARCH_DIR in the output as static JSON that
+client-side search loads lazily:
+
+    search/index.json   {"version": 1, "prefix_length": 2,
+                         "pages": [[url, title], null, ...],
+                         "shards": ["ab", "ca", ...]}
+    search/<prefix>.json
+                        {term: [[page id, position, position, ...], ...]}
+
+A page's id is its index in "pages" (null marks an id no longer in use).
+Terms are the lowercased words of a page's text, and positions count the
+page's terms from 0, so phrase queries can match adjacent positions. Each
+term is stored in the shard named after its first `prefix_length`
+characters, so a query only fetches the shards of its own terms.
+
+Only shards holding terms of pages that changed are rewritten; the rest
+are left as the previous build wrote them.
+"""
+
+import heapq
+import json
+import os
+import re
+from collections import defaultdict
+
+from blockparser import iter_block_nodes
+from buildcache import generator_version_hash
+from htmlnode import ParentNode
+from outputdir import write_if_changed
+from page import split_front_matter
+
+SEARCH_INDEX_VERSION = 1
+SEARCH_DIR = "search"
+SEARCH_META_NAME = "index.json"
+SHARD_PREFIX_LENGTH = 2
+
+# Shorter words are not indexed, so every term fills its shard prefix
+MIN_TERM_LENGTH = SHARD_PREFIX_LENGTH
+
+# Runs of letters and digits long enough to index; underscores separate
+# words like any other punctuation
+_TERM_RE = re.compile(r"[^\W_]{%d,}" % MIN_TERM_LENGTH)
+
+
+def _block_text(node):
+    # The text of a rendered block as displayed: leaf text, image alt text,
+    # and a line break before each list item. Code blocks have none.
+    texts = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if item.tag == "pre":
+            continue
+        if isinstance(item, ParentNode):
+            if item.tag == "li":
+                texts.append("\n")
+            stack.extend(reversed(item.children))
+        elif item.tag == "img":
+            texts.append(item.props.get("alt", "") if item.props else "")
+        elif item.value is not None:
+            texts.append(item.value)
+    return "".join(texts)
+
+
+def extract_terms(text):
+    """Returns the search terms of a text, lowercased and in order."""
+    
+    return _TERM_RE.findall(text.lower())
+
+
+def extract_node_terms(nodes, title=None):
+    """Returns a page's title and its search terms from its block nodes.
+
+    Terms come from the text of the rendered blocks, so markup is not
+    indexed: a link contributes its text and an image its alt text. Code
+    blocks are skipped.
+
+    Args:
+        nodes (Iterable[HTMLNode]): The page's blocks, as rendered.
+        title (string): The page's title, or None to use the text of its
+            first "h1".
+
+    Returns:
+        Tuple[string, List[string]]: The title and the terms, in order.
+    """
+    
+    texts = []
+    for node in nodes:
+        text = _block_text(node)
+        if title is None and node.tag == "h1":
+            title = text
+        texts.append(text)
+    return title, extract_terms("\n".join(texts))
+
+
+def extract_page_terms(lines):
+    """Returns a markdown page's title and its search terms in order.
+
+    The page is parsed into blocks by the renderer's own parser, so the
+    indexed text is the text as displayed (see `extract_node_terms`). Front
+    matter is skipped, and lines are read one block at a time.
+
+    The title is the "title" front matter, or else the text of the first
+    "# " heading, or None.
+
+    Args:
+        lines (Iterable[string]): The page's lines.
+
+    Returns:
+        Tuple[string, List[string]]: The title and the terms.
+    """
+    
+    metadata, body = split_front_matter(lines)
+    return extract_node_terms(iter_block_nodes(body), metadata.get("title") or None)
+
+
+def _postings(terms):
+    # Term -> positions of the term, grouped by shard prefix
+    positions = defaultdict(list)
+    for position, term in enumerate(terms):
+        positions[term].append(position)
+    shards = defaultdict(dict)
+    for term, term_positions in positions.items():
+        shards[term[:SHARD_PREFIX_LENGTH]][term] = term_positions
+    return dict(shards)
+
+
+def read_shard(path):
+    """Returns the postings in a shard file, or {} if it is missing or corrupt."""
+    
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def lookup(output_dir, term):
+    """Returns the (page id, positions) of a term in a written index."""
+    
+    term = term.lower()
+    shard = read_shard(os.path.join(output_dir, SEARCH_DIR, term[:SHARD_PREFIX_LENGTH] + ".json"))
+    return [(entry[0], entry[1:]) for entry in shard.get(term, ())]
+
+
+def _write_json(path, data, changes, output_dir):
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    status, _ = write_if_changed(path, text.encode("utf-8"))
+    if status is not None:
+        changes.append((status, os.path.relpath(path, output_dir)))
+
+
+class SearchPage:
+    __slots__ = ("id", "url", "title", "prefixes")
+    
+    def __init__(self, id, url, title, prefixes):
+        self.id = id
+        self.url = url
+        self.title = title
+        # Prefixes of the shards holding the page's terms
+        self.prefixes = prefixes
+
+
+class SearchIndex:
+    """The site's search index and what changed in it during a build.
+
+    Only a table of pages (their ids, URLs, titles and shard prefixes) is
+    kept between builds; the postings live in the shards written by
+    `write`. Pages updated with `set_page` or dropped with `remove_page`
+    mark the shards they touch, and `write` merges the new postings into
+    just those shards.
+
+    An index that was not loaded from a previous build is a rebuild: it
+    writes every shard from scratch and removes any left over.
+    """
+    
+    def __init__(self, rebuild=True):
+        # Source -> SearchPage, as of the last write
+        self.pages = {}
+        self.rebuild = rebuild
+        # Source -> (url, title, postings by shard prefix) of the pages
+        # indexed since the last write
+        self._updated = {}
+        # Ids whose postings are out of date, and the shards holding them
+        self._stale_ids = set()
+        self._dirty_prefixes = set()
+        self._free_ids = []
+        self._next_id = 0
+    
+    def __contains__(self, source):
+        return source in self.pages or source in self._updated
+    
+    def __len__(self):
+        return len(self.pages.keys() | self._updated.keys())
+    
+    @property
+    def dirty(self):
+        return self.rebuild or bool(self._updated) or bool(self._stale_ids)
+    
+    def set_page(self, source, url, title, terms):
+        """Indexes (or re-indexes) a page under `url` with its `terms`.
+
+        The page gets its id when the index is written, in order of source,
+        so ids don't depend on the order pages were indexed in.
+        """
+        
+        self._updated[source] = (url, title, _postings(terms))
+    
+    def remove_page(self, source):
+        self._updated.pop(source, None)
+        page = self.pages.pop(source, None)
+        if page is not None:
+            self._stale_ids.add(page.id)
+            self._dirty_prefixes.update(page.prefixes)
+            heapq.heappush(self._free_ids, page.id)
+    
+    def _allocate_id(self):
+        if self._free_ids:
+            return heapq.heappop(self._free_ids)
+        self._next_id += 1
+        return self._next_id - 1
+    
+    def _apply_updates(self):
+        # Gives the updated pages their ids; returns their postings by prefix
+        pending = {}
+        for source in sorted(self._updated):
+            url, title, shards = self._updated[source]
+            previous = self.pages.get(source)
+            if previous is not None:
+                page_id = previous.id
+                self._stale_ids.add(page_id)
+                self._dirty_prefixes.update(previous.prefixes)
+            else:
+                page_id = self._allocate_id()
+            self.pages[source] = SearchPage(page_id, url, title, sorted(shards))
+            self._dirty_prefixes.update(shards)
+            for prefix, postings in shards.items():
+                pending.setdefault(prefix, []).append((page_id, postings))
+        self._updated.clear()
+        return pending
+    
+    def intact(self, output_dir):
+        """Tells whether the index's files are all in `output_dir`.
+
+        Updating an index merges into its existing shards, so one whose
+        files went missing has to be rebuilt instead.
+        """
+        
+        search_dir = os.path.join(output_dir, SEARCH_DIR)
+        if not os.path.exists(os.path.join(search_dir, SEARCH_META_NAME)):
+            return False
+        prefixes = set()
+        for page in self.pages.values():
+            prefixes.update(page.prefixes)
+        return all(os.path.exists(os.path.join(search_dir, prefix + ".json")) for prefix in prefixes)
+    
+    def write(self, output_dir):
+        """Writes the shards that changed and the page table to `output_dir`.
+
+        Returns:
+            List[Tuple[string, string]]: A (status, output-relative path)
+            pair for every index file added, modified or removed.
+        """
+        
+        pending = self._apply_updates()
+        search_dir = os.path.join(output_dir, SEARCH_DIR)
+        os.makedirs(search_dir, exist_ok=True)
+        changes = []
+        live_prefixes = set()
+        for page in self.pages.values():
+            live_prefixes.update(page.prefixes)
+        
+        if self.rebuild:
+            prefixes = live_prefixes
+            # Shards of an index this one does not know about
+            for name in os.listdir(search_dir):
+                prefix, extension = os.path.splitext(name)
+                if (extension == ".json" and name != SEARCH_META_NAME and
+                        prefix not in live_prefixes):
+                    os.remove(os.path.join(search_dir, name))
+                    changes.append(("removed", os.path.join(SEARCH_DIR, name)))
+        else:
+            prefixes = self._dirty_prefixes
+        
+        for prefix in sorted(prefixes):
+            path = os.path.join(search_dir, prefix + ".json")
+            if self.rebuild:
+                shard = {}
+            else:
+                shard = read_shard(path)
+                for term, entries in list(shard.items()):
+                    entries = [entry for entry in entries if entry[0] not in self._stale_ids]
+                    if entries:
+                        shard[term] = entries
+                    else:
+                        del shard[term]
+            for page_id, postings in pending.get(prefix, ()):
+                for term, positions in postings.items():
+                    shard.setdefault(term, []).append([page_id] + positions)
+            
+            if not shard:
+                if os.path.exists(path):
+                    os.remove(path)
+                    changes.append(("removed", os.path.relpath(path, output_dir)))
+                continue
+            for entries in shard.values():
+                entries.sort(key=lambda entry: entry[0])
+            _write_json(path, shard, changes, output_dir)
+        
+        table = [None] * self._next_id
+        for page in self.pages.values():
+            table[page.id] = [page.url, page.title]
+        while table and table[-1] is None:
+            table.pop()
+        _write_json(os.path.join(search_dir, SEARCH_META_NAME), {
+            "version": SEARCH_INDEX_VERSION,
+            "prefix_length": SHARD_PREFIX_LENGTH,
+            "pages": table,
+            "shards": sorted(live_prefixes),
+        }, changes, output_dir)
+        
+        self.rebuild = False
+        self._stale_ids.clear()
+        self._dirty_prefixes.clear()
+        return changes
+    
+    def save(self, path):
+        """Writes the page table to `path`, to `load` in the next build."""
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": SEARCH_INDEX_VERSION,
+                "generator": generator_version_hash(),
+                "prefix_length": SHARD_PREFIX_LENGTH,
+                "pages": {source: [page.id, page.url, page.title, page.prefixes]
+                          for source, page in self.pages.items()},
+            }, f, sort_keys=True)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        """Reads the page table saved by the previous build.
+
+        A missing or outdated file, or one from another generator version
+        (which may extract terms differently), gives an empty index that
+        rebuilds every shard.
+        """
+        
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return cls()
+        if (data.get("version") != SEARCH_INDEX_VERSION or
+                data.get("generator") != generator_version_hash() or
+                data.get("prefix_length") != SHARD_PREFIX_LENGTH):
+            return cls()
+        
+        index = cls(rebuild=False)
+        for source, (page_id, url, title, prefixes) in data.get("pages", {}).items():
+            index.pages[source] = SearchPage(page_id, url, title, prefixes)
+        used = {page.id for page in index.pages.values()}
+        index._next_id = max(used) + 1 if used else 0
+        index._free_ids = [page_id for page_id in range(index._next_id) if page_id not in used]
+        return index
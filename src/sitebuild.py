@@ -0,0 +1,557 @@
+import io
+import itertools
+import json
+import os
+import threading
+
+import instrument
+from assets import copy_assets, image_url_map
+from blockcache import BlockCache
+from buildcache import DEFAULT_CACHE_DIR, BuildCache, generator_version_hash, hash_bytes, hash_file
+from htmlnode import enable_fragment_cache, get_fragment_cache, use_fragment_cache, use_minify
+from linkgraph import LinkGraph, extract_node_links, extract_page_links
+from outputdir import (PARTIAL_SUFFIX, discard, finalize_partial,
+                       prepare_staging, swap_in, write_if_changed)
+from page import (FRONT_MATTER_FENCE, BlockSummaries, get_image_urls, render_markdown_file,
+                  render_page, split_front_matter, use_image_urls)
+from pipeline import run_pipeline
+from searchindex import SearchIndex, extract_node_terms, extract_page_terms
+from template import load_template
+
+MANIFEST_NAME = "manifest.json"
+CHANGES_NAME = "changes.json"
+LINK_GRAPH_NAME = "links.bin"
+SEARCH_INDEX_NAME = "search.json"
+BLOCK_CACHE_DIR = "blocks"
+
+# Tasks handed to each worker per round trip, as a fraction of the pages per
+# worker: large enough to amortize pickling, small enough to balance load.
+CHUNKS_PER_WORKER = 4
+
+# Sources larger than this are streamed from file to file by the render
+# stage instead of being read into memory up front.
+STREAM_THRESHOLD = 1 << 20
+
+# Sources at least this large keep a BlockCache of their rendered blocks,
+# so editing part of a long page only re-renders the blocks that changed.
+BLOCK_CACHE_THRESHOLD = 64 << 10
+
+DEFAULT_READERS = 4
+DEFAULT_WRITERS = 2
+DEFAULT_PREFETCH = 64
+WRITE_BATCH_SIZE = 16
+
+
+class BuildResult:
+    def __init__(self):
+        self.rendered = []
+        self.skipped = []
+        self.removed = []
+        # The AssetResult of copying static files, if any
+        self.assets = None
+        # The LinkGraph of every page on the site
+        self.links = None
+        # The CompressResult of precompressing the output, if any
+        self.compressed = None
+        # The site's SearchIndex, if one was built
+        self.search = None
+        # Output files (relative to the output directory) the build changed
+        self.changes = {"added": [], "modified": [], "removed": []}
+        
+    def __repr__(self):
+        return (f"BuildResult(rendered={len(self.rendered)}, "
+                f"skipped={len(self.skipped)}, removed={len(self.removed)})")
+
+
+def find_sources(content_dir):
+    """Returns the markdown files under `content_dir` as sorted relative paths."""
+    
+    sources = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        # One relpath per directory rather than per file
+        relative = os.path.relpath(root, content_dir)
+        prefix = "" if relative == os.curdir else relative + os.sep
+        for name in files:
+            if name.endswith(".md"):
+                sources.append(prefix + name)
+    sources.sort()
+    return sources
+
+
+def output_name(source):
+    """Maps a source path like "blog/post.md" to its output "blog/post.html"."""
+    
+    return os.path.splitext(source)[0] + ".html"
+
+
+def block_cache_path(cache_dir, source):
+    """Returns where the BlockCache of a source is kept."""
+    
+    return os.path.join(cache_dir, BLOCK_CACHE_DIR, hash_bytes(source.encode("utf-8")) + ".bin")
+
+
+def chunk_size(task_count, jobs):
+    """Returns the number of tasks to submit to a worker at a time."""
+    
+    return max(1, -(-task_count // (jobs * CHUNKS_PER_WORKER)))
+
+
+def build_generator_hash(image_urls=None, template_path=None, minify=False):
+    """Returns the manifest generator hash for a build with these settings.
+
+    Anything besides a page's own source that changes its output is folded
+    into the generator version, so changing it re-renders every page.
+    """
+    
+    generator_hash = generator_version_hash()
+    inputs = {}
+    if image_urls:
+        inputs["images"] = image_urls
+    if template_path is not None:
+        inputs["template"] = hash_file(template_path)
+    if minify:
+        inputs["minify"] = True
+    if not inputs:
+        return generator_hash
+    return hash_bytes((generator_hash + json.dumps(inputs, sort_keys=True)).encode("utf-8"))
+
+
+def _init_worker(fragment_cache_size, instrument_pages=None, image_urls=None, minify=False):
+    if fragment_cache_size:
+        enable_fragment_cache(fragment_cache_size)
+    if minify:
+        use_minify(True)
+    if image_urls is not None:
+        use_image_urls(image_urls)
+    if instrument_pages is not None:
+        instrument.enable(per_page=instrument_pages)
+
+
+def render_task(task):
+    """Renders one (source_path, output_path[, template_path]) task.
+
+    The page is timed as its own page.
+    """
+    
+    source_path, output_path = task[:2]
+    template = load_template(task[2]) if len(task) > 2 and task[2] is not None else None
+    with instrument.page(source_path):
+        render_markdown_file(source_path, output_path, template)
+
+
+class PageJob:
+    """A stale page travelling through the build pipeline."""
+    
+    __slots__ = ("source", "content_hash", "output", "source_path", "output_path", "text",
+                 "template", "blocks_path", "generator_hash", "index")
+    
+    def __init__(self, source, content_hash, output, source_path, output_path, text=None,
+                 template=None, blocks_path=None, generator_hash=None, index=False):
+        self.source = source
+        self.content_hash = content_hash
+        self.output = output
+        self.source_path = source_path
+        self.output_path = output_path
+        # None means the page is too large to hold and is streamed instead
+        self.text = text
+        # Path of the page's template; workers compile it once and reuse it
+        self.template = template
+        # Where the page's BlockCache is kept, if it has one, and the
+        # generator hash its fragments must have been rendered with
+        self.blocks_path = blocks_path
+        self.generator_hash = generator_hash
+        # Whether to extract the page's search terms too
+        self.index = index
+
+
+def _read_job_lines(job, extract):
+    # Runs `extract` over a job's lines, read lazily whether or not the
+    # page is in memory
+    if job.text is not None:
+        return extract(io.StringIO(job.text))
+    with open(job.source_path, "r", encoding="utf-8") as f:
+        return extract(f)
+
+
+def _read_front_matter(lines):
+    first = next(lines, "")
+    if first.rstrip("\r\n") != FRONT_MATTER_FENCE:
+        return None
+    return split_front_matter(itertools.chain((first,), lines))[0]
+
+
+def _front_matter(job):
+    # The page's front matter, or None if it has none; only its lines are
+    # read. A page starting with a fence that is never closed counts too.
+    return _read_job_lines(job, _read_front_matter)
+
+
+def _summarize_block(node):
+    return list(extract_node_links((node,)))
+
+
+def _summarize_indexed_block(node):
+    # As `_summarize_block`, plus the block's title (if it is an "h1") and
+    # search terms
+    title, terms = extract_node_terms((node,))
+    return _summarize_block(node) + [title, terms]
+
+
+def _page_links(job, summaries):
+    # The page's (links, images), from the summaries of the blocks it was
+    # just rendered from if there are any, or else by parsing it once more
+    if summaries is None:
+        return _read_job_lines(job, extract_page_links)
+    links = []
+    images = []
+    for summary in summaries.items:
+        links.extend(summary[0])
+        images.extend(summary[1])
+    return links, images
+
+
+def _page_terms(job, summaries, metadata):
+    # The page's (title, terms), likewise
+    if summaries is None:
+        return _read_job_lines(job, extract_page_terms)
+    title = metadata.get("title") or None if metadata else None
+    terms = []
+    for _, _, block_title, block_terms in summaries.items:
+        if title is None:
+            title = block_title
+        terms.extend(block_terms)
+    return title, terms
+
+
+def render_job(job):
+    """Renders a PageJob, returning its HTML, its links and its search terms.
+
+    Pages too large to hold in memory are streamed to the output path plus
+    PARTIAL_SUFFIX instead, and None is returned for the HTML. A page with
+    a BlockCache only renders its changed blocks, and the cache is saved
+    afterwards.
+
+    The links are the (links, images) of `extract_page_links`, and the
+    search terms the (title, terms) of `extract_page_terms` if `job.index`
+    is set, or else None. Both are taken from the summaries of the blocks
+    the page was rendered from where possible, including those its
+    BlockCache kept, so the page is parsed once and only its changed
+    blocks are.
+    """
+    
+    template = load_template(job.template) if job.template is not None else None
+    blocks = None
+    if job.blocks_path is not None:
+        blocks = BlockCache.load(job.blocks_path, job.generator_hash)
+    # Without a template, front matter is rendered as markdown but not
+    # indexed, so such pages are parsed for their links and terms separately
+    metadata = _front_matter(job)
+    summaries = None
+    if template is not None or metadata is None:
+        summaries = BlockSummaries(_summarize_indexed_block if job.index else _summarize_block)
+    with instrument.page(job.source_path):
+        if job.text is None:
+            render_markdown_file(job.source_path, job.output_path + PARTIAL_SUFFIX, template, blocks,
+                                 summaries)
+            html = None
+        else:
+            html = render_page(job.text, template, blocks, summaries)
+    if blocks is not None and blocks.changed:
+        blocks.save(job.blocks_path, job.generator_hash)
+    page_terms = _page_terms(job, summaries, metadata) if job.index else None
+    return html, _page_links(job, summaries), page_terms
+
+
+def _render_worker_job(job):
+    rendered = render_job(job)
+    recorder = instrument.get_recorder()
+    if recorder is None:
+        return rendered + (None,)
+    instrument.enable(per_page=recorder.per_page)
+    return rendered + (recorder.as_dict(),)
+
+
+def make_render_pool(jobs, fragment_cache_size=None, image_urls=None, minify=False):
+    """Creates a process pool whose workers render pages like this process.
+
+    Each worker gets its own fragment cache of `fragment_cache_size`
+    entries, and renders with the given image URLs and minification. When
+    instrumentation is enabled, workers record their stages too. Useful for
+    keeping workers warm across several builds or rebuilds.
+    """
+    
+    # Imported here as it is slow to import and serial builds never need it
+    from concurrent.futures import ProcessPoolExecutor
+    
+    recorder = instrument.get_recorder()
+    instrument_pages = recorder.per_page if recorder is not None else None
+    return ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                               initargs=(fragment_cache_size, instrument_pages, image_urls, minify))
+
+
+def build_site(content_dir, output_dir, cache_dir=DEFAULT_CACHE_DIR, force=False, jobs=1,
+               fragment_cache_size=None, readers=DEFAULT_READERS, writers=DEFAULT_WRITERS,
+               prefetch=DEFAULT_PREFETCH, atomic=True, static_dir=None, link_assets=False,
+               fingerprint=False, template_path=None, minify=False, compress=False, search=False):
+    """Renders every markdown page under `content_dir` into `output_dir`.
+
+    Pages whose content hash matches the manifest from the previous build
+    (and whose output still exists) are skipped without being parsed.
+    Outputs of sources that have been deleted are removed.
+
+    The build runs as a `run_pipeline`: reader threads prefetch and hash
+    sources, the render stage converts them (on a process pool when
+    `jobs` > 1, submitted in chunks of up to `chunk_size` pages), and writer
+    threads flush the HTML in batches, so file I/O overlaps with rendering.
+
+    A page whose rendered HTML is identical to the file already on disk is
+    not rewritten, so its mtime is preserved. With `atomic`, the build
+    happens in a hard-linked staging copy of `output_dir` that replaces it
+    only once every page has been written; a failed build leaves the
+    previous output untouched. The output files that were added, modified
+    or removed are returned and, with a cache directory, written to
+    CHANGES_NAME there for deploy tooling.
+
+    Static files under `static_dir` are copied in first with `copy_assets`.
+    With `fingerprint`, images get content-hashed names and pages' image
+    URLs are rewritten to match; the URL map is folded into the manifest's
+    generator hash, so pages are re-rendered whenever it changes.
+
+    With `template_path`, every page is rendered into that template (see
+    `render_page`), which is compiled once per process.
+
+    The links and images of each rendered page are collected from the
+    blocks it was rendered from into the site's LinkGraph, kept in the cache directory as
+    LINK_GRAPH_NAME so skipped pages keep their entries, and returned for
+    `linkgraph.check_links`.
+
+    Sources of at least BLOCK_CACHE_THRESHOLD bytes keep a BlockCache in
+    the cache directory, so a later build re-renders only the blocks whose
+    text changed and splices the rest back in from their cached HTML.
+
+    With `minify`, pages are rendered with whitespace collapsed (see
+    `htmlnode.use_minify`). With `compress`, `compress.precompress` then
+    writes ".gz"/".br" sidecars of the changed HTML, CSS, JS and JSON outputs
+    before the new output directory is swapped in.
+
+    With `search`, the search terms of each rendered page are collected
+    into a SearchIndex as it is rendered, whose page table is kept in the cache
+    directory as SEARCH_INDEX_NAME. Only the index shards holding terms of
+    pages that changed are rewritten, before any compression.
+
+    Args:
+        content_dir (string): Directory containing the markdown sources.
+        output_dir (string): Directory the HTML pages are written to.
+        cache_dir (string): Directory holding the build manifest, or None
+            to disable incremental builds.
+        force (bool): Re-render every page even if it is unchanged.
+        jobs (int): Number of worker processes used to render pages.
+        fragment_cache_size (int): If set, memoize repeated subtrees across
+            pages in an LRU fragment cache of this many entries.
+        readers (int): Threads reading and hashing sources.
+        writers (int): Threads writing rendered pages.
+        prefetch (int): Pages buffered between stages.
+        atomic (bool): Build into a staging directory and swap it in.
+        static_dir (string): Directory of static assets to copy, if any.
+        link_assets (bool): Hard-link assets instead of copying them.
+        fingerprint (bool): Fingerprint images and rewrite their URLs.
+        template_path (string): HTML template to render pages into.
+        minify (bool): Collapse whitespace in rendered pages.
+        compress (bool): Write precompressed sidecars of the outputs.
+        search (bool): Write a search index of the pages (see `searchindex`).
+
+    Returns:
+        BuildResult: The sources that were rendered, skipped and removed,
+        and the output files that changed.
+    """
+    
+    result = BuildResult()
+    cache = None
+    write_dir = prepare_staging(output_dir) if atomic else output_dir
+    try:
+        image_urls = None
+        if static_dir is not None:
+            result.assets = copy_assets(static_dir, write_dir, cache_dir, link=link_assets,
+                                        fingerprint=fingerprint, save=False)
+            for status, paths in result.assets.changes.items():
+                result.changes[status].extend(paths)
+            if fingerprint:
+                image_urls = image_url_map(result.assets.outputs)
+        
+        if cache_dir is not None:
+            cache = BuildCache(os.path.join(cache_dir, MANIFEST_NAME),
+                               build_generator_hash(image_urls, template_path, minify)).load()
+        
+        if cache is not None:
+            result.links = LinkGraph.load(os.path.join(cache_dir, LINK_GRAPH_NAME))
+        else:
+            result.links = LinkGraph()
+        
+        if search:
+            index = SearchIndex()
+            if cache is not None:
+                index = SearchIndex.load(os.path.join(cache_dir, SEARCH_INDEX_NAME))
+                # Forced builds re-index every page anyway
+                if force or not index.intact(write_dir):
+                    index = SearchIndex()
+            result.search = index
+        
+        _build_into(result, content_dir, write_dir, cache, force, jobs, fragment_cache_size,
+                    image_urls, template_path, minify,
+                    dict(readers=readers, writers=writers, prefetch=prefetch,
+                         batch_size=WRITE_BATCH_SIZE))
+        search_changed = result.search is not None and result.search.dirty
+        if search_changed:
+            for status, path in result.search.write(write_dir):
+                result.changes[status].append(path)
+        if compress:
+            from compress import precompress
+            result.compressed = precompress(write_dir, cache_dir, jobs, save=False)
+            for status, paths in result.compressed.changes.items():
+                result.changes[status].extend(paths)
+        if atomic:
+            swap_in(write_dir, output_dir)
+    except BaseException:
+        if atomic:
+            discard(write_dir)
+        raise
+    
+    for paths in result.changes.values():
+        paths.sort()
+    if cache is not None:
+        # Only now that the output is kept: a manifest saved before a failed
+        # build would mark the assets it never shipped as up to date
+        cache.save()
+        if result.assets is not None:
+            result.assets.manifest.save()
+        if result.compressed is not None:
+            result.compressed.manifest.save()
+        links_path = os.path.join(cache_dir, LINK_GRAPH_NAME)
+        if result.links.dirty or not os.path.exists(links_path):
+            result.links.save(links_path)
+        if result.search is not None:
+            search_path = os.path.join(cache_dir, SEARCH_INDEX_NAME)
+            if search_changed or not os.path.exists(search_path):
+                result.search.save(search_path)
+        with open(os.path.join(cache_dir, CHANGES_NAME), "w", encoding="utf-8") as f:
+            json.dump(result.changes, f, indent=1)
+    
+    return result
+
+
+def _build_into(result, content_dir, output_dir, cache, force, jobs, fragment_cache_size,
+                image_urls, template_path, minify, pipeline_options):
+    sources = find_sources(content_dir)
+    skipped = []
+    written = []
+    recorder = instrument.get_recorder()
+    lock = threading.Lock()
+    graph = result.links
+    search = result.search
+    
+    def scan(source_path, text, extract):
+        # Runs `extract` over a source's lines, streaming it if not in memory
+        if text is not None:
+            return extract(text.splitlines())
+        with open(source_path, "r", encoding="utf-8") as f:
+            return extract(f)
+    
+    def read(source):
+        source_path = os.path.join(content_dir, source)
+        output = output_name(source)
+        output_path = os.path.join(output_dir, output)
+        
+        size = os.path.getsize(source_path)
+        if size > STREAM_THRESHOLD:
+            content_hash, text = hash_file(source_path), None
+        else:
+            with open(source_path, "rb") as f:
+                data = f.read()
+            content_hash, text = hash_bytes(data), data.decode("utf-8")
+        
+        fresh = cache is not None and not force and cache.is_fresh(source, content_hash, output_path)
+        if fresh and source not in graph:
+            links, images = scan(source_path, text, extract_page_links)
+            with lock:
+                graph.set_page(source, links, images)
+        if search is not None and fresh and source not in search:
+            title, terms = scan(source_path, text, extract_page_terms)
+            with lock:
+                search.set_page(source, output.replace(os.sep, "/"), title, terms)
+        if fresh:
+            with lock:
+                skipped.append(source)
+            return None
+        
+        blocks_path = None
+        blocks_hash = None
+        if cache is not None and size >= BLOCK_CACHE_THRESHOLD:
+            blocks_path = block_cache_path(os.path.dirname(cache.path), source)
+            if force and os.path.exists(blocks_path):
+                os.remove(blocks_path)
+            blocks_hash = cache.generator_hash
+            if search is not None:
+                # Blocks summarized with their search terms are kept apart
+                blocks_hash = hash_bytes((blocks_hash + "\0search").encode("utf-8"))
+        return PageJob(source, content_hash, output, source_path, output_path, text, template_path,
+                       blocks_path, blocks_hash, search is not None)
+    
+    def write(batch):
+        for job, rendered in batch:
+            html, page_links, page_terms, stats = rendered
+            previous_hash = cache.output_hash(job.source) if cache is not None else None
+            if html is not None:
+                status, output_hash = write_if_changed(job.output_path, html.encode("utf-8"), previous_hash)
+            else:
+                status, output_hash = finalize_partial(job.output_path, previous_hash)
+            with lock:
+                if stats is not None and recorder is not None:
+                    recorder.merge(stats)
+                graph.set_page(job.source, *page_links)
+                if page_terms is not None:
+                    search.set_page(job.source, job.output.replace(os.sep, "/"), *page_terms)
+                if status is not None:
+                    result.changes[status].append(job.output)
+                written.append((job, output_hash))
+    
+    if jobs > 1:
+        with make_render_pool(jobs, fragment_cache_size, image_urls, minify) as pool:
+            run_pipeline(sources, read, _render_worker_job, write, pool=pool,
+                         chunk_size=chunk_size(len(sources), jobs), **pipeline_options)
+    else:
+        previous_cache = get_fragment_cache()
+        previous_urls = get_image_urls()
+        previous_minify = use_minify(False)
+        _init_worker(fragment_cache_size, image_urls=image_urls, minify=minify)
+        try:
+            run_pipeline(sources, read, lambda job: render_job(job) + (None,), write, **pipeline_options)
+        finally:
+            use_fragment_cache(previous_cache)
+            use_image_urls(previous_urls)
+            use_minify(previous_minify)
+    
+    written.sort(key=lambda item: item[0].source)
+    for job, output_hash in written:
+        if cache is not None:
+            cache.record(job.source, job.content_hash, job.output, output_hash)
+        result.rendered.append(job.source)
+    result.skipped = sorted(skipped)
+    for source in set(graph.pages) - set(sources):
+        graph.remove_page(source)
+    if search is not None:
+        for source in set(search.pages) - set(sources):
+            search.remove_page(source)
+    
+    if cache is not None:
+        # Drop outputs whose source no longer exists
+        for source in sorted(set(cache.pages) - set(sources)):
+            entry = cache.forget(source)
+            stale_path = os.path.join(output_dir, entry["output"])
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+                result.changes["removed"].append(entry["output"])
+            blocks_path = block_cache_path(os.path.dirname(cache.path), source)
+            if os.path.exists(blocks_path):
+                os.remove(blocks_path)
+            result.removed.append(source)
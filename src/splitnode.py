@@ -1,7 +1,23 @@
+import re
+
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from instrument import stage
 from textnode import TextNode, TextType
-from convertnode import extract_markdown_images, extract_markdown_links
+from convertnode import (INLINE_PATTERNS,
+                         iter_markdown_image_spans,
+                         iter_markdown_link_spans)
+
+# Markers the inline scanner stops at, longest first so "**" wins over "*".
+_INLINE_MARKER_RE = re.compile(r"!\[|\[|`|\*\*|\*|_")
 
+_INLINE_DELIMITERS = {
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+@stage("split")
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     """
     Split plain-text nodes into alternating text segments based on a delimiter.
@@ -76,6 +92,46 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
                     
     return new_nodes
 
+def _split_nodes_spans(old_nodes, iter_spans, text_type):
+    """Shared single-pass splitter behind `split_nodes_image` and `split_nodes_link`.
+
+    Each plain-text node is scanned once by `iter_spans`, which yields
+    (start, end, text, url) for every match; the text between spans is sliced
+    out as plain text, so the work per node is linear in its length regardless
+    of how many matches it contains.
+    """
+    
+    new_nodes = []
+    
+    for node in old_nodes:
+
+        # If the node is not TextType.PLAIN, just append it
+        if node.text_type != TextType.PLAIN:
+            new_nodes.append(node)
+            continue
+        
+        text = node.text
+        last_end = 0
+        
+        for start, end, match_text, url in iter_spans(text):
+            
+            # Add TextNode only if non-empty as per spec
+            if start > last_end:
+                new_nodes.append(TextNode(text[last_end:start], TextType.PLAIN))
+                
+            new_nodes.append(TextNode(match_text, text_type, url=url))
+            last_end = end
+        
+        if last_end == 0:
+            # No matches, just append original TextNode if nonempty
+            if text != "":
+                new_nodes.append(node)
+        elif last_end < len(text):
+            new_nodes.append(TextNode(text[last_end:], TextType.PLAIN))
+                    
+    return new_nodes
+
+@stage("split")
 def split_nodes_image(old_nodes):
     """
     Split plain-text nodes into text and image nodes based on Markdown image syntax.
@@ -89,6 +145,8 @@ def split_nodes_image(old_nodes):
     containing the image alt text and URL. Any surrounding plain text is preserved
     as separate `TextNode` objects of type `TextType.PLAIN`.
 
+    Matches are found with a single iterative scan over each node's text, so
+    any number of images is handled in linear time without recursion.
     Non-plain nodes are left untouched and copied directly to the result.
 
     Args:
@@ -102,42 +160,9 @@ def split_nodes_image(old_nodes):
             with surrounding text preserved as `TextType.PLAIN` nodes.
     """
     
-    new_nodes = []
-    
-    for node in old_nodes:
-
-        # If the node is not TextType.PLAIN, just append it
-        if node.text_type != TextType.PLAIN:
-            new_nodes.append(node)
-            continue
-        
-        all_images = extract_markdown_images(node.text)
-        
-        if len(all_images) == 0:
-            # No more images, just append original TextNode if nonempty
-            if node.text != "":
-                new_nodes.append(node)
-            break
-        
-        image_alt, image_link = all_images[0]
-        splitted = node.text.split(f"![{image_alt}]({image_link})", 1)
-
-        # Add TextNode only if non-empty as per spec
-        if len(splitted[0]) != 0:
-            new_nodes.append(TextNode(splitted[0], TextType.PLAIN))
-            
-        # Add image node
-        new_nodes.append(TextNode(image_alt, TextType.IMAGE, url=image_link))
-        
-        # Recursively repeat for remaining substring
-        remaining = splitted[1]
-        out = split_nodes_image([TextNode(remaining, TextType.PLAIN)])
-        
-        if len(out) > 0:
-            new_nodes.extend(out)
-                    
-    return new_nodes
+    return _split_nodes_spans(old_nodes, iter_markdown_image_spans, TextType.IMAGE)
     
+@stage("split")
 def split_nodes_link(old_nodes):
     """
     Split plain-text nodes into text and link nodes based on Markdown link syntax.
@@ -151,9 +176,10 @@ def split_nodes_link(old_nodes):
     containing the link text and URL. Any surrounding plain text is preserved
     as separate `TextNode` objects of type `TextType.PLAIN`.
 
-    The function processes one link at a time recursively until all links in the
-    node have been converted. Nodes that are not `TextType.PLAIN` are copied
-    directly into the output list without modification.
+    All links in a node are found with a single iterative scan over its text,
+    so the cost is linear in the text length with no recursion. Nodes that are
+    not `TextType.PLAIN` are copied directly into the output list without
+    modification.
 
     Args:
         old_nodes (List[TextNode]):
@@ -165,38 +191,120 @@ def split_nodes_link(old_nodes):
             plain-text nodes has been converted into `TextType.LINK` nodes,
             with surrounding text preserved as `TextType.PLAIN` nodes.
     """
+    
+    return _split_nodes_spans(old_nodes, iter_markdown_link_spans, TextType.LINK)
+
+
+@stage("split")
+def text_to_textnodes(text):
+    """
+    Convert raw inline markdown into a list of TextNode objects in one pass.
+
+    The text is scanned once from left to right. At each position the scanner
+    jumps to the next inline marker and recognizes:
+
+        - `code`            -> TextType.CODE
+        - **bold**          -> TextType.BOLD
+        - _italic_, *italic* -> TextType.ITALIC
+        - ![alt](url)       -> TextType.IMAGE
+        - [text](url)       -> TextType.LINK
+
+    Delimited text is taken literally up to the matching closing delimiter,
+    so markers inside it are not parsed again (nesting is not supported).
+    A "[" or "![" that does not form a complete link or image is kept as
+    plain text. Empty plain segments are dropped, while empty delimited
+    segments (e.g. "****") are kept, matching `split_nodes_delimiter`.
+
+    Every character is visited a constant number of times, so the cost is
+    linear in the length of the text, unlike chaining `split_nodes_delimiter`,
+    `split_nodes_image` and `split_nodes_link`.
+
+    Args:
+        text (str):
+            Raw markdown text containing inline formatting.
+
+    Raises:
+        ValueError: If a delimiter has no matching closing delimiter.
+
+    Returns:
+        List[TextNode]:
+            The TextNode objects for the text, in source order.
+    """
+    
     new_nodes = []
+    plain_start = 0
+    pos = 0
     
-    for node in old_nodes:
+    while True:
+        marker = _INLINE_MARKER_RE.search(text, pos)
+        if marker is None:
+            break
+        
+        start = marker.start()
+        token = marker.group()
+        
+        if token == "![" or token == "[":
+            pattern = INLINE_PATTERNS["image" if token == "![" else "link"]
+            match = pattern.match(text, start)
+            if match is None:
+                # Not a complete image/link, keep the bracket as plain text
+                pos = start + len(token)
+                continue
+            
+            text_type = TextType.IMAGE if token == "![" else TextType.LINK
+            node = TextNode(match.group(1), text_type, url=match.group(2))
+            end = match.end()
+        else:
+            close = text.find(token, start + len(token))
+            if close == -1:
+                raise ValueError(f"Unmatched delimiter '{token}' in text: {text}")
+            
+            node = TextNode(text[start + len(token):close], _INLINE_DELIMITERS[token])
+            end = close + len(token)
+        
+        # Flush the plain text that preceded the marker
+        if start > plain_start:
+            new_nodes.append(TextNode(text[plain_start:start], TextType.PLAIN))
+        new_nodes.append(node)
+        plain_start = pos = end
+    
+    if plain_start < len(text):
+        new_nodes.append(TextNode(text[plain_start:], TextType.PLAIN))
+    
+    return new_nodes
+
+@stage("split")
+def split_nodes_inline(old_nodes):
+    """
+    Split plain-text nodes into inline-formatted nodes with a single scan.
+
+    This is the node-list counterpart of `text_to_textnodes`: every
+    `TextType.PLAIN` node is replaced by the nodes produced by scanning its
+    text once, and nodes of any other type are copied unchanged. It replaces
+    chaining `split_nodes_delimiter` for each delimiter followed by
+    `split_nodes_image` and `split_nodes_link`.
+
+    Args:
+        old_nodes (List[TextNode]):
+            A list of TextNode objects to process.
 
+    Raises:
+        ValueError: If a delimiter in a plain-text node is unmatched.
+
+    Returns:
+        List[TextNode]:
+            A new list of TextNode objects with all inline markdown converted.
+    """
+    
+    new_nodes = []
+    
+    for node in old_nodes:
+        
         # If the node is not TextType.PLAIN, just append it
         if node.text_type != TextType.PLAIN:
             new_nodes.append(node)
             continue
         
-        all_links = extract_markdown_links(node.text)
-        
-        if len(all_links) == 0:
-            # No more images, just append original TextNode if nonempty
-            if node.text != "":
-                new_nodes.append(node)
-            break
-        
-        link_text, link_url = all_links[0]
-        splitted = node.text.split(f"[{link_text}]({link_url})", 1)
-
-        # Add TextNode only if non-empty as per spec
-        if len(splitted[0]) != 0:
-            new_nodes.append(TextNode(splitted[0], TextType.PLAIN))
-            
-        # Add link node
-        new_nodes.append(TextNode(link_text, TextType.LINK, url=link_url))
-        
-        # Recursively repeat for remaining substring
-        remaining = splitted[1]
-        out = split_nodes_link([TextNode(remaining, TextType.PLAIN)])
-
-        if len(out) > 0:
-            new_nodes.extend(out)
-                    
-    return new_nodes
\ No newline at end of file
+        new_nodes.extend(text_to_textnodes(node.text))
+    
+    return new_nodes
@@ -0,0 +1,124 @@
+import io
+import os
+import re
+
+from htmlnode import escape_html_attr
+from instrument import stage
+
+# A placeholder such as "{{ Title }}"; names are case-insensitive
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([A-Za-z_][\w-]*)\s*\}\}")
+
+
+class Template:
+    """A page layout compiled into literal segments and the slots between them.
+
+    Rendering alternates `segments` and the values of `slots`, so the layout
+    is scanned once when it is compiled and never again per page. There is
+    always one more segment than there are slots.
+    """
+    
+    __slots__ = ("segments", "slots")
+    
+    def __init__(self, segments, slots):
+        if len(segments) != len(slots) + 1:
+            raise ValueError("Template must have one more segment than slots")
+        self.segments = segments
+        self.slots = slots
+    
+    def iter_render(self, values):
+        """Yields the page's HTML fragments in order.
+
+        Args:
+            values (Dict[string, object]): Slot name (lowercase) to value.
+                Strings are escaped; anything else must be a node-like
+                object with `iter_html()`, e.g. the page's HTMLNode tree.
+                Slots without a value render as nothing.
+        """
+        
+        segments = self.segments
+        if segments[0]:
+            yield segments[0]
+        for slot, segment in zip(self.slots, segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                pass
+            elif isinstance(value, str):
+                yield escape_html_attr(value)
+            else:
+                yield from value.iter_html()
+            if segment:
+                yield segment
+    
+    def render(self, values):
+        # Goes through render_to so pages held in memory report the same
+        # stages as streamed ones
+        buffer = io.StringIO()
+        self.render_to(buffer, values)
+        return buffer.getvalue()
+    
+    @stage("template")
+    def render_to(self, fileobj, values):
+        # Like iter_render, but node-like values stream themselves to the
+        # file with `render_to`. Returns the number of characters written.
+        write = fileobj.write
+        segments = self.segments
+        write(segments[0])
+        written = len(segments[0])
+        for slot, segment in zip(self.slots, segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                pass
+            elif isinstance(value, str):
+                value = escape_html_attr(value)
+                write(value)
+                written += len(value)
+            else:
+                written += value.render_to(fileobj) or 0
+            write(segment)
+            written += len(segment)
+        return written
+    
+    def __repr__(self):
+        return f"Template(slots={self.slots})"
+
+
+def compile_template(text):
+    """Compiles template text into a Template.
+
+    Args:
+        text (string): HTML with "{{ Name }}" placeholders.
+
+    Returns:
+        Template: The compiled template; slot names are lowercased.
+    """
+    
+    segments = []
+    slots = []
+    position = 0
+    for match in PLACEHOLDER_RE.finditer(text):
+        segments.append(text[position:match.start()])
+        slots.append(match.group(1).lower())
+        position = match.end()
+    segments.append(text[position:])
+    return Template(segments, slots)
+
+
+# Template path -> ((mtime_ns, size), Template)
+_templates = {}
+
+def load_template(path):
+    """Returns the compiled template at `path`, compiling it at most once.
+
+    The cached template is reused until the file's mtime or size changes.
+    """
+    
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _templates.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
+    with open(path, "r", encoding="utf-8") as f:
+        template = compile_template(f.read())
+    _templates[path] = (stamp, template)
+    return template
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+
+from assets import (copy_assets, copy_file, fingerprinted_name, image_url_map,
+                    rewrite_image_sources)
+from htmlnode import LeafNode, ParentNode
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.write("css/site.css", "body {}")
+        self.write("img/logo.png", "PNG")
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def write(self, name, text):
+        path = os.path.join(self.static, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+            
+    def read_output(self, name):
+        with open(os.path.join(self.output, name)) as f:
+            return f.read()
+        
+    def copy(self, **kwargs):
+        return copy_assets(self.static, self.output, self.cache_dir, **kwargs)
+    
+    def test_copy_file_keeps_mtime(self):
+        source = os.path.join(self.static, "css", "site.css")
+        os.utime(source, ns=(5, 5))
+        destination = os.path.join(self.tmp.name, "copy.css")
+        copy_file(source, destination)
+        with open(destination) as f:
+            self.assertEqual(f.read(), "body {}")
+        self.assertEqual(os.stat(destination).st_mtime_ns, 5)
+        
+    def test_copy_and_skip_unchanged(self):
+        result = self.copy()
+        self.assertEqual(result.copied, [os.path.join("css", "site.css"), os.path.join("img", "logo.png")])
+        self.assertEqual(self.read_output("css/site.css"), "body {}")
+        
+        result = self.copy()
+        self.assertEqual(result.copied, [])
+        self.assertEqual(len(result.skipped), 2)
+        
+    def test_touched_asset_is_not_copied(self):
+        self.copy()
+        os.utime(os.path.join(self.static, "css", "site.css"), ns=(5, 5))
+        result = self.copy()
+        self.assertEqual(result.copied, [])
+        self.assertEqual(result.changes["modified"], [])
+        
+    def test_changed_asset_is_copied(self):
+        self.copy()
+        self.write("css/site.css", "body { margin: 0 }")
+        result = self.copy()
+        self.assertEqual(result.copied, [os.path.join("css", "site.css")])
+        self.assertEqual(result.changes["modified"], [os.path.join("css", "site.css")])
+        
+    def test_duplicates_are_linked(self):
+        self.write("img/copy.png", "PNG")
+        result = self.copy()
+        self.assertEqual(result.deduplicated, [os.path.join("img", "logo.png")])
+        self.assertEqual(os.stat(os.path.join(self.output, "img", "copy.png")).st_ino,
+                         os.stat(os.path.join(self.output, "img", "logo.png")).st_ino)
+        
+    def test_link_mode(self):
+        self.copy(link=True)
+        self.assertEqual(os.stat(os.path.join(self.output, "css", "site.css")).st_ino,
+                         os.stat(os.path.join(self.static, "css", "site.css")).st_ino)
+        
+    def test_removed_asset(self):
+        self.copy()
+        os.remove(os.path.join(self.static, "css", "site.css"))
+        result = self.copy()
+        self.assertEqual(result.removed, [os.path.join("css", "site.css")])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "css", "site.css")))
+        
+    def test_fingerprint(self):
+        result = self.copy(fingerprint=True)
+        logo = result.outputs["img/logo.png"]
+        self.assertRegex(logo, r"^img/logo\.[0-9a-f]{10}\.png$")
+        self.assertEqual(result.outputs["css/site.css"], "css/site.css")
+        self.assertEqual(self.read_output(logo), "PNG")
+        
+        # A new version replaces the old fingerprinted file
+        self.write("img/logo.png", "PNG2")
+        result = self.copy(fingerprint=True)
+        self.assertNotEqual(result.outputs["img/logo.png"], logo)
+        self.assertFalse(os.path.exists(os.path.join(self.output, logo)))
+        
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("a/b.PNG", "0123456789abcdef"), "a/b.0123456789.PNG")
+        self.assertEqual(fingerprinted_name("a/b.css", "0123456789abcdef"), "a/b.css")
+        
+    def test_rewrite_image_sources(self):
+        urls = image_url_map({"img/a.png": "img/a.123.png", "site.css": "site.css"})
+        self.assertEqual(urls, {"/img/a.png": "/img/a.123.png", "img/a.png": "/img/a.123.png"})
+        
+        image = LeafNode("img", "", {"src": "/img/a.png", "alt": "A"})
+        other = LeafNode("img", "", {"src": "/img/b.png", "alt": "B"})
+        tree = ParentNode("p", [image, ParentNode("b", [other])])
+        before = image.props_to_html()
+        rewrite_image_sources(tree, urls)
+        self.assertNotEqual(image.props_to_html(), before)
+        self.assertEqual(tree.to_html(),
+                         '<p><img src="/img/a.123.png" alt="A"><b><img src="/img/b.png" alt="B"></b></p>')
+
+
+if __name__ == "__main__":
+    unittest.main()
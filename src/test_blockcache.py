@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import page
+from blockcache import BlockCache, CachedBlock, block_key
+from blockparser import BlockType
+from htmlnode import LeafNode, ParentNode
+from page import BlockSummaries, render_page
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_block_key(self):
+        key = block_key(BlockType.PARAGRAPH, ["a", "b"])
+        self.assertEqual(len(key), 16)
+        self.assertEqual(key, block_key(BlockType.PARAGRAPH, ["a", "b"]))
+        self.assertNotEqual(key, block_key(BlockType.QUOTE, ["a", "b"]))
+        self.assertNotEqual(key, block_key(BlockType.PARAGRAPH, ["a b"]))
+        
+    def test_cached_block_in_tree(self):
+        node = ParentNode("div", [CachedBlock("<p>cached</p>"), LeafNode("p", "new")])
+        self.assertEqual(node.to_html(), "<div><p>cached</p><p>new</p></div>")
+        
+    def test_save_and_load(self):
+        blocks = BlockCache()
+        blocks.put(b"k" * 16, "<p>café</p>")
+        blocks.put(b"j" * 16, "")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks", "page.bin")
+            blocks.save(path, "gen")
+            loaded = BlockCache.load(path, "gen")
+            self.assertEqual(loaded.get(b"k" * 16), "<p>café</p>")
+            self.assertEqual(loaded.get(b"j" * 16), "")
+            self.assertIsNone(loaded.get(b"x" * 16))
+            self.assertEqual((loaded.hits, loaded.misses), (2, 1))
+            
+            self.assertIsNone(loaded.get_summary(b"k" * 16))
+            
+            # Fragments from another generator version are never reused
+            self.assertEqual(BlockCache.load(path, "other").previous, {})
+            
+    def test_summaries(self):
+        blocks = BlockCache()
+        blocks.put(b"k" * 16, "<p>a</p>", [["/a.html"], []])
+        blocks.put(b"j" * 16, "<p>b</p>", [])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.bin")
+            blocks.save(path, "gen")
+            loaded = BlockCache.load(path, "gen")
+            self.assertEqual(loaded.get_summary(b"k" * 16), [["/a.html"], []])
+            self.assertEqual(loaded.get_summary(b"j" * 16), [])
+            self.assertEqual(loaded.get(b"j" * 16), "<p>b</p>")
+            
+    def test_render_page_summarizes_cached_blocks(self):
+        markdown = "First [a](/a.html)\n\nSecond ![b](/b.png)\n"
+        summaries = BlockSummaries(lambda node: node.to_html())
+        blocks = BlockCache()
+        render_page(markdown, blocks=blocks, summaries=summaries)
+        self.assertEqual(summaries.items, ['<p>First <a href="/a.html">a</a></p>',
+                                           '<p>Second <img src="/b.png" alt="b"></p>'])
+        
+        # Summaries of unchanged blocks come from the cache
+        summaries = BlockSummaries(lambda node: node.to_html())
+        with mock.patch.object(page, "block_to_html_node", wraps=page.block_to_html_node) as convert:
+            render_page(markdown.replace("First", "Edited"), blocks=blocks, summaries=summaries)
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual(summaries.items[1], '<p>Second <img src="/b.png" alt="b"></p>')
+        
+    def test_load_bad_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.bin")
+            self.assertEqual(BlockCache.load(path, "gen").previous, {})
+            with open(path, "wb") as f:
+                f.write(b"SSBC\x01\x00\x00\x00gen\x05\x00\x00\x00short")
+            self.assertEqual(BlockCache.load(path, "gen").previous, {})
+            
+    def test_render_page_reuses_unchanged_blocks(self):
+        markdown = "# Title\n\nFirst **para**\n\n- a\n- b\n"
+        blocks = BlockCache()
+        self.assertEqual(render_page(markdown, blocks=blocks), render_page(markdown))
+        self.assertEqual(blocks.misses, 3)
+        
+        edited = markdown.replace("First", "Edited")
+        again = BlockCache({key: (html.encode(), None) for key, (html, _) in blocks.current.items()})
+        with mock.patch.object(page, "block_to_html_node", wraps=page.block_to_html_node) as convert:
+            self.assertEqual(render_page(edited, blocks=again), render_page(edited))
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual((again.hits, again.misses), (2, 1))
+        self.assertTrue(again.changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import unittest
+
+from blockparser import BlockType, block_to_html_node, iter_block_nodes, iter_markdown_blocks
+
+
+def render(markdown):
+    return "".join(node.to_html() for node in iter_block_nodes(markdown.splitlines()))
+
+
+class TestBlockParser(unittest.TestCase):
+    def test_blocks_split_on_blank_lines(self):
+        markdown = "# Title\n\nFirst paragraph\nstill first\n\n\n- one\n- two\n"
+        blocks = list(iter_markdown_blocks(markdown.splitlines()))
+        self.assertEqual(blocks, [
+            (BlockType.HEADING, ["# Title"]),
+            (BlockType.PARAGRAPH, ["First paragraph", "still first"]),
+            (BlockType.UNORDERED_LIST, ["- one", "- two"]),
+        ])
+        
+    def test_blocks_change_type_without_blank_line(self):
+        markdown = "Intro\n- item\n1. first\n> quote"
+        block_types = [block_type for block_type, _ in iter_markdown_blocks(markdown.splitlines())]
+        self.assertEqual(block_types, [BlockType.PARAGRAPH, BlockType.UNORDERED_LIST,
+                                       BlockType.ORDERED_LIST, BlockType.QUOTE])
+        
+    def test_consecutive_headings(self):
+        blocks = list(iter_markdown_blocks(["# One", "## Two"]))
+        self.assertEqual(blocks, [(BlockType.HEADING, ["# One"]), (BlockType.HEADING, ["## Two"])])
+        
+    def test_code_fence_keeps_content(self):
+        markdown = "```python\nx = **1**\n\ny = 2\n```\nAfter"
+        blocks = list(iter_markdown_blocks(markdown.splitlines()))
+        self.assertEqual(blocks, [
+            (BlockType.CODE, ["x = **1**", "", "y = 2"]),
+            (BlockType.PARAGRAPH, ["After"]),
+        ])
+        
+    def test_accepts_file_lines(self):
+        source = io.StringIO("Line one\r\nline two\r\n\r\n## Heading\r\n")
+        blocks = list(iter_markdown_blocks(source))
+        self.assertEqual(blocks, [
+            (BlockType.PARAGRAPH, ["Line one", "line two"]),
+            (BlockType.HEADING, ["## Heading"]),
+        ])
+        
+    def test_paragraph_html(self):
+        self.assertEqual(render("Some **bold**\nand _italic_"),
+                         "<p>Some <strong>bold</strong> and <em>italic</em></p>")
+        
+    def test_heading_html(self):
+        self.assertEqual(render("### A `code` title"), "<h3>A <code>code</code> title</h3>")
+        
+    def test_code_html(self):
+        self.assertEqual(render("```\nfirst _line_\nsecond\n```"),
+                         "<pre><code>first _line_\nsecond\n</code></pre>")
+        
+    def test_quote_html(self):
+        self.assertEqual(render("> Quoted **text**\n>continues"),
+                         "<blockquote>Quoted <strong>text</strong> continues</blockquote>")
+        
+    def test_unordered_list_html(self):
+        self.assertEqual(render("- one\n* [two](/two.html)"),
+                         '<ul><li>one</li><li><a href="/two.html">two</a></li></ul>')
+        
+    def test_ordered_list_html(self):
+        self.assertEqual(render("1. first\n2. second"), "<ol><li>first</li><li>second</li></ol>")
+        
+    def test_nested_inline_markup(self):
+        self.assertEqual(render("A **bold [link](/a) with _em_** here"),
+                         '<p>A <strong>bold <a href="/a">link</a> with <em>em</em></strong> here</p>')
+        
+    def test_unclosed_delimiters_render_as_text(self):
+        self.assertEqual(render("use snake_case here, 2 * 3 and a ** b"),
+                         "<p>use snake_case here, 2 * 3 and a ** b</p>")
+        
+    def test_unsupported_block_type(self):
+        with self.assertRaises(ValueError):
+            block_to_html_node("table", ["| a |"])
+
+
+if __name__ == "__main__":
+    unittest.main()
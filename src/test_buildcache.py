@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from buildcache import BuildCache, generator_version_hash, hash_bytes
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "manifest.json")
+        self.output = os.path.join(self.tmp.name, "page.html")
+        with open(self.output, "w") as f:
+            f.write("<p>page</p>")
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def test_hash_bytes_stable(self):
+        self.assertEqual(hash_bytes(b"abc"), hash_bytes(b"abc"))
+        self.assertNotEqual(hash_bytes(b"abc"), hash_bytes(b"abd"))
+        
+    def test_generator_version_hash_cached(self):
+        self.assertEqual(generator_version_hash(), generator_version_hash())
+        
+    def test_record_save_load(self):
+        cache = BuildCache(self.path, generator_hash="gen1")
+        cache.record("page.md", "h1", "page.html")
+        cache.save()
+        
+        loaded = BuildCache(self.path, generator_hash="gen1").load()
+        self.assertTrue(loaded.is_fresh("page.md", "h1", self.output))
+        self.assertFalse(loaded.is_fresh("page.md", "h2", self.output))
+        self.assertFalse(loaded.is_fresh("other.md", "h1", self.output))
+        
+    def test_missing_output_not_fresh(self):
+        cache = BuildCache(self.path, generator_hash="gen1")
+        cache.record("page.md", "h1", "page.html")
+        self.assertFalse(cache.is_fresh("page.md", "h1", self.output + ".missing"))
+        
+    def test_generator_change_invalidates(self):
+        cache = BuildCache(self.path, generator_hash="gen1")
+        cache.record("page.md", "h1", "page.html")
+        cache.save()
+        
+        loaded = BuildCache(self.path, generator_hash="gen2").load()
+        self.assertEqual(loaded.pages, {})
+        
+    def test_corrupt_manifest_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        cache = BuildCache(self.path, generator_hash="gen1").load()
+        self.assertEqual(cache.pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
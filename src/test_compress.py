@@ -0,0 +1,70 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import GZIP, available_encodings, compress_file, precompress
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "public")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.write("index.html", "<p>hello</p>" * 100)
+        self.write("css/site.css", "body { margin: 0 }\n" * 50)
+        self.write("img/logo.png", "PNG" * 100)
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def write(self, name, text):
+        path = os.path.join(self.output, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+            
+    def path(self, name):
+        return os.path.join(self.output, name)
+    
+    def test_gzip_is_always_available(self):
+        self.assertIn(GZIP, available_encodings())
+        
+    def test_precompress(self):
+        result = precompress(self.output, self.cache_dir, jobs=2, encodings=[GZIP])
+        self.assertEqual(result.compressed, [os.path.join("css", "site.css"), "index.html"])
+        self.assertEqual(result.changes["added"], [os.path.join("css", "site.css.gz"), "index.html.gz"])
+        with gzip.open(self.path("index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+        self.assertFalse(os.path.exists(self.path("img/logo.png.gz")))
+        
+    def test_unchanged_files_are_skipped(self):
+        precompress(self.output, self.cache_dir, encodings=[GZIP])
+        os.utime(self.path("index.html.gz"), ns=(1, 1))
+        self.write("css/site.css", "body { margin: 1px }\n" * 50)
+        
+        result = precompress(self.output, self.cache_dir, encodings=[GZIP])
+        self.assertEqual(result.skipped, ["index.html"])
+        self.assertEqual(result.changes["modified"], [os.path.join("css", "site.css.gz")])
+        self.assertEqual(os.stat(self.path("index.html.gz")).st_mtime_ns, 1)
+        
+    def test_sidecars_of_removed_files_are_deleted(self):
+        precompress(self.output, None, encodings=[GZIP])
+        os.remove(self.path("index.html"))
+        result = precompress(self.output, None, encodings=[GZIP])
+        self.assertEqual(result.changes["removed"], ["index.html.gz"])
+        self.assertFalse(os.path.exists(self.path("index.html.gz")))
+        
+    def test_small_files_get_no_sidecar(self):
+        self.write("tiny.js", "x")
+        content_hash, written, changes = compress_file(self.path("tiny.js"), [GZIP])
+        self.assertEqual((written, changes), ([], []))
+        self.assertFalse(os.path.exists(self.path("tiny.js.gz")))
+        
+    def test_unsupported_encoding(self):
+        with self.assertRaises(ValueError):
+            precompress(self.output, encodings=["zip"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,16 @@ import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from textnode import TextNode, TextType
-from convertnode import (convert_textnode_to_htmlnode, 
+from convertnode import (TEXT_TYPE_CONVERTERS,
+                        convert_textnode_to_htmlnode, 
+                        convert_textnodes_to_htmlnodes,
+                        register_text_type_converter,
                         extract_markdown_images,
-                        extract_markdown_links)
+                        extract_markdown_links,
+                        iter_markdown_image_matches,
+                        iter_markdown_image_spans,
+                        iter_markdown_link_matches,
+                        iter_markdown_link_spans)
 
 
 class TestConvertNode(unittest.TestCase):
@@ -26,6 +33,12 @@ class TestConvertNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "em")
         self.assertEqual(html_node.value, "Italic text")
         
+    def test_code_text_to_html_conversion(self):
+        node = TextNode("print()", TextType.CODE)
+        html_node = convert_textnode_to_htmlnode(node)
+        self.assertEqual(html_node.tag, "code")
+        self.assertEqual(html_node.value, "print()")
+        
     def test_link_text_to_html_conversion(self):
         node = TextNode("Click here", TextType.LINK, url="http://example.com")
         html_node = convert_textnode_to_htmlnode(node)
@@ -40,6 +53,51 @@ class TestConvertNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": "http://example.com/image.png", "alt": "An image"})
         
+    def test_link_without_url_conversion(self):
+        node = TextNode("Click here", TextType.LINK)
+        with self.assertRaises(ValueError):
+            convert_textnode_to_htmlnode(node)
+            
+    def test_non_textnode_conversion(self):
+        with self.assertRaises(ValueError):
+            convert_textnode_to_htmlnode("not a node")
+            
+    def test_batch_conversion(self):
+        nodes = [
+            TextNode("Plain ", TextType.PLAIN),
+            TextNode("bold", TextType.BOLD),
+            TextNode("link", TextType.LINK, url="http://example.com"),
+        ]
+        html_nodes = convert_textnodes_to_htmlnodes(nodes)
+        self.assertEqual([n.to_html() for n in html_nodes],
+                         ["Plain ", "<strong>bold</strong>", '<a href="http://example.com">link</a>'])
+        
+    def test_batch_conversion_empty(self):
+        self.assertEqual(convert_textnodes_to_htmlnodes([]), [])
+        
+    def test_batch_conversion_generator(self):
+        html_nodes = convert_textnodes_to_htmlnodes(TextNode(t, TextType.PLAIN) for t in "ab")
+        self.assertEqual([n.to_html() for n in html_nodes], ["a", "b"])
+        
+    def test_batch_conversion_invalid_item(self):
+        with self.assertRaises(ValueError):
+            convert_textnodes_to_htmlnodes([TextNode("ok", TextType.PLAIN), "not a node"])
+            
+    def test_batch_conversion_unsupported_type(self):
+        node = TextNode("text", TextType.PLAIN)
+        node.text_type = "strikethrough"
+        with self.assertRaises(ValueError):
+            convert_textnodes_to_htmlnodes([node])
+            
+    def test_register_text_type_converter(self):
+        original = TEXT_TYPE_CONVERTERS[TextType.BOLD]
+        try:
+            register_text_type_converter(TextType.BOLD, lambda node: LeafNode("b", node.text))
+            html_node = convert_textnode_to_htmlnode(TextNode("Bold text", TextType.BOLD))
+            self.assertEqual(html_node.to_html(), "<b>Bold text</b>")
+        finally:
+            register_text_type_converter(TextType.BOLD, original)
+        
     def test_extract_markdown_image_basic(self):
         markdown_text = "Here is an image: ![Alt text](http://example.com/image.png)"
         images = extract_markdown_images(markdown_text)
@@ -162,4 +220,28 @@ class TestConvertNode(unittest.TestCase):
         # Ignore image links
         self.assertEqual(links, [])
         
-        
\ No newline at end of file
+    def test_iter_markdown_image_matches(self):
+        markdown_text = "![one](a.png) and ![two](b.png)"
+        matches = iter_markdown_image_matches(markdown_text)
+        self.assertEqual([m.groups() for m in matches], [("one", "a.png"), ("two", "b.png")])
+        
+    def test_iter_markdown_link_matches_skips_images(self):
+        markdown_text = "![img](a.png) and [link](http://example.com)"
+        matches = list(iter_markdown_link_matches(markdown_text))
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].group(0), "[link](http://example.com)")
+        
+    def test_iter_markdown_image_spans(self):
+        markdown_text = "Start ![Alt](http://example.com/i.png) end"
+        spans = list(iter_markdown_image_spans(markdown_text))
+        self.assertEqual(spans, [(6, 38, "Alt", "http://example.com/i.png")])
+        self.assertEqual(markdown_text[6:38], "![Alt](http://example.com/i.png)")
+        
+    def test_iter_markdown_link_spans(self):
+        markdown_text = "[a](x)[b](y)"
+        spans = list(iter_markdown_link_spans(markdown_text))
+        self.assertEqual(spans, [(0, 6, "a", "x"), (6, 12, "b", "y")])
+        
+    def test_iter_markdown_link_spans_none(self):
+        self.assertEqual(list(iter_markdown_link_spans("No links here.")), [])
+
@@ -0,0 +1,188 @@
+import functools
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from devserver import (LIVE_RELOAD_PATH, LIVE_RELOAD_SCRIPT, DevRequestHandler, ReloadNotifier,
+                       SiteWatcher, diff_snapshots, snapshot_sources)
+from linkgraph import check_links
+from page import markdown_to_html_node
+from searchindex import lookup
+from sitebuild import SEARCH_INDEX_NAME, build_site
+
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.write_source("index.md", "Hello")
+        self.write_source("docs/guide.md", "Guide")
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def write_source(self, name, text):
+        path = os.path.join(self.content, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        # Make sure the change is visible even on coarse mtime filesystems
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            
+    def read_output(self, name):
+        with open(os.path.join(self.output, name)) as f:
+            return f.read()
+        
+    def test_snapshot_and_diff(self):
+        old = snapshot_sources(self.content)
+        self.assertEqual(sorted(old), [os.path.join("docs", "guide.md"), "index.md"])
+        
+        self.write_source("index.md", "Changed")
+        self.write_source("new.md", "New")
+        os.remove(os.path.join(self.content, "docs", "guide.md"))
+        changed, removed = diff_snapshots(old, snapshot_sources(self.content))
+        self.assertEqual(changed, ["index.md", "new.md"])
+        self.assertEqual(removed, [os.path.join("docs", "guide.md")])
+        
+    def test_snapshot_missing_dir(self):
+        self.assertEqual(snapshot_sources(os.path.join(self.tmp.name, "missing")), {})
+        
+    def test_watcher_rebuilds_only_changed(self):
+        watcher = SiteWatcher(self.content, self.output, cache_dir=self.cache_dir)
+        result = watcher.start()
+        self.assertEqual(len(result.rendered), 2)
+        self.assertEqual(watcher.poll(), ([], [], {}))
+        
+        self.write_source("index.md", "Hello **again**")
+        rendered, removed, errors = watcher.poll()
+        self.assertEqual(rendered, ["index.md"])
+        self.assertEqual(self.read_output("index.html"), "<div><p>Hello <strong>again</strong></p></div>")
+        watcher.close()
+        
+    def test_watcher_skips_touched_but_unchanged(self):
+        for cache_dir in (self.cache_dir, None):
+            watcher = SiteWatcher(self.content, self.output, cache_dir=cache_dir)
+            watcher.start()
+            self.write_source("index.md", "Hello")
+            self.assertEqual(watcher.poll(), ([], [], {}))
+            watcher.close()
+        
+    def test_watcher_reports_errors_and_removals(self):
+        watcher = SiteWatcher(self.content, self.output, cache_dir=None)
+        watcher.start()
+        with open(os.path.join(self.content, "index.md"), "wb") as f:
+            f.write(b"Not UTF-8: \xff")
+        os.remove(os.path.join(self.content, "docs", "guide.md"))
+        
+        rendered, removed, errors = watcher.poll()
+        self.assertEqual(rendered, [])
+        self.assertEqual(removed, [os.path.join("docs", "guide.md")])
+        self.assertIsInstance(errors["index.md"], ValueError)
+        self.assertFalse(os.path.exists(os.path.join(self.output, "docs", "guide.html")))
+        watcher.close()
+        
+    def test_watch_with_build_options(self):
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(static)
+        with open(os.path.join(static, "logo.png"), "w") as f:
+            f.write("PNG")
+        watcher = SiteWatcher(self.content, self.output, cache_dir=self.cache_dir, static_dir=static,
+                              fingerprint=True, minify=True)
+        result = watcher.start()
+        logo = result.assets.outputs["logo.png"]
+        self.assertTrue(os.path.exists(os.path.join(self.output, logo)))
+        # The manifest matches the build's settings, so nothing is stale
+        self.assertEqual(watcher.poll(), ([], [], {}))
+        
+        self.write_source("index.md", "![Logo](/logo.png)   and    **more**")
+        self.assertEqual(watcher.poll()[0], ["index.md"])
+        self.assertEqual(self.read_output("index.html"),
+                         f'<div><p><img src="/{logo}" alt="Logo"> and <strong>more</strong></p></div>')
+        watcher.close()
+        
+        # The watcher's render settings don't outlive it
+        self.assertEqual(markdown_to_html_node("![Logo](/logo.png)   again").to_html(),
+                         '<div><p><img src="/logo.png" alt="Logo">   again</p></div>')
+        
+    def test_watch_then_check(self):
+        self.write_source("index.md", "See [nothing](/nope.html)")
+        watcher = SiteWatcher(self.content, self.output, cache_dir=self.cache_dir)
+        watcher.start()
+        self.write_source("index.md", "See [the guide](/docs/guide.html)")
+        self.write_source("new.md", "[Broken](/gone.html)")
+        watcher.poll()
+        os.remove(os.path.join(self.content, "new.md"))
+        watcher.poll()
+        watcher.close()
+        
+        # The build skips every page, but sees the links as they are now
+        result = build_site(self.content, self.output, cache_dir=self.cache_dir)
+        self.assertEqual(result.rendered, [])
+        self.assertEqual(result.links.sources_linking_to("/docs/guide.html"), ["index.md"])
+        self.assertEqual(check_links(result.links, self.output), [])
+        
+    def test_watch_updates_search_index(self):
+        self.write_source("index.md", "About zebras")
+        watcher = SiteWatcher(self.content, self.output, cache_dir=self.cache_dir, search=True)
+        watcher.start()
+        self.write_source("index.md", "About giraffes")
+        watcher.poll()
+        self.assertEqual(lookup(self.output, "zebras"), [])
+        watcher.close()
+        
+        result = build_site(self.content, self.output, cache_dir=self.cache_dir, search=True)
+        self.assertEqual(result.rendered, [])
+        self.assertEqual(lookup(self.output, "zebras"), [])
+        self.assertEqual(len(lookup(self.output, "giraffes")), 1)
+        
+    def test_watch_without_search_drops_index(self):
+        self.write_source("index.md", "About zebras")
+        build_site(self.content, self.output, cache_dir=self.cache_dir, search=True)
+        watcher = SiteWatcher(self.content, self.output, cache_dir=self.cache_dir)
+        watcher.start()
+        self.write_source("index.md", "About giraffes")
+        watcher.poll()
+        watcher.close()
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, SEARCH_INDEX_NAME)))
+        
+        build_site(self.content, self.output, cache_dir=self.cache_dir, search=True)
+        self.assertEqual(lookup(self.output, "zebras"), [])
+        self.assertEqual(len(lookup(self.output, "giraffes")), 1)
+        
+    def test_notifier_wait(self):
+        notifier = ReloadNotifier()
+        self.assertEqual(notifier.wait(0, timeout=0.01), 0)
+        threading.Timer(0.01, notifier.notify).start()
+        self.assertEqual(notifier.wait(0, timeout=5), 1)
+        
+    def test_server_injects_reload_and_streams_events(self):
+        os.makedirs(self.output)
+        with open(os.path.join(self.output, "index.html"), "w") as f:
+            f.write("<p>Hi</p>")
+        
+        notifier = ReloadNotifier()
+        handler = type("Handler", (DevRequestHandler,), {"notifier": notifier})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=self.output))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(base + "/") as response:
+                self.assertEqual(response.read().decode(), "<p>Hi</p>" + LIVE_RELOAD_SCRIPT)
+            
+            with urllib.request.urlopen(base + LIVE_RELOAD_PATH, timeout=5) as events:
+                threading.Timer(0.05, notifier.notify).start()
+                self.assertEqual(events.readline(), b"data: reload\n")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
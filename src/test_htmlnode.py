@@ -1,5 +1,13 @@
+import io
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import (HTMLNode, LeafNode, ParentNode,
+                      FragmentCache,
+                      disable_fragment_cache,
+                      enable_fragment_cache,
+                      escape_html_attr,
+                      escape_html_text,
+                      structural_hash,
+                      use_minify)
 
 class TestHTMLNode(unittest.TestCase):
     
@@ -103,6 +111,185 @@ class TestHTMLNode(unittest.TestCase):
         parent = ParentNode("wrapper", [child1], props={"role": "main"})
         res = parent.to_html()
         self.assertEqual(res, '<wrapper role="main"><custom-tag data-info="123">Custom Content</custom-tag></wrapper>')
+    def test_escape_html_text(self):
+        self.assertEqual(escape_html_text('a < b && c > "d"'), 'a &lt; b &amp;&amp; c &gt; "d"')
+        
+    def test_escape_html_text_fast_path(self):
+        text = "nothing to escape"
+        self.assertIs(escape_html_text(text), text)
+        
+    def test_escape_html_attr(self):
+        self.assertEqual(escape_html_attr('say "hi" & <bye>'), "say &quot;hi&quot; &amp; &lt;bye&gt;")
+        self.assertEqual(escape_html_attr(42), "42")
+        
+    def test_leaf_escapes_value(self):
+        node = LeafNode("code", "if a < b && c > d:")
+        self.assertEqual(node.to_html(), "<code>if a &lt; b &amp;&amp; c &gt; d:</code>")
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+        
+    def test_props_escape_values(self):
+        node = LeafNode("img", "", props={"src": "/a.png?x=1&y=2", "alt": 'A "quoted" alt'})
+        self.assertEqual(node.to_html(), '<img src="/a.png?x=1&amp;y=2" alt="A &quot;quoted&quot; alt">')
+        
+    def test_props_cache_reset_on_assignment(self):
+        node = LeafNode("a", "Link", props={"href": "/one"})
+        self.assertEqual(node.props_to_html(), ' href="/one"')
+        node.props = {"href": "/two"}
+        self.assertEqual(node.props_to_html(), ' href="/two"')
+        node.props = None
+        self.assertEqual(node.props_to_html(), "")
+        
+    def test_nodes_have_no_instance_dict(self):
+        leaf = LeafNode("p", "text")
+        parent = ParentNode("div", [leaf])
+        self.assertFalse(hasattr(leaf, "__dict__"))
+        self.assertFalse(hasattr(parent, "__dict__"))
+        
+    def test_parent_iter_html_fragments(self):
+        parent = ParentNode("div", [LeafNode("b", "Bold"), ParentNode("p", [LeafNode(None, "text")])])
+        res = list(parent.iter_html())
+        self.assertEqual(res, ["<div>", "<b>Bold</b>", "<p>", "text", "</p>", "</div>"])
+        
+    def test_leaf_iter_html(self):
+        node = LeafNode("p", "Hello")
+        self.assertEqual(list(node.iter_html()), ["<p>Hello</p>"])
+        
+    def test_parent_render_to(self):
+        parent = ParentNode("ul", [ParentNode("li", [LeafNode("em", "one")]), ParentNode("li", [LeafNode(None, "two")])])
+        out = io.StringIO()
+        parent.render_to(out)
+        self.assertEqual(out.getvalue(), "<ul><li><em>one</em></li><li>two</li></ul>")
+        self.assertEqual(out.getvalue(), parent.to_html())
+        
+    def test_parent_nested_error_while_streaming(self):
+        parent = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            parent.to_html()
+        
+    def test_parent_very_deep_to_html(self):
+        # Far deeper than the default recursion limit
+        depth = 5000
+        node = LeafNode("em", "Deep")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        res = node.to_html()
+        self.assertEqual(res, "<div>" * depth + "<em>Deep</em>" + "</div>" * depth)
+
+class TestFragmentCache(unittest.TestCase):
+    
+    def tearDown(self):
+        disable_fragment_cache()
+        
+    def make_footer(self):
+        return ParentNode("footer", [ParentNode("p", [LeafNode("a", "Home", props={"href": "/"})])])
+        
+    def test_structural_hash_equal_for_equal_trees(self):
+        self.assertEqual(structural_hash(self.make_footer()), structural_hash(self.make_footer()))
+        
+    def test_structural_hash_differs(self):
+        other = ParentNode("footer", [ParentNode("p", [LeafNode("a", "Home", props={"href": "/index"})])])
+        self.assertNotEqual(structural_hash(self.make_footer()), structural_hash(other))
+        self.assertNotEqual(structural_hash(LeafNode("b", "x")), structural_hash(LeafNode("i", "x")))
+        
+    def test_cached_render_matches_uncached(self):
+        page = ParentNode("div", [LeafNode("h1", "Title"), self.make_footer(), self.make_footer()])
+        expected = page.to_html()
+        enable_fragment_cache(16)
+        self.assertEqual(page.to_html(), expected)
+        self.assertEqual(page.to_html(), expected)
+        
+    def test_repeated_fragments_hit(self):
+        cache = enable_fragment_cache(16)
+        pages = [ParentNode("div", [LeafNode("p", text), self.make_footer()]) for text in ("One", "Two", "Three")]
+        # Seen once, then stored, then reused
+        pages[0].to_html(cache_root=False)
+        pages[1].to_html(cache_root=False)
+        self.assertEqual((cache.hits, len(cache)), (0, 1))
+        self.assertEqual(pages[2].to_html(cache_root=False),
+                         '<div><p>Three</p><footer><p><a href="/">Home</a></p></footer></div>')
+        self.assertEqual(cache.hits, 1)
+        
+    def test_block_root_is_cached(self):
+        cache = enable_fragment_cache(16)
+        self.make_footer().to_html()
+        self.make_footer().to_html()
+        self.assertEqual(self.make_footer().to_html(), '<footer><p><a href="/">Home</a></p></footer>')
+        # One hit for the whole footer, none for the paragraph inside it,
+        # which was never stored on its own
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(len(cache), 1)
+        
+    def test_unique_subtrees_do_not_evict_shared_ones(self):
+        cache = enable_fragment_cache(4)
+        for i in range(5):
+            unique = [ParentNode("p", [LeafNode("b", f"Page {i} paragraph {j}")]) for j in range(50)]
+            ParentNode("div", [self.make_footer()] + unique).to_html(cache_root=False)
+        # The footer is stored on the second page and reused by the last three
+        self.assertEqual(cache.hits, 3)
+        
+    def test_deep_capture(self):
+        enable_fragment_cache(16)
+        depth = 5000
+        for _ in range(3):
+            node = LeafNode("em", "Deep")
+            for _ in range(depth):
+                node = ParentNode("div", [node])
+            self.assertEqual(node.to_html(), "<div>" * depth + "<em>Deep</em>" + "</div>" * depth)
+        
+    def test_structural_hash_is_kept_until_props_change(self):
+        footer = self.make_footer()
+        digest = structural_hash(footer)
+        self.assertIs(structural_hash(footer), digest)
+        footer.props = {"class": "site"}
+        self.assertNotEqual(structural_hash(footer), digest)
+        
+    def test_cache_errors_still_raised(self):
+        enable_fragment_cache(16)
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode(None, [])]).to_html()
+        
+    def test_lru_eviction(self):
+        cache = FragmentCache(maxsize=2)
+        cache.put("a", "<a>")
+        cache.put("b", "<b>")
+        cache.get("a")
+        cache.put("c", "<c>")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "<a>")
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "size": 2, "maxsize": 2})
+        
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            FragmentCache(maxsize=0)
+        
+
+class TestMinify(unittest.TestCase):
+    def tearDown(self):
+        use_minify(False)
+        disable_fragment_cache()
+        
+    def test_minify_collapses_whitespace(self):
+        node = ParentNode("div", [
+            LeafNode("p", "Some   text\n  here"),
+            ParentNode("pre", [LeafNode("code", "keep\n    this")]),
+            LeafNode(None, "\t tail "),
+        ])
+        self.assertFalse(use_minify(True))
+        self.assertEqual(node.to_html(), "<div><p>Some text here</p><pre><code>keep\n    this</code></pre> tail </div>")
+        self.assertTrue(use_minify(False))
+        self.assertEqual(node.to_html(), "<div><p>Some   text\n  here</p><pre><code>keep\n    this</code></pre>\t tail </div>")
+        
+    def test_minify_after_preserved_element(self):
+        node = ParentNode("div", [ParentNode("pre", [LeafNode(None, "a  b")]), LeafNode("p", "c  d")])
+        use_minify(True)
+        self.assertEqual(node.to_html(), "<div><pre>a  b</pre><p>c d</p></div>")
+        
+    def test_minify_bypasses_fragment_cache(self):
+        cache = enable_fragment_cache(16)
+        use_minify(True)
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "a  b")])])
+        self.assertEqual(node.to_html(), "<div><p>a b</p></div>")
+        self.assertEqual(len(cache), 0)
         
 if __name__ == "__main__":
     unittest.main()        
\ No newline at end of file
@@ -0,0 +1,94 @@
+import time
+import unittest
+
+from convertnode import convert_textnodes_to_htmlnodes
+from htmlnode import LeafNode, ParentNode
+from inlineparser import parse_inline
+from splitnode import text_to_textnodes
+
+
+def render(text, strict=False):
+    return "".join(node.to_html() for node in parse_inline(text, strict))
+
+
+class TestParseInline(unittest.TestCase):
+    def test_plain_text(self):
+        nodes = parse_inline("just text")
+        self.assertEqual(len(nodes), 1)
+        self.assertIsInstance(nodes[0], LeafNode)
+        self.assertEqual((nodes[0].tag, nodes[0].value), (None, "just text"))
+        self.assertEqual(parse_inline(""), [])
+        
+    def test_flat_markup_matches_textnodes(self):
+        text = "A **bold** and _it_ and *it* with `co_de` ![img](/a.png) [link](/b_c.html) end"
+        expected = convert_textnodes_to_htmlnodes(text_to_textnodes(text))
+        self.assertEqual(render(text), "".join(node.to_html() for node in expected))
+        
+    def test_nested_emphasis(self):
+        self.assertEqual(render("**bold _and italic_ text**"),
+                         "<strong>bold <em>and italic</em> text</strong>")
+        self.assertEqual(render("*a **b** c*"), "<em>a <strong>b</strong> c</em>")
+        
+    def test_markup_inside_link(self):
+        self.assertEqual(render("[**bold** link](/a)"), '<a href="/a"><strong>bold</strong> link</a>')
+        
+    def test_link_inside_bold(self):
+        nodes = parse_inline("**see [here](/x)**")
+        self.assertIsInstance(nodes[0], ParentNode)
+        self.assertEqual(nodes[0].to_html(), '<strong>see <a href="/x">here</a></strong>')
+        
+    def test_code_is_literal(self):
+        self.assertEqual(render("`**not bold**`"), "<code>**not bold**</code>")
+        
+    def test_unclosed_delimiters_are_text(self):
+        self.assertEqual(render("2 * 3 and snake_case"), "2 * 3 and snake_case")
+        self.assertEqual(render("a `tick"), "a `tick")
+        
+    def test_strict_raises_on_unclosed(self):
+        with self.assertRaises(ValueError):
+            parse_inline("Unclosed **bold", strict=True)
+        with self.assertRaises(ValueError):
+            parse_inline("a `tick", strict=True)
+            
+    def test_triple_delimiter_run(self):
+        self.assertEqual(render("***both***"), "<em><strong>both</strong></em>")
+        self.assertEqual(render("**a *b***"), "<strong>a <em>b</em></strong>")
+        self.assertEqual(render("*a **b***"), "<em>a <strong>b</strong></em>")
+        self.assertEqual(render("***open"), "***open")
+        self.assertEqual(render("****"), "<strong></strong>")
+        
+    def test_misnested_opener_becomes_text(self):
+        self.assertEqual(render("**a _b** c", strict=True), "<strong>a _b</strong> c")
+        self.assertEqual(render("[snake_case](/x)", strict=True), '<a href="/x">snake_case</a>')
+        
+    def test_pathological_input_is_linear(self):
+        def best_time(text):
+            times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                self.assertEqual(render(text).count("a"), text.count("a"))
+                times.append(time.perf_counter() - start)
+            return min(times)
+        
+        # Four times the input should take about four times as long, where
+        # quadratic parsing would take sixteen
+        for make in (lambda n: "[" * n, lambda n: "[" * n + "_a" * n, lambda n: "[a](" * n,
+                     lambda n: "[" * n + "**a**" * (n // 2)):
+            small = best_time(make(5000))
+            self.assertLess(best_time(make(20000)), 8 * small, make(1)[:20])
+            
+    def test_incomplete_links(self):
+        self.assertEqual(render("[a](b and [c] d"), "[a](b and [c] d")
+        self.assertEqual(render("![alt](x"), "![alt](x")
+        
+    def test_links_do_not_nest(self):
+        self.assertEqual(render("[a [b](/b) c](/a)"), '[a <a href="/b">b</a> c](/a)')
+        
+    def test_empty_emphasis(self):
+        nodes = parse_inline("****")
+        self.assertIsInstance(nodes[0], LeafNode)
+        self.assertEqual(nodes[0].to_html(), "<strong></strong>")
+
+
+if __name__ == "__main__":
+    unittest.main()
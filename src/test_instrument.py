@@ -0,0 +1,106 @@
+import unittest
+
+import instrument
+from htmlnode import LeafNode
+
+
+class TestInstrument(unittest.TestCase):
+    
+    def setUp(self):
+        self.was_installed = instrument._installed
+        
+    def tearDown(self):
+        instrument._installed = self.was_installed
+        instrument.disable()
+        
+    def make_stages(self):
+        # Decorate fresh functions as if instrumentation had been installed
+        instrument._installed = True
+        
+        @instrument.stage("split")
+        def split(text):
+            return text.split()
+        
+        @instrument.stage("render")
+        def render(words):
+            return "<p>" + " ".join(split(" ".join(words))) + "</p>"
+        
+        return split, render
+        
+    def test_not_installed_returns_function_unchanged(self):
+        instrument._installed = False
+        
+        def func():
+            return 1
+        
+        self.assertIs(instrument.stage("split")(func), func)
+        
+    def test_disabled_records_nothing(self):
+        split, _ = self.make_stages()
+        self.assertEqual(split("a b"), ["a", "b"])
+        self.assertIsNone(instrument.get_recorder())
+        
+    def test_records_calls_nodes_and_chars(self):
+        split, render = self.make_stages()
+        recorder = instrument.enable()
+        split("a b c")
+        self.assertEqual(render(["x", "y"]), "<p>x y</p>")
+        
+        self.assertEqual(recorder.stages["split"].calls, 2)
+        self.assertEqual(recorder.stages["split"].nodes, 5)
+        self.assertEqual(recorder.stages["render"].calls, 1)
+        self.assertEqual(recorder.stages["render"].chars, len("<p>x y</p>"))
+        
+    def test_nested_same_stage_counted_once(self):
+        instrument._installed = True
+        
+        @instrument.stage("split")
+        def outer(text):
+            return inner(text)
+        
+        @instrument.stage("split")
+        def inner(text):
+            return [text]
+        
+        recorder = instrument.enable()
+        outer("a")
+        self.assertEqual(recorder.stages["split"].calls, 1)
+        
+    def test_per_page_and_merge(self):
+        split, _ = self.make_stages()
+        recorder = instrument.enable(per_page=True)
+        with instrument.page("index.md"):
+            split("a b")
+        
+        self.assertEqual(recorder.pages["index.md"]["split"].nodes, 2)
+        self.assertEqual(recorder.stages["page"].calls, 1)
+        
+        other = instrument.Recorder(per_page=True)
+        other.merge(recorder.as_dict())
+        other.merge(recorder.as_dict())
+        self.assertEqual(other.stages["split"].calls, 2)
+        self.assertEqual(other.pages["index.md"]["split"].nodes, 4)
+        
+        table = other.summary_table()
+        self.assertIn("split", table)
+        self.assertIn("index.md", table)
+        # The page row is apart from the stages, since it includes them
+        stage_rows = table.split("\n\n")[0]
+        self.assertNotIn("page", stage_rows)
+        self.assertIn("\npage ", table)
+        
+    def test_nodes_are_counted(self):
+        instrument._installed = True
+        
+        @instrument.stage("block")
+        def block(text):
+            return LeafNode("p", text)
+        
+        recorder = instrument.enable()
+        block("a")
+        self.assertEqual(recorder.stages["block"].nodes, 1)
+        self.assertEqual(recorder.stages["block"].chars, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from linkgraph import (IMAGE, LINK, BrokenLink, LinkGraph, check_links, extract_page_links,
+                       is_external, list_output_files, resolve_url)
+
+
+class TestLinkGraph(unittest.TestCase):
+    def test_extract_page_links(self):
+        lines = ["See [a](/a.html) and ![img](img/x.png)", "```", "[not](/code.html)", "```",
+                 "[b](b.html)"]
+        self.assertEqual(extract_page_links(lines), (["/a.html", "b.html"], ["img/x.png"]))
+        
+    def test_links_are_what_renders(self):
+        # Code spans are not links; wrapped links and nested images are
+        lines = ["Write `[text](page.html)` for a [wrapped", "link](nowhere.html).", "",
+                 "[**bold** ![in](/i.png)](/b.html)"]
+        self.assertEqual(extract_page_links(lines), (["nowhere.html", "/b.html"], ["/i.png"]))
+        self.assertEqual(extract_page_links(["---", "title: [x](/fm.html)", "---", "Text"]), ([], []))
+        
+    def test_reverse_lookup(self):
+        graph = LinkGraph()
+        graph.set_page("a.md", ["/c.html"], [])
+        graph.set_page("b.md", ["/c.html"], ["/c.html"])
+        self.assertEqual(graph.sources_linking_to("/c.html"), ["a.md", "b.md"])
+        
+        graph.remove_page("a.md")
+        self.assertEqual(graph.sources_linking_to("/c.html"), ["b.md"])
+        self.assertEqual(graph.sources_linking_to("/missing.html"), [])
+        
+    def test_save_and_load(self):
+        graph = LinkGraph()
+        graph.set_page("index.md", ["/blog/post.html", "https://example.com"], ["/logo.png"])
+        graph.set_page(os.path.join("blog", "post.md"), ["/index.html"], [])
+        graph.set_page("empty.md", [], [])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "links.bin")
+            self.assertTrue(graph.dirty)
+            graph.save(path)
+            self.assertFalse(graph.dirty)
+            loaded = LinkGraph.load(path)
+            self.assertEqual(loaded.pages, graph.pages)
+            self.assertFalse(loaded.dirty)
+            
+            # Setting the same targets again is not a change
+            loaded.set_page("empty.md", [], [])
+            self.assertFalse(loaded.dirty)
+            loaded.set_page("empty.md", ["/index.html"], [])
+            self.assertTrue(loaded.dirty)
+    
+    def test_load_bad_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "links.bin")
+            self.assertEqual(len(LinkGraph.load(path)), 0)
+            with open(path, "wb") as f:
+                f.write(b"SSLG\x01\x00\x00\x00\xff")
+            self.assertEqual(len(LinkGraph.load(path)), 0)
+            
+    def test_is_external(self):
+        self.assertTrue(is_external("https://example.com"))
+        self.assertTrue(is_external("mailto:me@example.com"))
+        self.assertTrue(is_external("#top"))
+        self.assertFalse(is_external("/index.html"))
+        self.assertFalse(is_external("../a.html"))
+        
+    def test_resolve_url(self):
+        self.assertEqual(resolve_url("blog/post.md", "/index.html#top"), "index.html")
+        self.assertEqual(resolve_url("blog/post.md", "other.html?x=1"), "blog/other.html")
+        self.assertEqual(resolve_url("blog/post.md", "../img/a.png"), "img/a.png")
+        self.assertEqual(resolve_url("blog/post.md", "/blog/"), "blog/")
+        self.assertIsNone(resolve_url("index.md", "../outside.html"))
+
+
+class TestCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = self.tmp.name
+        for name in ("index.html", "blog/post.html", "blog/index.html", "img/a.png"):
+            path = os.path.join(self.output, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+            
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def test_list_output_files(self):
+        expected = {"index.html", "blog/post.html", "blog/index.html", "img/a.png"}
+        self.assertEqual(list_output_files(self.output), expected)
+        self.assertEqual(list_output_files(self.output, jobs=4), expected)
+        
+    def test_check_links(self):
+        graph = LinkGraph()
+        graph.set_page("index.md", ["/blog/post", "/blog/", "/missing.html", "https://x.invalid"],
+                       ["img/a.png"])
+        graph.set_page(os.path.join("blog", "post.md"), ["../index.html", "gone.html"], ["/img/b.png"])
+        broken = check_links(graph, self.output, jobs=2)
+        self.assertEqual(broken, [
+            BrokenLink(os.path.join("blog", "post.md"), "gone.html", LINK),
+            BrokenLink(os.path.join("blog", "post.md"), "/img/b.png", IMAGE),
+            BrokenLink("index.md", "/missing.html", LINK),
+        ])
+        
+    def test_extra_paths(self):
+        graph = LinkGraph()
+        graph.set_page("index.md", [], ["/img/b.png"])
+        self.assertEqual(check_links(graph, self.output, extra_paths=["img/b.png"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
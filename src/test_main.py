@@ -0,0 +1,105 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import buildcache
+import main
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        os.makedirs(self.content)
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\nSee [the guide](/guide.html).")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def run_main(self, *argv):
+        argv = list(argv) + ["--content", self.content, "--output", self.output,
+                             "--cache-dir", self.cache_dir, "--static", os.path.join(self.tmp.name, "static")]
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = main.main(argv)
+        return status, out.getvalue()
+    
+    def test_default_cache_dir(self):
+        self.assertEqual(main.DEFAULT_CACHE_DIR, buildcache.DEFAULT_CACHE_DIR)
+    
+    def test_normalize_argv(self):
+        self.assertEqual(main._normalize_argv([]), ["build"])
+        self.assertEqual(main._normalize_argv(["--force"]), ["build", "--force"])
+        self.assertEqual(main._normalize_argv(["check", "-j", "2"]), ["check", "-j", "2"])
+        # Commands are only ever given by name
+        self.assertEqual(main._normalize_argv(["--check"]), ["build", "--check"])
+        self.assertEqual(main._normalize_argv(["--help"]), ["--help"])
+        self.assertEqual(main._normalize_argv(["--content", "c", "check", "-j", "2"]),
+                         ["check", "--content", "c", "-j", "2"])
+        self.assertEqual(main._normalize_argv(["--force", "watch"]), ["watch", "--force"])
+        # An option's value is not a command
+        self.assertEqual(main._normalize_argv(["--content", "check"]), ["build", "--content", "check"])
+        self.assertEqual(main._normalize_argv(["--output=watch", "check"]), ["check", "--output=watch"])
+    
+    def test_build(self):
+        status, out = self.run_main()
+        self.assertEqual(status, 0)
+        self.assertIn("Rendered 1, skipped 0", out)
+        self.assertTrue(os.path.exists(os.path.join(self.output, "index.html")))
+        
+        status, out = self.run_main("build", "--stats")
+        self.assertIn("Rendered 0, skipped 1", out)
+        self.assertIn("Built in", out)
+    
+    def test_check(self):
+        status, out = self.run_main("check")
+        self.assertEqual(status, 1)
+        self.assertIn("index.md: broken link /guide.html", out)
+        
+        with open(os.path.join(self.content, "guide.md"), "w") as f:
+            f.write("Guide")
+        status, out = self.run_main("check")
+        self.assertEqual(status, 0)
+        self.assertIn("0 broken link(s)", out)
+        
+        # The command may follow the options
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = main.main(["--content", self.content, "--output", self.output, "check",
+                                "--cache-dir", self.cache_dir, "--static", os.path.join(self.tmp.name, "static")])
+        self.assertEqual(status, 0)
+        self.assertIn("0 broken link(s)", out.getvalue())
+    
+    def test_check_follows_rendering(self):
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("Shows `[text](page.html)` and a [wrapped\nlink](nowhere.html)")
+        status, out = self.run_main("check")
+        self.assertEqual(status, 1)
+        self.assertIn("index.md: broken link nowhere.html", out)
+        self.assertNotIn("page.html", out)
+        self.assertIn("1 broken link(s)", out)
+    
+    def test_help_imports_nothing_heavy(self):
+        code = ("import sys, main\n"
+                "try:\n"
+                "    main.main(['--help'])\n"
+                "except SystemExit:\n"
+                "    pass\n"
+                "print(sorted(name for name in ('sitebuild', 'page', 'instrument', 'devserver') "
+                "if name in sys.modules))\n")
+        output = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True,
+                                text=True, check=True).stdout
+        self.assertTrue(output.endswith("[]\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from blockcache import CachedBlock
+from htmlnode import LeafNode, ParentNode
+from nodecodec import (CODEC_MAGIC, dump_html_node, dump_text_nodes,
+                       load_html_node, load_text_nodes)
+from page import markdown_to_html_node
+from splitnode import text_to_textnodes
+from textnode import TextNode, TextType
+
+
+class TestTextNodes(unittest.TestCase):
+    def test_round_trip(self):
+        nodes = text_to_textnodes("A **bold** _café_ `code` [link](/a) ![img](/i.png) and [link](/a)")
+        data = dump_text_nodes(nodes)
+        self.assertTrue(data.startswith(CODEC_MAGIC))
+        self.assertEqual(load_text_nodes(data), nodes)
+    
+    def test_empty(self):
+        self.assertEqual(load_text_nodes(dump_text_nodes([])), [])
+    
+    def test_strings_stored_once(self):
+        nodes = [TextNode("repeated text", TextType.PLAIN)] * 50
+        self.assertLess(len(dump_text_nodes(nodes)), 50 * len("repeated text"))
+        self.assertEqual(load_text_nodes(dump_text_nodes(nodes)), nodes)
+    
+    def test_wrong_kind(self):
+        data = dump_html_node(LeafNode("p", "x"))
+        with self.assertRaises(ValueError):
+            load_text_nodes(data)
+    
+    def test_corrupt(self):
+        data = dump_text_nodes([TextNode("a", TextType.PLAIN)])
+        with self.assertRaises(ValueError):
+            load_text_nodes(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            load_text_nodes(data[:4] + (99).to_bytes(4, "little") + data[8:])
+        with self.assertRaises(ValueError):
+            load_text_nodes(data[:-4])
+
+
+class TestHTMLNodes(unittest.TestCase):
+    def test_round_trip_page(self):
+        markdown = ("# Title\n\nSome **bold _nested_** text with [a link](/a?b=1&c=2).\n\n"
+                    "```\ncode <block>\n```\n\n- one\n- two\n\n> quote\n\n![img](/i.png)")
+        page = markdown_to_html_node(markdown)
+        loaded = load_html_node(dump_html_node(page))
+        self.assertEqual(loaded.to_html(), page.to_html())
+        self.assertIs(type(loaded), ParentNode)
+    
+    def test_node_fields(self):
+        node = ParentNode("div", [
+            LeafNode(None, "text"),
+            LeafNode("a", "link", {"href": "/a", "title": "x"}),
+            ParentNode("p", [], {}),
+            CachedBlock("<p>cached</p>"),
+        ], {"class": "page"})
+        loaded = load_html_node(dump_html_node(node))
+        self.assertEqual(loaded.props, {"class": "page"})
+        self.assertEqual([type(child) for child in loaded.children],
+                         [LeafNode, LeafNode, ParentNode, CachedBlock])
+        text, link, empty, cached = loaded.children
+        self.assertIsNone(text.tag)
+        self.assertIsNone(text.props)
+        self.assertIsNone(text.children)
+        self.assertEqual(link.props, {"href": "/a", "title": "x"})
+        self.assertEqual(empty.children, [])
+        # Empty props are kept apart from no props
+        self.assertEqual(empty.props, {})
+        self.assertEqual(loaded.to_html(), node.to_html())
+    
+    def test_leaf_root(self):
+        loaded = load_html_node(dump_html_node(LeafNode("b", "x")))
+        self.assertEqual(loaded.to_html(), "<b>x</b>")
+    
+    def test_deep_tree(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        loaded = load_html_node(dump_html_node(node))
+        depth = 0
+        while loaded.children:
+            loaded = loaded.children[0]
+            depth += 1
+        self.assertEqual(depth, 5000)
+    
+    def test_non_string_prop(self):
+        with self.assertRaises(TypeError):
+            dump_html_node(LeafNode("img", "", {"width": 10}))
+    
+    def test_trailing_data(self):
+        data = dump_html_node(LeafNode("b", "x"))
+        with self.assertRaises(ValueError):
+            load_html_node(data + b"\0\0\0\0")
+        with self.assertRaises(ValueError):
+            load_html_node(data[:-4])
+
+
+if __name__ == "__main__":
+    unittest.main()
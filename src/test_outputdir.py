@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from buildcache import hash_bytes
+from outputdir import (ADDED, MODIFIED, PARTIAL_SUFFIX, finalize_partial, prepare_staging,
+                       swap_in, write_if_changed)
+
+
+class TestOutputDir(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "public")
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+            
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+        
+    def test_write_if_changed(self):
+        path = os.path.join(self.output, "page.html")
+        self.assertEqual(write_if_changed(path, b"one"), (ADDED, hash_bytes(b"one")))
+        os.utime(path, ns=(1, 1))
+        inode = os.stat(path).st_ino
+        
+        self.assertEqual(write_if_changed(path, b"one"), (None, hash_bytes(b"one")))
+        self.assertEqual(os.stat(path).st_mtime_ns, 1)
+        self.assertEqual(os.stat(path).st_ino, inode)
+        self.assertFalse(os.path.exists(path + PARTIAL_SUFFIX))
+        
+        self.assertEqual(write_if_changed(path, b"two", hash_bytes(b"one"))[0], MODIFIED)
+        self.assertEqual(self.read(path), "two")
+        
+    def test_finalize_partial(self):
+        path = os.path.join(self.output, "page.html")
+        self.write(path + PARTIAL_SUFFIX, "page")
+        self.assertEqual(finalize_partial(path)[0], ADDED)
+        self.write(path + PARTIAL_SUFFIX, "page")
+        self.assertEqual(finalize_partial(path)[0], None)
+        self.assertFalse(os.path.exists(path + PARTIAL_SUFFIX))
+        
+    def test_staging_links_existing_files(self):
+        path = os.path.join(self.output, "blog", "post.html")
+        self.write(path, "post")
+        staging = prepare_staging(self.output)
+        staged = os.path.join(staging, "blog", "post.html")
+        self.assertEqual(os.stat(staged).st_ino, os.stat(path).st_ino)
+        
+        # Replacing the staged file must not touch the live one
+        write_if_changed(staged, b"new post")
+        self.assertEqual(self.read(path), "post")
+        
+    def test_swap_in_directory(self):
+        self.write(os.path.join(self.output, "old.html"), "old")
+        staging = prepare_staging(self.output)
+        os.remove(os.path.join(staging, "old.html"))
+        self.write(os.path.join(staging, "new.html"), "new")
+        
+        swap_in(staging, self.output)
+        self.assertEqual(os.listdir(self.output), ["new.html"])
+        self.assertFalse(os.path.exists(staging))
+        
+    def test_swap_in_symlink(self):
+        first = self.output + ".v1"
+        self.write(os.path.join(first, "index.html"), "v1")
+        os.symlink(os.path.basename(first), self.output)
+        
+        staging = prepare_staging(self.output)
+        write_if_changed(os.path.join(staging, "index.html"), b"v2")
+        swap_in(staging, self.output)
+        
+        self.assertTrue(os.path.islink(self.output))
+        self.assertEqual(self.read(os.path.join(self.output, "index.html")), "v2")
+        self.assertFalse(os.path.exists(first))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import unittest
+
+from page import (extract_title, markdown_to_html_node, render_lines_to, render_markdown_file,
+                  render_page, split_front_matter)
+from template import compile_template
+
+
+class TestPage(unittest.TestCase):
+    def test_paragraphs(self):
+        markdown = "First **bold**\nline\n\n\nSecond with a [link](http://example.com)\n"
+        res = render_page(markdown)
+        self.assertEqual(res, '<div><p>First <strong>bold</strong> line</p>'
+                              '<p>Second with a <a href="http://example.com">link</a></p></div>')
+        
+    def test_empty_document(self):
+        node = markdown_to_html_node("")
+        self.assertEqual(node.to_html(), "<div></div>")
+        
+    def test_render_lines_to_matches_render_page(self):
+        markdown = "# Title\n\nText with ![img](/a.png)\n\n```\ncode\n```\n\n1. one\n2. two\n"
+        out = io.StringIO()
+        render_lines_to(io.StringIO(markdown), out)
+        self.assertEqual(out.getvalue(), render_page(markdown))
+        
+    def test_render_markdown_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "page.md")
+            output = os.path.join(tmp, "out", "page.html")
+            with open(source, "w") as f:
+                f.write("## Hello\n")
+            render_markdown_file(source, output)
+            with open(output) as f:
+                self.assertEqual(f.read(), "<div><h2>Hello</h2></div>")
+
+    def test_split_front_matter(self):
+        metadata, lines = split_front_matter(["---", "Title: Hi", "date: today", "---", "Body"])
+        self.assertEqual(metadata, {"title": "Hi", "date": "today"})
+        self.assertEqual(list(lines), ["Body"])
+        
+    def test_unclosed_front_matter_is_markdown(self):
+        metadata, lines = split_front_matter(["---", "a: b"])
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(lines), ["---", "a: b"])
+        
+    def test_extract_title(self):
+        self.assertEqual(extract_title(["Intro", "## Sub", "#  Main  "]), "Main")
+        self.assertIsNone(extract_title(["No heading"]))
+        
+    def test_render_page_with_template(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}<p>{{ Author }}</p>")
+        markdown = "---\nauthor: Me\n---\n# Hello\n\nText\n"
+        res = render_page(markdown, template)
+        self.assertEqual(res, "<title>Hello</title><div><h1>Hello</h1><p>Text</p></div><p>Me</p>")
+        
+    def test_front_matter_title_wins(self):
+        template = compile_template("{{ Title }}")
+        self.assertEqual(render_page("---\ntitle: Meta\n---\n# Heading\n", template), "Meta")
+        
+    def test_render_markdown_file_with_template(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}<p>{{ Author }}</p>")
+        markdown = "---\nauthor: Me\n---\nIntro\n\n# Hello\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "page.md")
+            output = os.path.join(tmp, "page.html")
+            with open(source, "w") as f:
+                f.write(markdown)
+            render_markdown_file(source, output, template)
+            with open(output) as f:
+                self.assertEqual(f.read(), render_page(markdown, template))
+
+
+if __name__ == "__main__":
+    unittest.main()
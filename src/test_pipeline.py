@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import run_pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    
+    def run_collect(self, items, read=lambda x: x, render=lambda x: x * 2, **kwargs):
+        results = []
+        lock = threading.Lock()
+        
+        def write(batch):
+            with lock:
+                results.extend(batch)
+        
+        run_pipeline(items, read, render, write, **kwargs)
+        return sorted(results)
+        
+    def test_all_items_processed(self):
+        results = self.run_collect(range(100))
+        self.assertEqual(results, [(i, i * 2) for i in range(100)])
+        
+    def test_empty_input(self):
+        self.assertEqual(self.run_collect([]), [])
+        
+    def test_read_none_drops_item(self):
+        results = self.run_collect(range(10), read=lambda x: x if x % 2 else None)
+        self.assertEqual([value for value, _ in results], [1, 3, 5, 7, 9])
+        
+    def test_with_pool(self):
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = self.run_collect(range(50), pool=pool, max_in_flight=4)
+        self.assertEqual(results, [(i, i * 2) for i in range(50)])
+        
+    def test_pool_chunks(self):
+        chunks = []
+        
+        class Pool(ThreadPoolExecutor):
+            def submit(self, fn, render, values):
+                chunks.append(len(values))
+                if len(chunks) == 1:
+                    # Let the readers queue up everything else meanwhile
+                    time.sleep(0.1)
+                return super().submit(fn, render, values)
+        
+        with Pool(max_workers=2) as pool:
+            results = self.run_collect(range(40), pool=pool, chunk_size=8)
+        self.assertEqual(results, [(i, i * 2) for i in range(40)])
+        self.assertEqual(sum(chunks), 40)
+        self.assertEqual(max(chunks), 8)
+        self.assertLessEqual(len(chunks), 6)
+        
+    def test_write_batches(self):
+        batches = []
+        
+        def write(batch):
+            batches.append(len(batch))
+            time.sleep(0.001)
+        
+        run_pipeline(range(40), lambda x: x, lambda x: x, write, writers=1, batch_size=8)
+        self.assertEqual(sum(batches), 40)
+        self.assertLessEqual(max(batches), 8)
+        
+    def test_backpressure_bounds_prefetch(self):
+        read_count = 0
+        max_ahead = 0
+        rendered = 0
+        lock = threading.Lock()
+        
+        def read(x):
+            nonlocal read_count, max_ahead
+            with lock:
+                read_count += 1
+                max_ahead = max(max_ahead, read_count - rendered)
+            return x
+        
+        def render(x):
+            nonlocal rendered
+            time.sleep(0.001)
+            with lock:
+                rendered += 1
+            return x
+        
+        run_pipeline(range(100), read, render, lambda batch: None, readers=2, prefetch=4)
+        # Queue capacity, one value blocked in each reader, one being rendered
+        self.assertLessEqual(max_ahead, 4 + 2 + 1)
+        
+    def test_errors_propagate_from_each_stage(self):
+        def boom(x):
+            if x == 5:
+                raise ValueError("boom")
+            return x
+        
+        with self.assertRaises(ValueError):
+            run_pipeline(range(20), boom, lambda x: x, lambda batch: None)
+        with self.assertRaises(ValueError):
+            run_pipeline(range(20), lambda x: x, boom, lambda batch: None)
+        with self.assertRaises(ValueError):
+            run_pipeline(range(20), lambda x: x, lambda x: x, lambda batch: [boom(v) for v, _ in batch])
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            with self.assertRaises(ValueError):
+                run_pipeline(range(20), lambda x: x, boom, lambda batch: None, pool=pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import unittest
+
+from searchindex import (SEARCH_DIR, SEARCH_META_NAME, SearchIndex, extract_page_terms,
+                         extract_terms, lookup)
+
+
+class TestExtractTerms(unittest.TestCase):
+    def test_extract_terms(self):
+        self.assertEqual(extract_terms("Hello, wörld! a snake_case 42x"),
+                         ["hello", "wörld", "snake", "case", "42x"])
+    
+    def test_extract_page_terms(self):
+        lines = [
+            "---",
+            "layout: post",
+            "---",
+            "# The **Big** Title",
+            "",
+            "A [link text](/a.html) and ![alt words](/b.png).",
+            "",
+            "```",
+            "code is skipped",
+            "```",
+            "",
+            "> quoted _words_",
+            "",
+            "- item one",
+            "1. item two",
+            "",
+            "Unclosed **bold stays text",
+        ]
+        title, terms = extract_page_terms(lines)
+        self.assertEqual(title, "The Big Title")
+        self.assertEqual(terms, ["the", "big", "title", "link", "text", "and", "alt", "words",
+                                 "quoted", "words", "item", "one", "item", "two",
+                                 "unclosed", "bold", "stays", "text"])
+    
+    def test_front_matter_title(self):
+        title, terms = extract_page_terms(iter(["---", "title: From front matter", "---", "# Heading"]))
+        self.assertEqual(title, "From front matter")
+        self.assertEqual(terms, ["heading"])
+        self.assertEqual(extract_page_terms(["No heading"]), (None, ["no", "heading"]))
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "public")
+        self.path = os.path.join(self.tmp.name, "cache", "search.json")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def read_meta(self):
+        with open(os.path.join(self.output, SEARCH_DIR, SEARCH_META_NAME)) as f:
+            return json.load(f)
+    
+    def test_write_and_update(self):
+        index = SearchIndex()
+        index.set_page("b.md", "b.html", "B", ["apple", "banana", "apple"])
+        index.set_page("a.md", "a.html", None, ["apricot"])
+        self.assertTrue(index.dirty)
+        changes = index.write(self.output)
+        self.assertFalse(index.dirty)
+        self.assertIn(("added", os.path.join(SEARCH_DIR, "ap.json")), changes)
+        self.assertEqual(self.read_meta()["pages"], [["a.html", None], ["b.html", "B"]])
+        self.assertEqual(self.read_meta()["shards"], ["ap", "ba"])
+        self.assertEqual(lookup(self.output, "Apple"), [(1, [0, 2])])
+        self.assertEqual(lookup(self.output, "apricot"), [(0, [0])])
+        
+        # Reloaded, only the changed page's shards are rewritten
+        index.save(self.path)
+        index = SearchIndex.load(self.path)
+        self.assertFalse(index.dirty)
+        self.assertTrue(index.intact(self.output))
+        self.assertIn("a.md", index)
+        index.set_page("a.md", "a.html", None, ["cherry"])
+        changes = index.write(self.output)
+        self.assertEqual(sorted(changes), [
+            ("added", os.path.join(SEARCH_DIR, "ch.json")),
+            ("modified", os.path.join(SEARCH_DIR, "ap.json")),
+            ("modified", os.path.join(SEARCH_DIR, SEARCH_META_NAME)),
+        ])
+        self.assertEqual(lookup(self.output, "apricot"), [])
+        self.assertEqual(lookup(self.output, "apple"), [(1, [0, 2])])
+        self.assertEqual(lookup(self.output, "cherry"), [(0, [0])])
+    
+    def test_remove_page_frees_id(self):
+        index = SearchIndex()
+        index.set_page("a.md", "a.html", None, ["only"])
+        index.set_page("b.md", "b.html", None, ["kept"])
+        index.write(self.output)
+        index.remove_page("a.md")
+        changes = index.write(self.output)
+        self.assertIn(("removed", os.path.join(SEARCH_DIR, "on.json")), changes)
+        self.assertEqual(self.read_meta()["pages"], [None, ["b.html", None]])
+        
+        index.set_page("c.md", "c.html", None, ["new"])
+        index.write(self.output)
+        self.assertEqual(lookup(self.output, "new"), [(0, [0])])
+        self.assertEqual(len(index), 2)
+    
+    def test_rebuild_removes_unknown_shards(self):
+        os.makedirs(os.path.join(self.output, SEARCH_DIR))
+        stale = os.path.join(self.output, SEARCH_DIR, "zz.json")
+        with open(stale, "w") as f:
+            f.write("{}")
+        index = SearchIndex()
+        index.set_page("a.md", "a.html", None, ["word"])
+        index.write(self.output)
+        self.assertFalse(os.path.exists(stale))
+        
+        os.remove(os.path.join(self.output, SEARCH_DIR, "wo.json"))
+        self.assertFalse(index.intact(self.output))
+    
+    def test_load_bad_file(self):
+        self.assertTrue(SearchIndex.load(self.path).rebuild)
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            json.dump({"version": 0, "pages": {}}, f)
+        self.assertTrue(SearchIndex.load(self.path).rebuild)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,410 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import blockparser
+import page
+import sitebuild
+from htmlnode import FragmentCache, use_fragment_cache
+from linkgraph import LinkGraph
+from searchindex import SearchIndex, extract_page_terms, lookup
+from sitebuild import build_site, chunk_size, find_sources, output_name
+
+
+class TestSiteBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.write_source("index.md", "Hello **world**")
+        self.write_source("blog/post.md", "A [link](/index.html)")
+        
+    def tearDown(self):
+        self.tmp.cleanup()
+        
+    def write_source(self, name, text):
+        path = os.path.join(self.content, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+            
+    def read_source(self, name):
+        with open(os.path.join(self.content, name)) as f:
+            return f.read()
+        
+    def read_output(self, name):
+        with open(os.path.join(self.output, name)) as f:
+            return f.read()
+        
+    def build(self, **kwargs):
+        return build_site(self.content, self.output, cache_dir=self.cache_dir, **kwargs)
+        
+    def test_find_sources_sorted(self):
+        self.assertEqual(find_sources(self.content), [os.path.join("blog", "post.md"), "index.md"])
+        
+    def test_output_name(self):
+        self.assertEqual(output_name(os.path.join("blog", "post.md")), os.path.join("blog", "post.html"))
+        
+    def test_full_build(self):
+        result = self.build()
+        self.assertEqual(len(result.rendered), 2)
+        self.assertEqual(self.read_output("index.html"), "<div><p>Hello <strong>world</strong></p></div>")
+        
+    def test_incremental_build_skips_unchanged(self):
+        self.build()
+        self.write_source("index.md", "Changed")
+        
+        result = self.build()
+        self.assertEqual(result.rendered, ["index.md"])
+        self.assertEqual(result.skipped, [os.path.join("blog", "post.md")])
+        self.assertEqual(self.read_output("index.html"), "<div><p>Changed</p></div>")
+        
+    def test_force_rebuilds_everything(self):
+        self.build()
+        result = self.build(force=True)
+        self.assertEqual(len(result.rendered), 2)
+        
+    def test_deleted_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.output, "index.html"))
+        result = self.build()
+        self.assertEqual(result.rendered, ["index.md"])
+        
+    def test_removed_source_deletes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "index.md"))
+        result = self.build()
+        self.assertEqual(result.removed, ["index.md"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.html")))
+        
+    def test_chunk_size(self):
+        self.assertEqual(chunk_size(1, 4), 1)
+        self.assertEqual(chunk_size(100, 4), 7)
+        
+    def test_parallel_build(self):
+        for i in range(10):
+            self.write_source(f"page{i}.md", f"Page _{i}_")
+        result = self.build(jobs=2)
+        self.assertEqual(len(result.rendered), 12)
+        self.assertEqual(self.read_output("page7.html"), "<div><p>Page <em>7</em></p></div>")
+        
+    def test_fragment_cache_build(self):
+        shared = "- [Home](/index.html)\n- [Blog](/blog.html)\n- [About](/about.html)\n\n> **Note:** a shared _callout_"
+        for i in range(4):
+            self.write_source(f"p{i}.md", f"# Page {i}\n\n{shared}")
+        self.build()
+        expected = self.read_output("p3.html")
+        
+        caches = []
+        
+        def enable(maxsize):
+            caches.append(FragmentCache(maxsize))
+            return use_fragment_cache(caches[-1])
+        
+        # Pages held in memory and pages streamed block by block alike
+        for threshold in (sitebuild.STREAM_THRESHOLD, 0):
+            with mock.patch.object(sitebuild, "enable_fragment_cache", enable), \
+                    mock.patch.object(sitebuild, "STREAM_THRESHOLD", threshold):
+                self.build(force=True, fragment_cache_size=64)
+            self.assertEqual(self.read_output("p3.html"), expected)
+            # The list and the callout, stored on their second miss and
+            # each hit as a whole by the last two pages
+            self.assertEqual(caches[-1].hits, 4)
+        
+    def test_large_pages_are_streamed(self):
+        self.write_source("big.md", "Big **page**\n\n" * 50)
+        with mock.patch.object(sitebuild, "STREAM_THRESHOLD", 100):
+            result = self.build(readers=1, writers=1, prefetch=1)
+        self.assertEqual(len(result.rendered), 3)
+        self.assertEqual(self.read_output("big.html"), "<div>" + "<p>Big <strong>page</strong></p>" * 50 + "</div>")
+        
+    def write_bad_source(self, name):
+        with open(os.path.join(self.content, name), "wb") as f:
+            f.write(b"Not UTF-8: \xff")
+            
+    def test_render_error_propagates(self):
+        self.write_bad_source("bad.md")
+        # Streamed, so the page is only decoded by the worker rendering it
+        with mock.patch.object(sitebuild, "STREAM_THRESHOLD", 0):
+            with self.assertRaises(ValueError):
+                self.build(jobs=2)
+        
+    def test_unchanged_output_is_not_rewritten(self):
+        self.build()
+        path = os.path.join(self.output, "index.html")
+        os.utime(path, ns=(1, 1))
+        self.write_source("blog/post.md", "Changed")
+        
+        result = self.build(force=True)
+        self.assertEqual(len(result.rendered), 2)
+        self.assertEqual(os.stat(path).st_mtime_ns, 1)
+        self.assertEqual(result.changes["modified"], [os.path.join("blog", "post.html")])
+        
+    def test_changes_manifest(self):
+        self.build()
+        self.write_source("about.md", "About")
+        os.remove(os.path.join(self.content, "index.md"))
+        
+        result = self.build()
+        expected = {"added": ["about.html"], "modified": [], "removed": ["index.html"]}
+        self.assertEqual(result.changes, expected)
+        with open(os.path.join(self.cache_dir, sitebuild.CHANGES_NAME)) as f:
+            self.assertEqual(json.load(f), expected)
+            
+    def test_failed_build_keeps_previous_output(self):
+        self.build()
+        self.write_bad_source("bad.md")
+        with self.assertRaises(ValueError):
+            self.build()
+        self.assertEqual(self.read_output("index.html"), "<div><p>Hello <strong>world</strong></p></div>")
+        self.assertFalse(os.path.exists(self.output + ".staging"))
+        
+    def test_in_place_build(self):
+        self.build()
+        inode = os.stat(self.output).st_ino
+        self.write_source("index.md", "Changed")
+        self.build(atomic=False)
+        self.assertEqual(os.stat(self.output).st_ino, inode)
+        self.assertEqual(self.read_output("index.html"), "<div><p>Changed</p></div>")
+        
+    def test_fingerprinted_images_are_rewritten(self):
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(static)
+        with open(os.path.join(static, "logo.png"), "w") as f:
+            f.write("PNG")
+        self.write_source("index.md", "![Logo](/logo.png)")
+        
+        result = self.build(static_dir=static, fingerprint=True)
+        logo = result.assets.outputs["logo.png"]
+        self.assertIn(logo, result.changes["added"])
+        self.assertEqual(self.read_output("index.html"), f'<div><p><img src="/{logo}" alt="Logo"></p></div>')
+        
+        # A new image version invalidates the pages that reference it
+        with open(os.path.join(static, "logo.png"), "w") as f:
+            f.write("PNG, but newer")
+        result = self.build(static_dir=static, fingerprint=True)
+        self.assertIn("index.md", result.rendered)
+        self.assertIn(result.assets.outputs["logo.png"], self.read_output("index.html"))
+        
+    def test_failed_build_keeps_asset_manifest(self):
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(static)
+        style = os.path.join(static, "style.css")
+        with open(style, "w") as f:
+            f.write("a{}")
+        self.build(static_dir=static)
+        
+        # Same size, new mtime, and the build fails before it is swapped in
+        with open(style, "w") as f:
+            f.write("b{}")
+        with mock.patch.object(sitebuild, "swap_in", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.build(static_dir=static)
+        self.assertEqual(self.read_output("style.css"), "a{}")
+        
+        result = self.build(static_dir=static)
+        self.assertEqual(result.assets.copied, ["style.css"])
+        self.assertEqual(self.read_output("style.css"), "b{}")
+        
+    def test_template_build(self):
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.write_source("index.md", "# Home")
+        self.write_source("big.md", "# Big\n\n" + "Text\n\n" * 50)
+        with mock.patch.object(sitebuild, "STREAM_THRESHOLD", 100):
+            self.build(template_path=template)
+        self.assertEqual(self.read_output("index.html"), "<title>Home</title><div><h1>Home</h1></div>")
+        self.assertTrue(self.read_output("big.html").startswith("<title>Big</title><div><h1>Big</h1>"))
+        
+        # Editing the template re-renders every page
+        with open(template, "w") as f:
+            f.write("<h6>{{ Title }}</h6>")
+        result = self.build(template_path=template)
+        self.assertEqual(len(result.rendered), 3)
+        self.assertEqual(self.read_output("index.html"), "<h6>Home</h6>")
+        
+    def test_link_graph(self):
+        self.build()
+        self.write_source("about.md", "[Home](/index.html) ![x](/x.png)")
+        
+        result = self.build()
+        self.assertEqual(result.links.targets(os.path.join("blog", "post.md")), (("/index.html",), ()))
+        self.assertEqual(result.links.sources_linking_to("/index.html"),
+                         ["about.md", os.path.join("blog", "post.md")])
+        
+        # Pages skipped by the next build keep their entries
+        os.remove(os.path.join(self.content, "about.md"))
+        result = self.build()
+        self.assertEqual(result.links.sources_linking_to("/index.html"), [os.path.join("blog", "post.md")])
+        graph_path = os.path.join(self.cache_dir, sitebuild.LINK_GRAPH_NAME)
+        graph = LinkGraph.load(graph_path)
+        self.assertEqual(graph.pages, result.links.pages)
+        
+        # A build that changes nothing leaves the saved graph alone
+        mtime = os.stat(graph_path).st_mtime_ns
+        result = self.build()
+        self.assertFalse(result.links.dirty)
+        self.assertEqual(os.stat(graph_path).st_mtime_ns, mtime)
+        
+    def test_search_index(self):
+        self.write_source("about.md", "# About us\n\nWe like **search**.")
+        result = self.build(search=True)
+        self.assertEqual(len(result.search), 3)
+        self.assertIn(os.path.join("search", "index.json"), result.changes["added"])
+        with open(os.path.join(self.output, "search", "index.json")) as f:
+            meta = json.load(f)
+        # Ids follow the sources' order, whatever order they were read in
+        self.assertEqual(meta["pages"], [["about.html", "About us"], ["blog/post.html", None],
+                                         ["index.html", None]])
+        self.assertEqual(lookup(self.output, "search"), [(0, [4])])
+        
+        # Only the shards of the changed page's old and new terms change,
+        # and the table, as its list of shards lost "wo"
+        self.write_source("index.md", "Hello **search**")
+        result = self.build(search=True)
+        self.assertEqual(result.changes["modified"], ["index.html", os.path.join("search", "index.json"),
+                                                      os.path.join("search", "se.json")])
+        self.assertEqual(result.changes["removed"], [os.path.join("search", "wo.json")])
+        self.assertEqual(lookup(self.output, "search"), [(0, [4]), (2, [1])])
+        
+        os.remove(os.path.join(self.content, "about.md"))
+        result = self.build(search=True)
+        self.assertEqual(lookup(self.output, "search"), [(2, [1])])
+        self.assertEqual(lookup(self.output, "about"), [])
+        
+        # A new page takes the free id
+        self.write_source("new.md", "Searching")
+        result = self.build(search=True)
+        self.assertEqual(lookup(self.output, "searching"), [(0, [0])])
+        
+        # A lost shard can't be updated, so the index is rebuilt
+        os.remove(os.path.join(self.output, "search", "he.json"))
+        result = self.build(search=True)
+        self.assertEqual(lookup(self.output, "hello"), [(1, [0])])
+        self.assertEqual(lookup(self.output, "searching"), [(2, [0])])
+        
+    def test_links_from_render(self):
+        self.write_source("index.md", "Use `[text](page.html)` and a [wrapped\nlink](nowhere.html)\n\n"
+                                      "![logo](/logo.png) " + "filler " * 20)
+        self.write_source("fm.md", "---\ntitle: Front\n---\nSee [a](/a.html)")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("{{ content }}")
+        expected = {
+            "index.md": (("nowhere.html",), ("/logo.png",)),
+            "fm.md": (("/a.html",), ()),
+            os.path.join("blog", "post.md"): (("/index.html",), ()),
+        }
+        options = [{}, {"template_path": template}, {"jobs": 2}, {"stream": 0}, {"blocks": 0}]
+        for options in options:
+            with self.subTest(**options):
+                options = dict(options)
+                stream = options.pop("stream", sitebuild.STREAM_THRESHOLD)
+                blocks = options.pop("blocks", sitebuild.BLOCK_CACHE_THRESHOLD)
+                with mock.patch.object(sitebuild, "STREAM_THRESHOLD", stream), \
+                        mock.patch.object(sitebuild, "BLOCK_CACHE_THRESHOLD", blocks):
+                    # Twice, so pages with a BlockCache reuse its summaries
+                    self.build(force=True, **options)
+                    self.write_source("index.md", self.read_source("index.md") + "\n\nMore")
+                    result = self.build(**options)
+                self.assertEqual(result.rendered, ["index.md"])
+                self.assertEqual(result.links.pages, expected)
+        
+    def test_search_terms_from_render(self):
+        self.write_source("index.md", "---\ntitle: Front\n---\n# Heading\n\n![alt text](/a.png) and `code`\n\n"
+                                      "```\nskipped\n```\n\n- one\n- two")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ title }}</title>{{ content }}")
+        expected = {}
+        for source in find_sources(self.content):
+            with open(os.path.join(self.content, source)) as f:
+                expected[source] = extract_page_terms(f)
+                
+        set_page = SearchIndex.set_page
+        for options in [{}, {"template_path": template}, {"jobs": 2}, {"threshold": 0}]:
+            with self.subTest(**options):
+                options = dict(options)
+                indexed = {}
+                
+                def record(index, source, url, title, terms):
+                    indexed[source] = (title, terms)
+                    set_page(index, source, url, title, terms)
+                    
+                threshold = options.pop("threshold", sitebuild.STREAM_THRESHOLD)
+                with mock.patch.object(sitebuild, "STREAM_THRESHOLD", threshold), \
+                        mock.patch.object(SearchIndex, "set_page", record):
+                    self.build(search=True, force=True, **options)
+                self.assertEqual(indexed, expected)
+                
+    def test_search_terms_from_block_cache(self):
+        sections = [f"## Section {i}\n\nWords of section {i}" for i in range(5)]
+        self.write_source("big.md", "# Big\n\n" + "\n\n".join(sections))
+        with mock.patch.object(sitebuild, "BLOCK_CACHE_THRESHOLD", 0):
+            self.build(search=True)
+            sections[2] = "## Section 2\n\nEdited words"
+            self.write_source("big.md", "# Big\n\n" + "\n\n".join(sections))
+            # Only the edited block is parsed, for its HTML and terms alike
+            with mock.patch.object(page, "block_to_html_node", wraps=page.block_to_html_node) as convert, \
+                    mock.patch.object(blockparser, "block_to_html_node", wraps=page.block_to_html_node) as parse:
+                result = self.build(search=True)
+        self.assertEqual(result.rendered, ["big.md"])
+        self.assertEqual(convert.call_count + parse.call_count, 1)
+        with open(os.path.join(self.content, "big.md")) as f:
+            title, terms = extract_page_terms(f)
+        self.assertEqual(lookup(self.output, "edited"), [(0, [terms.index("edited")])])
+        self.assertEqual(lookup(self.output, "words"), [(0, [i for i, term in enumerate(terms) if term == "words"])])
+        
+    def test_minify_and_compress(self):
+        self.write_source("index.md", "Hello   **world**\n\n" * 20)
+        result = self.build(minify=True, compress=True)
+        self.assertTrue(self.read_output("index.html").startswith("<div><p>Hello <strong>world</strong></p>"))
+        self.assertIn("index.html.gz", result.changes["added"])
+        with gzip.open(os.path.join(self.output, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), self.read_output("index.html"))
+        
+        result = self.build(minify=True, compress=True)
+        self.assertEqual(result.compressed.compressed, [])
+        
+        # A build that fails after compressing must not mark its sidecars done
+        self.write_source("index.md", "Changed   **text**\n\n" * 20)
+        with mock.patch.object(sitebuild, "swap_in", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.build(minify=True, compress=True)
+        result = self.build(minify=True, compress=True)
+        self.assertIn("index.html", result.compressed.compressed)
+        with gzip.open(os.path.join(self.output, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), self.read_output("index.html"))
+        self.assertIn("Changed", self.read_output("index.html"))
+        
+    def test_block_cache(self):
+        self.write_source("big.md", "# Big\n\n" + "".join(f"Paragraph {i}\n\n" for i in range(50)))
+        with mock.patch.object(sitebuild, "BLOCK_CACHE_THRESHOLD", 100):
+            self.build()
+            blocks_path = sitebuild.block_cache_path(self.cache_dir, "big.md")
+            self.assertTrue(os.path.exists(blocks_path))
+            
+            self.write_source("big.md", "# Big\n\n" + "".join(f"Paragraph {i}\n\n" for i in range(1, 51)))
+            with mock.patch.object(page, "block_to_html_node", wraps=page.block_to_html_node) as convert:
+                self.build()
+            self.assertEqual(convert.call_count, 1)
+            self.assertEqual(self.read_output("big.html"),
+                             "<div><h1>Big</h1>" + "".join(f"<p>Paragraph {i}</p>" for i in range(1, 51)) + "</div>")
+            
+            os.remove(os.path.join(self.content, "big.md"))
+            self.build()
+            self.assertFalse(os.path.exists(blocks_path))
+            
+    def test_no_cache(self):
+        self.build()
+        result = build_site(self.content, self.output, cache_dir=None)
+        self.assertEqual(len(result.rendered), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
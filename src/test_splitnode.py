@@ -2,7 +2,11 @@ import unittest
 
 # from htmlnode import HTMLNode, LeafNode, ParentNode
 from textnode import TextNode, TextType
-from splitnode import split_nodes_delimiter, split_nodes_image, split_nodes_link
+from splitnode import (split_nodes_delimiter,
+                       split_nodes_image,
+                       split_nodes_link,
+                       split_nodes_inline,
+                       text_to_textnodes)
 
 class TestSplitNode(unittest.TestCase):
     def test_split_nodes_delimiter_basic(self):
@@ -541,4 +545,155 @@ class TestSplitNode(unittest.TestCase):
                 TextNode(" end.", TextType.PLAIN),
             ],
             new_nodes,
-        )
\ No newline at end of file
+        )
+        
+    def test_split_images_multiple_nodes(self):
+        nodes = [
+            TextNode("No image here", TextType.PLAIN),
+            TextNode("Bold", TextType.BOLD),
+            TextNode("Then ![img](http://example.com/img.png)", TextType.PLAIN),
+        ]
+        
+        new_nodes = split_nodes_image(nodes)
+        
+        # A node without matches must not stop later nodes from being processed
+        self.assertListEqual(
+            [
+                TextNode("No image here", TextType.PLAIN),
+                TextNode("Bold", TextType.BOLD),
+                TextNode("Then ", TextType.PLAIN),
+                TextNode("img", TextType.IMAGE, "http://example.com/img.png"),
+            ],
+            new_nodes,
+        )
+        
+    def test_split_links_multiple_nodes(self):
+        nodes = [
+            TextNode("No link here", TextType.PLAIN),
+            TextNode("[a](http://a.com) and [b](http://b.com)", TextType.PLAIN),
+        ]
+        
+        new_nodes = split_nodes_link(nodes)
+        
+        self.assertListEqual(
+            [
+                TextNode("No link here", TextType.PLAIN),
+                TextNode("a", TextType.LINK, "http://a.com"),
+                TextNode(" and ", TextType.PLAIN),
+                TextNode("b", TextType.LINK, "http://b.com"),
+            ],
+            new_nodes,
+        )
+        
+    def test_split_links_ignores_images(self):
+        node = TextNode("An ![img](http://example.com/i.png) and [link](http://example.com)", TextType.PLAIN)
+        
+        new_nodes = split_nodes_link([node])
+        
+        self.assertListEqual(
+            [
+                TextNode("An ![img](http://example.com/i.png) and ", TextType.PLAIN),
+                TextNode("link", TextType.LINK, "http://example.com"),
+            ],
+            new_nodes,
+        )
+        
+    def test_split_links_many(self):
+        # Well past the default recursion limit
+        count = 5000
+        node = TextNode(" ".join(f"[l{i}](http://example.com/{i})" for i in range(count)), TextType.PLAIN)
+        
+        new_nodes = split_nodes_link([node])
+        
+        self.assertEqual(len(new_nodes), 2 * count - 1)
+        self.assertEqual(new_nodes[-1], TextNode(f"l{count - 1}", TextType.LINK, f"http://example.com/{count - 1}"))
+        
+    def test_text_to_textnodes_all_types(self):
+        text = (
+            "This is **text** with an _italic_ word and a `code block` and an "
+            "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
+        )
+        
+        new_nodes = text_to_textnodes(text)
+        
+        self.assertListEqual(
+            [
+                TextNode("This is ", TextType.PLAIN),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with an ", TextType.PLAIN),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word and a ", TextType.PLAIN),
+                TextNode("code block", TextType.CODE),
+                TextNode(" and an ", TextType.PLAIN),
+                TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+                TextNode(" and a ", TextType.PLAIN),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ],
+            new_nodes,
+        )
+        
+    def test_text_to_textnodes_star_italic(self):
+        new_nodes = text_to_textnodes("An *italic* and **bold** pair")
+        
+        self.assertListEqual(
+            [
+                TextNode("An ", TextType.PLAIN),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" and ", TextType.PLAIN),
+                TextNode("bold", TextType.BOLD),
+                TextNode(" pair", TextType.PLAIN),
+            ],
+            new_nodes,
+        )
+        
+    def test_text_to_textnodes_code_is_literal(self):
+        new_nodes = text_to_textnodes("Run `a_b **c** [d](e)` now")
+        
+        self.assertListEqual(
+            [
+                TextNode("Run ", TextType.PLAIN),
+                TextNode("a_b **c** [d](e)", TextType.CODE),
+                TextNode(" now", TextType.PLAIN),
+            ],
+            new_nodes,
+        )
+        
+    def test_text_to_textnodes_plain_only(self):
+        new_nodes = text_to_textnodes("Nothing to see here.")
+        self.assertListEqual([TextNode("Nothing to see here.", TextType.PLAIN)], new_nodes)
+        
+    def test_text_to_textnodes_empty(self):
+        self.assertListEqual([], text_to_textnodes(""))
+        
+    def test_text_to_textnodes_incomplete_brackets(self):
+        new_nodes = text_to_textnodes("A [bracket] and ![not an image] then [link](url)")
+        
+        self.assertListEqual(
+            [
+                TextNode("A [bracket] and ![not an image] then ", TextType.PLAIN),
+                TextNode("link", TextType.LINK, "url"),
+            ],
+            new_nodes,
+        )
+        
+    def test_text_to_textnodes_unmatched(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("Hello, **world! This is a test.")
+            
+    def test_split_nodes_inline_keeps_non_plain(self):
+        nodes = [
+            TextNode("Already **bold**", TextType.BOLD),
+            TextNode("Some `code` here", TextType.PLAIN),
+        ]
+        
+        new_nodes = split_nodes_inline(nodes)
+        
+        self.assertListEqual(
+            [
+                TextNode("Already **bold**", TextType.BOLD),
+                TextNode("Some ", TextType.PLAIN),
+                TextNode("code", TextType.CODE),
+                TextNode(" here", TextType.PLAIN),
+            ],
+            new_nodes,
+        )
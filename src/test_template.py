@@ -0,0 +1,81 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, compile_template, load_template
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = compile_template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertEqual(template.segments, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["title", "content"])
+        
+    def test_compile_without_placeholders(self):
+        template = compile_template("<p>static</p>")
+        self.assertEqual(template.segments, ["<p>static</p>"])
+        self.assertEqual(template.render({}), "<p>static</p>")
+        
+    def test_render(self):
+        template = compile_template("<h1>{{ Title }}</h1>{{ Content }}<i>{{ Author }}</i>")
+        content = ParentNode("div", [LeafNode("p", "Body")])
+        res = template.render({"title": "A & B", "content": content})
+        self.assertEqual(res, "<h1>A &amp; B</h1><div><p>Body</p></div><i></i>")
+        
+    def test_render_to_matches_render(self):
+        template = compile_template("{{ Content }} by {{ author }}")
+        values = {"content": LeafNode("p", "Body"), "author": "Me"}
+        out = io.StringIO()
+        written = template.render_to(out, values)
+        self.assertEqual(out.getvalue(), template.render(values))
+        self.assertEqual(written, len(out.getvalue()))
+        
+    def test_segment_count_is_checked(self):
+        with self.assertRaises(ValueError):
+            Template(["a"], ["title"])
+            
+    def test_load_template_is_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("<b>{{ Title }}</b>")
+            template = load_template(path)
+            self.assertIs(load_template(path), template)
+            
+            with open(path, "w") as f:
+                f.write("<i>{{ Title }}</i>")
+            os.utime(path, ns=(1, 1))
+            self.assertEqual(load_template(path).segments, ["<i>", "</i>"])
+            
+    def test_in_memory_and_streamed_pages_report_the_same_stages(self):
+        # Stages are only instrumented in modules imported after install
+        code = ("import instrument, os, sys\n"
+                "instrument.install()\n"
+                "from page import render_markdown_file, render_page\n"
+                "from template import compile_template\n"
+                "template = compile_template('<h1>{{ Title }}</h1><main>{{ Content }}</main>')\n"
+                "markdown = '# Title\\n\\nSome **text**'\n"
+                "source = os.path.join(sys.argv[1], 'page.md')\n"
+                "with open(source, 'w') as f:\n"
+                "    f.write(markdown)\n"
+                "recorder = instrument.enable()\n"
+                "render_page(markdown, template)\n"
+                "print(sorted(recorder.stages))\n"
+                "recorder = instrument.enable()\n"
+                "render_markdown_file(source, os.path.join(sys.argv[1], 'page.html'), template)\n"
+                "print(sorted(recorder.stages))\n")
+        with tempfile.TemporaryDirectory() as tmp:
+            in_memory, streamed = subprocess.run([sys.executable, "-c", code, tmp], cwd=SRC_DIR,
+                                                 capture_output=True, text=True,
+                                                 check=True).stdout.splitlines()
+        self.assertIn("'template'", in_memory)
+        self.assertEqual(in_memory, streamed)
+
+if __name__ == "__main__":
+    unittest.main()
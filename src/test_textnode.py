@@ -21,6 +21,18 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("This is a link", TextType.LINK, url="http://example.com")
         node2 = TextNode("This is a link", TextType.LINK, url=None)
         self.assertNotEqual(node, node2)
+        
+    def test_hash_consistent_with_eq(self):
+        node = TextNode("This is a link", TextType.LINK, url="http://example.com")
+        node2 = TextNode("This is a link", TextType.LINK, url="http://example.com")
+        self.assertEqual(hash(node), hash(node2))
+        self.assertEqual(len({node, node2}), 1)
+        
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "value"
 
 
 if __name__ == "__main__":
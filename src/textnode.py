@@ -4,11 +4,14 @@ class TextType(Enum):
     PLAIN = "plain"
     BOLD = "bold"
     ITALIC = "italic"
+    CODE = "code"
     LINK = "link"
     IMAGE = "image"
 
 class TextNode():
     
+    __slots__ = ("text", "text_type", "url")
+    
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -21,5 +24,8 @@ class TextNode():
                 self.text_type == other.text_type and
                 self.url == other.url)
         
+    def __hash__(self):
+        return hash((self.text, self.text_type, self.url))
+        
     def __repr__(self):
         return f"TextNode(text='{self.text}', value='{self.text_type.value}', url='{self.url}')"
\ No newline at end of file